@@ -0,0 +1,4 @@
+"""Benchmarks do avaliador de textos.
+
+Scripts executáveis com `python -m benchmarks.<nome>` a partir da raiz do projeto.
+"""
@@ -0,0 +1,252 @@
+# corpus.py
+# Gerador de corpora sintéticos reprodutíveis, um por gênero reconhecido pelo
+# DetectorGenero, em tamanhos que vão de um post curto a um livro. A mesma
+# (gênero, tamanho, semente) produz sempre o mesmo texto.
+
+import argparse
+import os
+import random
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Gêneros na forma devolvida por DetectorGenero.detectar
+GENEROS = ("poema", "carta", "fábula", "conto", "crônica", "artigo de opinião", "dissertação")
+
+# Tamanho aproximado (em palavras) de cada faixa
+TAMANHOS = {
+    "tweet": 40,
+    "paragrafo": 150,
+    "redacao": 500,
+    "capitulo": 5000,
+    "livro": 100000,
+}
+
+# Fração de frases muito longas (> 35 palavras) nos textos em prosa
+FRACAO_FRASES_LONGAS = 0.12
+
+# ===========================
+# VOCABULÁRIO
+# ===========================
+_NOMES_FEMININOS = ("Clara", "Helena", "Beatriz", "Lúcia")
+_NOMES = _NOMES_FEMININOS + ("Joaquim", "Tiago", "Rafael", "Otávio")
+_PESSOAS = ("a menina", "o professor", "a vizinha", "o velho pescador", "a costureira",
+            "o padeiro", "a médica", "o carteiro") + _NOMES
+_LUGARES = ("na praça", "perto do rio", "na escola", "na cozinha", "à beira da estrada",
+            "no quintal", "na estação", "no alto do morro")
+_ACOES = ("atravessou a rua devagar", "abriu a porta do armário", "encontrou uma carta antiga",
+          "esperou em silêncio", "guardou a chave no bolso", "olhou pela janela",
+          "subiu a escada correndo", "acendeu a lamparina")
+_OBJETOS = ("um guarda-chuva vermelho", "uma caixa de madeira", "um bilhete dobrado",
+            "um relógio parado", "uma fotografia gasta", "um caderno de capa azul")
+
+_ANIMAIS = ("o leão", "a raposa", "o lobo", "o corvo", "a tartaruga", "a lebre", "o rato", "o coelho")
+_LICOES = ("quem se apressa demais tropeça no caminho", "a vaidade cega os espertos",
+           "a união faz a força dos pequenos", "a paciência vence a pressa",
+           "não se deve confiar em quem elogia demais")
+
+_CENAS_CRONICA = ("as pessoas olhavam o celular sem levantar os olhos",
+                  "um senhor contava moedas para pagar o pão",
+                  "duas crianças disputavam a janela com entusiasmo",
+                  "o cobrador cantarolava uma música antiga",
+                  "a fila andava devagar enquanto a chuva apertava",
+                  "uma moça lia um livro de poesia em pé")
+
+_ASSUNTOS = ("o uso de celulares nas escolas", "a mobilidade urbana", "a leitura entre os jovens",
+             "o desperdício de alimentos", "o acesso à cultura", "a educação financeira",
+             "a preservação dos rios", "o trabalho remoto")
+_ARGUMENTOS = ("os dados mostram um aumento constante do problema",
+               "especialistas apontam a falta de políticas públicas",
+               "a experiência de outros países oferece bons exemplos",
+               "o custo de não agir é maior do que o de investir",
+               "a participação da comunidade costuma ser decisiva",
+               "a escola tem papel central na formação de hábitos")
+_CONECTIVOS_DISSERTACAO = ("Contudo", "Portanto", "Dessa forma", "Entretanto", "Além disso")
+
+_IMAGENS = ("o vento dobra a tarde", "a luz cai no muro", "um pássaro sem nome",
+            "a chuva escreve na janela", "meu silêncio tem raízes", "o mar guarda segredos",
+            "a noite acende estrelas", "teu nome em cada porta", "o tempo corre descalço",
+            "folhas dançam no quintal", "a saudade mora aqui", "o sol descansa tarde")
+
+
+def _cap(frase: str) -> str:
+    return frase[0].upper() + frase[1:]
+
+
+# ===========================
+# FRASES POR GÊNERO
+# ===========================
+def _frase_conto(rng: random.Random) -> str:
+    pessoa = rng.choice(_PESSOAS)
+    escolha = rng.random()
+    if escolha < 0.2:
+        return f"— Precisamos voltar antes do anoitecer — disse {rng.choice(_NOMES)}."
+    if escolha < 0.35:
+        return f"Quando {pessoa} {rng.choice(_ACOES)}, tudo mudou {rng.choice(_LUGARES)}."
+    return f"{_cap(pessoa)} {rng.choice(_ACOES)} {rng.choice(_LUGARES)} e viu {rng.choice(_OBJETOS)}."
+
+
+def _frase_fabula(rng: random.Random) -> str:
+    animal = rng.choice(_ANIMAIS)
+    outro = rng.choice(_ANIMAIS)
+    escolha = rng.random()
+    if escolha < 0.3:
+        return f"{_cap(animal)} disse que ninguém seria mais rápido do que ele."
+    if escolha < 0.6:
+        return f"{_cap(animal)} desafiou {outro} para uma corrida até o rio."
+    return f"{_cap(animal)} riu de {outro} e descansou à sombra de uma árvore."
+
+
+def _frase_cronica(rng: random.Random) -> str:
+    cena = rng.choice(_CENAS_CRONICA)
+    if rng.random() < 0.3:
+        return f"No mercado, {cena}."
+    return f"{_cap(cena)}, e eu fiquei pensando nas pequenas coisas do dia a dia."
+
+
+def _frase_artigo(rng: random.Random) -> str:
+    assunto = rng.choice(_ASSUNTOS)
+    escolha = rng.random()
+    if escolha < 0.25:
+        return f"Na minha opinião, {assunto} merece mais atenção."
+    if escolha < 0.5:
+        return f"Acredito que {rng.choice(_ARGUMENTOS)}."
+    return f"Sobre {assunto}, {rng.choice(_ARGUMENTOS)}."
+
+
+def _frase_dissertacao(rng: random.Random) -> str:
+    conectivo = rng.choice(_CONECTIVOS_DISSERTACAO)
+    return f"{conectivo}, {rng.choice(_ARGUMENTOS)} quando se discute {rng.choice(_ASSUNTOS)}."
+
+
+def _frase_carta(rng: random.Random) -> str:
+    escolha = rng.random()
+    if escolha < 0.4:
+        return f"Aqui em casa todos perguntam por você e lembram de {rng.choice(_OBJETOS)}."
+    if escolha < 0.7:
+        return f"Ontem {rng.choice(_PESSOAS)} {rng.choice(_ACOES)} e me fez lembrar das nossas conversas."
+    return "Escreva assim que puder, porque sinto falta das suas notícias e das suas histórias."
+
+
+def _frase_longa(rng: random.Random, frase: Callable[[random.Random], str]) -> str:
+    """Junta várias frases do gênero numa única frase com mais de 35 palavras."""
+    partes: List[str] = []
+    palavras = 0
+    while palavras <= 40:
+        parte = frase(rng).rstrip(".")
+        if partes and parte.split()[0] not in _NOMES:
+            parte = parte[0].lower() + parte[1:]
+        partes.append(parte)
+        palavras += len(parte.split())
+    return ", ".join(partes[:-1]) + " e " + partes[-1] + "."
+
+
+# ===========================
+# MONTAGEM DOS TEXTOS
+# ===========================
+def _prosa(rng: random.Random, palavras_alvo: int, frase: Callable[[random.Random], str],
+           abertura: str = "", fechamento: str = "") -> str:
+    """Parágrafos de 3 a 7 frases até atingir `palavras_alvo` palavras."""
+    paragrafos: List[str] = []
+    atual: List[str] = [abertura] if abertura else []
+    por_paragrafo = rng.randint(3, 7)
+    total = len(abertura.split()) + len(fechamento.split())
+    while total < palavras_alvo:
+        if rng.random() < FRACAO_FRASES_LONGAS:
+            nova = _frase_longa(rng, frase)
+        else:
+            nova = frase(rng)
+        atual.append(nova)
+        total += len(nova.split())
+        if len(atual) >= por_paragrafo:
+            paragrafos.append(" ".join(atual))
+            atual = []
+            por_paragrafo = rng.randint(3, 7)
+    if fechamento:
+        atual.append(fechamento)
+    if atual:
+        paragrafos.append(" ".join(atual))
+    return "\n\n".join(paragrafos)
+
+
+def _poema(rng: random.Random, palavras_alvo: int) -> str:
+    estrofes: List[str] = []
+    total = 0
+    while total < palavras_alvo:
+        versos = [rng.choice(_IMAGENS) for _ in range(rng.choice((3, 4, 4, 5)))]
+        versos = [_cap(v) if i == 0 else v for i, v in enumerate(versos)]
+        estrofes.append("\n".join(versos))
+        total += sum(len(v.split()) for v in versos)
+    return "\n\n".join(estrofes)
+
+
+def gerar_texto(genero: str, palavras: int, semente: int = 0) -> str:
+    """Texto sintético de `genero` com aproximadamente `palavras` palavras."""
+    if genero not in GENEROS:
+        raise ValueError(f"gênero desconhecido: {genero}")
+    rng = random.Random(f"{genero}:{palavras}:{semente}")
+    if genero == "poema":
+        return _poema(rng, palavras)
+    if genero == "carta":
+        nome = rng.choice(_NOMES)
+        saudacao = "Querida" if nome in _NOMES_FEMININOS else "Querido"
+        abertura = f"{saudacao} {nome}, espero que esta carta encontre você bem e com saúde."
+        fechamento = f"Atenciosamente, {rng.choice(_NOMES)}."
+        return _prosa(rng, palavras, _frase_carta, abertura, fechamento)
+    if genero == "fábula":
+        abertura = f"{_cap(rng.choice(_ANIMAIS))} vivia {rng.choice(_LUGARES)} e gostava de se gabar."
+        fechamento = f"Moral: {rng.choice(_LICOES)}."
+        return _prosa(rng, palavras, _frase_fabula, abertura, fechamento)
+    if genero == "conto":
+        abertura = f"Era uma vez {rng.choice(_PESSOAS)} que morava {rng.choice(_LUGARES)}."
+        return _prosa(rng, palavras, _frase_conto, abertura)
+    if genero == "crônica":
+        abertura = f"Outro dia, no ônibus, {rng.choice(_CENAS_CRONICA)}."
+        return _prosa(rng, palavras, _frase_cronica, abertura)
+    if genero == "artigo de opinião":
+        abertura = f"Defendo que {rng.choice(_ASSUNTOS)} seja tratado como prioridade."
+        return _prosa(rng, palavras, _frase_artigo, abertura)
+    abertura = f"A tese deste texto é que {rng.choice(_ASSUNTOS)} exige planejamento."
+    fechamento = f"Portanto, {rng.choice(_ASSUNTOS)} deve ser enfrentado com responsabilidade."
+    return _prosa(rng, palavras, _frase_dissertacao, abertura, fechamento)
+
+
+def gerar_corpus(generos=GENEROS, tamanhos=tuple(TAMANHOS), amostras: int = 1,
+                 semente: int = 0) -> Iterator[Tuple[str, str, int, str]]:
+    """Gera (genero, tamanho, indice, texto) para cada combinação pedida."""
+    for genero in generos:
+        for tamanho in tamanhos:
+            for i in range(amostras):
+                yield genero, tamanho, i, gerar_texto(genero, TAMANHOS[tamanho], semente + i)
+
+
+def _nome_arquivo(genero: str, tamanho: str, indice: int) -> str:
+    base = genero.replace(" ", "_").replace("á", "a").replace("ô", "o").replace("ã", "a")
+    return f"{base}-{tamanho}-{indice:03d}.txt"
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Gera textos sintéticos por gênero e tamanho.")
+    parser.add_argument("--generos", nargs="+", default=list(GENEROS), choices=GENEROS)
+    parser.add_argument("--tamanhos", nargs="+", default=list(TAMANHOS), choices=list(TAMANHOS))
+    parser.add_argument("--amostras", type=int, default=1, help="textos por gênero e tamanho")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--pasta", default=None,
+                        help="grava um .txt por texto nesta pasta (padrão: imprime na tela)")
+    args = parser.parse_args(argv)
+
+    contagem: Dict[str, int] = {}
+    for genero, tamanho, i, texto in gerar_corpus(args.generos, args.tamanhos, args.amostras, args.semente):
+        if args.pasta:
+            os.makedirs(args.pasta, exist_ok=True)
+            with open(os.path.join(args.pasta, _nome_arquivo(genero, tamanho, i)), "w", encoding="utf-8") as f:
+                f.write(texto)
+            contagem[genero] = contagem.get(genero, 0) + 1
+        else:
+            print(f"===== {genero} / {tamanho} / {i} =====")
+            print(texto)
+            print()
+    if args.pasta:
+        print(f"{sum(contagem.values())} arquivos gravados em {args.pasta}")
+
+
+if __name__ == "__main__":
+    main()
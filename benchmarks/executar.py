@@ -0,0 +1,237 @@
+# executar.py
+# Benchmark das etapas da avaliação sobre o corpus sintético (benchmarks/corpus.py):
+# mede separadamente detectar, AnalisadorBasico.analisar, pontuar_e_gerar_feedback e
+# _reescrever_frases_longas, por gênero e tamanho, e grava o resultado em JSON para
+# comparar dois commits.
+#
+#   python -m benchmarks.executar --saida base.json
+#   python -m benchmarks.executar --saida novo.json --comparar base.json
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.corpus import GENEROS, TAMANHOS, gerar_texto
+from data.avaliador import AnalisadorBasico, DetectorGenero
+from data.feedback import _reescrever_frases_longas, pontuar_e_gerar_feedback
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ETAPAS = ("detectar", "analisar", "feedback", "reescrita")
+TEMA = "educação"
+
+# Textos medidos por gênero em cada faixa (multiplicados por --escala)
+AMOSTRAS = {
+    "tweet": 200,
+    "paragrafo": 100,
+    "redacao": 40,
+    "capitulo": 8,
+    "livro": 2,
+}
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ,
+                              capture_output=True, text=True, check=True)
+        return proc.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Etapas:
+    """As quatro etapas medidas, com as mesmas instâncias entre os textos."""
+
+    def __init__(self):
+        self.detector = DetectorGenero()
+        self.analisador = AnalisadorBasico()
+
+    def detectar(self, texto: str) -> str:
+        return self.detector.detectar(texto)
+
+    def analisar(self, texto: str, genero: str):
+        rel = self.analisador.analisar(texto)
+        rel["genero"] = genero
+        rel["tema"] = TEMA
+        return rel
+
+    @staticmethod
+    def feedback(rel) -> Dict:
+        return pontuar_e_gerar_feedback(rel, TEMA)
+
+    @staticmethod
+    def reescrita(rel) -> List[str]:
+        documento = rel["documento"]
+        return _reescrever_frases_longas(documento.texto, documento=documento)
+
+    def todas(self, texto: str):
+        genero = self.detectar(texto)
+        rel = self.analisar(texto, genero)
+        self.feedback(rel)
+        self.reescrita(rel)
+        return genero
+
+
+def _cronometrar(funcao: Callable, *args) -> float:
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def _pico_memoria(funcao: Callable, *args) -> int:
+    """Pico de memória alocada (bytes) durante uma chamada."""
+    tracemalloc.start()
+    try:
+        funcao(*args)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+
+def _resumo(tempos: List[float], palavras: int) -> Dict:
+    total = sum(tempos)
+    return {
+        "p50_ms": round(_percentil(tempos, 50) * 1000, 3),
+        "p99_ms": round(_percentil(tempos, 99) * 1000, 3),
+        "media_ms": round(statistics.mean(tempos) * 1000, 3),
+        "textos_por_s": round(len(tempos) / total, 2) if total else 0,
+        "palavras_por_s": round(palavras / total) if total else 0,
+    }
+
+
+def medir_caso(etapas: Etapas, genero: str, tamanho: str, amostras: int, semente: int = 0,
+               memoria: bool = True) -> Dict:
+    """Mede as etapas em `amostras` textos de um gênero e tamanho."""
+    textos = [gerar_texto(genero, TAMANHOS[tamanho], semente + i) for i in range(amostras)]
+    palavras = sum(len(t.split()) for t in textos)
+    tempos: Dict[str, List[float]] = {etapa: [] for etapa in ETAPAS}
+    acertos = 0
+    for texto in textos:
+        inicio = time.perf_counter()
+        detectado = etapas.detectar(texto)
+        tempos["detectar"].append(time.perf_counter() - inicio)
+        acertos += detectado == genero
+
+        inicio = time.perf_counter()
+        rel = etapas.analisar(texto, detectado)
+        tempos["analisar"].append(time.perf_counter() - inicio)
+
+        tempos["feedback"].append(_cronometrar(etapas.feedback, rel))
+        tempos["reescrita"].append(_cronometrar(etapas.reescrita, rel))
+
+    resultado = {
+        "genero": genero,
+        "tamanho": tamanho,
+        "amostras": amostras,
+        "palavras_por_texto": round(palavras / amostras),
+        "deteccao_correta": round(acertos / amostras, 3),
+        "etapas": {etapa: _resumo(tempos[etapa], palavras) for etapa in ETAPAS},
+    }
+    if memoria:
+        # passada separada: o tracemalloc deixaria os tempos acima mais lentos
+        texto = textos[0]
+        rel = etapas.analisar(texto, genero)
+        picos = {
+            "detectar": _pico_memoria(etapas.detectar, texto),
+            "analisar": _pico_memoria(etapas.analisar, texto, genero),
+            "feedback": _pico_memoria(etapas.feedback, rel),
+            "reescrita": _pico_memoria(etapas.reescrita, rel),
+        }
+        for etapa, pico in picos.items():
+            resultado["etapas"][etapa]["pico_memoria_kib"] = round(pico / 1024, 1)
+    return resultado
+
+
+def executar(generos=GENEROS, tamanhos=tuple(TAMANHOS), escala: float = 1.0, semente: int = 0,
+             memoria: bool = True, progresso: bool = True) -> Dict:
+    etapas = Etapas()
+    etapas.todas(gerar_texto("conto", TAMANHOS["tweet"]))  # aquecimento (NLTK, punkt)
+    casos = []
+    for genero in generos:
+        for tamanho in tamanhos:
+            amostras = max(1, int(AMOSTRAS[tamanho] * escala))
+            caso = medir_caso(etapas, genero, tamanho, amostras, semente, memoria)
+            casos.append(caso)
+            if progresso:
+                ms = " ".join(f"{e}={caso['etapas'][e]['p50_ms']}" for e in ETAPAS)
+                print(f"{genero:18} {tamanho:10} p50 ms: {ms}", file=sys.stderr)
+    return {
+        "metadados": {
+            "commit": _commit_atual(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "escala": escala,
+            "semente": semente,
+        },
+        "casos": casos,
+    }
+
+
+def comparar(base: Dict, novo: Dict, tolerancia: float = 0.2) -> List[str]:
+    """Compara o p50 de cada (gênero, tamanho, etapa); devolve as regressões acima da tolerância."""
+    anteriores = {(c["genero"], c["tamanho"]): c for c in base["casos"]}
+    regressoes = []
+    print(f"{'gênero':18} {'tamanho':10} {'etapa':10} {'base ms':>10} {'novo ms':>10} {'razão':>7}")
+    for caso in novo["casos"]:
+        anterior = anteriores.get((caso["genero"], caso["tamanho"]))
+        if anterior is None:
+            continue
+        for etapa in ETAPAS:
+            a = anterior["etapas"][etapa]["p50_ms"]
+            n = caso["etapas"][etapa]["p50_ms"]
+            razao = n / a if a else 1.0
+            print(f"{caso['genero']:18} {caso['tamanho']:10} {etapa:10} {a:10.3f} {n:10.3f} {razao:7.2f}")
+            if razao > 1 + tolerancia:
+                regressoes.append(f"{caso['genero']}/{caso['tamanho']}/{etapa}: {razao:.2f}x mais lento")
+    return regressoes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark das etapas da avaliação por gênero e tamanho.")
+    parser.add_argument("--generos", nargs="+", default=list(GENEROS), choices=GENEROS)
+    parser.add_argument("--tamanhos", nargs="+", default=list(TAMANHOS), choices=list(TAMANHOS))
+    parser.add_argument("--escala", type=float, default=1.0,
+                        help="multiplica o número de textos por caso (ex.: 0.1 para uma rodada rápida)")
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--sem-memoria", action="store_true", help="não mede o pico de memória")
+    parser.add_argument("--saida", default=None, help="grava o resultado em JSON")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="aumento relativo do p50 aceito na comparação (padrão: 0.2)")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.generos, args.tamanhos, args.escala, args.semente,
+                         memoria=not args.sem_memoria)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+    else:
+        print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+    if args.comparar:
+        with open(args.comparar, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regressoes = comparar(base, resultado, args.tolerancia)
+        for regressao in regressoes:
+            print("REGRESSÃO:", regressao, file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
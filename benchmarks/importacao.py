@@ -0,0 +1,88 @@
+# importacao.py
+# Benchmark do tempo de inicialização: mede, em processos novos, o custo de
+# `import data.main`, confere que o NLTK não é importado antes do primeiro uso e mede
+# a primeira tokenização (carga do punkt).
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SCRIPT_PRIMEIRA_TOKENIZACAO = (
+    "import time; t0 = time.perf_counter();"
+    "from data.tokenizacao import sent_tokenize;"
+    "sent_tokenize('Primeira frase. Segunda frase.');"
+    "print((time.perf_counter() - t0) * 1000)"
+)
+
+
+def _executar(argumentos: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable] + argumentos, cwd=RAIZ, capture_output=True, text=True, check=True
+    )
+
+
+def medir_importacao(modulo: str = "data.main") -> Dict:
+    """Importa `modulo` num processo novo com `-X importtime`."""
+    proc = _executar(["-X", "importtime", "-c", f"import sys, {modulo}; print('nltk' in sys.modules)"])
+    cumulativo_us = 0
+    for linha in proc.stderr.splitlines():
+        partes = [p.strip() for p in linha.split("|")]
+        if len(partes) == 3 and partes[2] == modulo:
+            cumulativo_us = int(partes[1])
+    return {
+        "importacao_ms": cumulativo_us / 1000,
+        "nltk_importado": proc.stdout.strip() == "True",
+    }
+
+
+def medir_primeira_tokenizacao() -> float:
+    proc = _executar(["-c", _SCRIPT_PRIMEIRA_TOKENIZACAO])
+    return float(proc.stdout.strip())
+
+
+def executar(modulo: str = "data.main", repeticoes: int = 5) -> Dict:
+    importacoes = [medir_importacao(modulo) for _ in range(repeticoes)]
+    tokenizacoes = [medir_primeira_tokenizacao() for _ in range(repeticoes)]
+    return {
+        "modulo": modulo,
+        "repeticoes": repeticoes,
+        "importacao_ms_mediana": round(statistics.median(i["importacao_ms"] for i in importacoes), 2),
+        "importacao_ms_min": round(min(i["importacao_ms"] for i in importacoes), 2),
+        "nltk_importado_na_carga": any(i["nltk_importado"] for i in importacoes),
+        "primeira_tokenizacao_ms_mediana": round(statistics.median(tokenizacoes), 2),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o tempo de importação do avaliador.")
+    parser.add_argument("--modulo", default="data.main", help="módulo a importar")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--limite-ms", type=float, default=300.0,
+                        help="falha (código 1) se a mediana da importação passar deste valor")
+    parser.add_argument("--saida", default=None, help="grava o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.modulo, args.repeticoes)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    falhas = []
+    if resultado["nltk_importado_na_carga"]:
+        falhas.append("o NLTK foi importado durante a importação do módulo")
+    if resultado["importacao_ms_mediana"] > args.limite_ms:
+        falhas.append(f"importação acima do limite ({args.limite_ms} ms)")
+    for falha in falhas:
+        print("REGRESSÃO:", falha, file=sys.stderr)
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
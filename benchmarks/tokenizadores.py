@@ -0,0 +1,170 @@
+# tokenizadores.py
+# Teste de concordância entre os backends de tokenização (data/tokenizacao.py): mede a
+# velocidade de cada um e compara o backend rápido com o NLTK (referência) nas
+# fronteiras de frase (precisão/revocação/F1), nos tokens e no resultado da avaliação
+# (num_frases, num_palavras e nota de cada texto).
+#
+#   python -m benchmarks.tokenizadores
+#   python -m benchmarks.tokenizadores --pasta redacoes/ --minimo-f1 0.95
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Set
+
+from benchmarks.corpus import GENEROS, TAMANHOS, gerar_texto
+from data.avaliador import AvaliadorTexto
+from data.documento import calcular_offsets
+from data.feedback import pontuar_e_gerar_feedback
+from data.tokenizacao import BACKEND_PADRAO, BACKENDS, backend_tokenizacao
+
+TEMA = "educação"
+
+# Casos difíceis para um tokenizador de regras: abreviaturas, iniciais, clíticos,
+# números, diálogos, reticências e aspas
+FRASES_REFERENCIA = (
+    "O Sr. Almeida chegou cedo. A Dra. Beatriz já o esperava na sala 3.",
+    "Segundo o Prof. Carvalho (cf. pág. 12), o resultado foi de 1.250,75 reais. Ninguém contestou.",
+    "J. R. R. Tolkien escreveu muitos livros. Eu li todos.",
+    "Disse-lhe que viria amanhã. Encontrá-lo-ei na estação às 14h30.",
+    "— Você vem? — perguntou ela. — Vou, sim! — respondeu o menino.",
+    "Ele hesitou... Depois, saiu sem dizer nada. Que noite!",
+    "\"Isto não é justo.\" A frase ecoou pela sala. Todos se calaram.",
+    "Comprei pão, leite, queijo etc. Voltei para casa antes da chuva.",
+    "O guarda-chuva ficou na Av. Paulista, perto do nº 900. Voltei para buscá-lo.",
+    "Visite www.exemplo.com.br ou escreva para contato@exemplo.com. Respondemos logo.",
+)
+
+# Textos por gênero em cada faixa do corpus sintético
+AMOSTRAS = {"tweet": 20, "paragrafo": 10, "redacao": 5, "capitulo": 1}
+
+
+def textos_referencia(pasta: Optional[str] = None, semente: int = 0) -> List[str]:
+    """Corpus sintético + frases de referência + (opcional) os .txt de `pasta`."""
+    textos = [gerar_texto(genero, TAMANHOS[tamanho], semente + i)
+              for genero in GENEROS for tamanho, n in AMOSTRAS.items() for i in range(n)]
+    textos.extend(FRASES_REFERENCIA)
+    textos.append("\n\n".join(FRASES_REFERENCIA))
+    if pasta:
+        for caminho in sorted(glob.glob(os.path.join(pasta, "**", "*.txt"), recursive=True)):
+            with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+                textos.append(f.read())
+    return textos
+
+
+def _fronteiras(texto: str, frases: List[str]) -> Set[int]:
+    """Posições (sem espaços finais) onde termina cada frase, exceto a última."""
+    fronteiras = set()
+    for _, fim in calcular_offsets(texto, frases)[:-1]:
+        while fim > 0 and texto[fim - 1].isspace():
+            fim -= 1
+        fronteiras.add(fim)
+    return fronteiras
+
+
+def _prf(acertos: int, previstos: int, esperados: int) -> Dict[str, float]:
+    precisao = acertos / previstos if previstos else 1.0
+    revocacao = acertos / esperados if esperados else 1.0
+    f1 = 2 * precisao * revocacao / (precisao + revocacao) if precisao + revocacao else 0.0
+    return {"precisao": round(precisao, 4), "revocacao": round(revocacao, 4), "f1": round(f1, 4)}
+
+
+def medir_velocidade(nome: str, textos: List[str], repeticoes: int = 3) -> Dict:
+    """Palavras por segundo de frases + palavras (melhor de `repeticoes`)."""
+    backend = backend_tokenizacao(nome)
+    backend.preaquecer()
+    backend.sent_tokenize("Aquecimento. Pronto.")
+    palavras = sum(len(t.split()) for t in textos)
+    melhor = float("inf")
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        for texto in textos:
+            for frase in backend.sent_tokenize(texto):
+                backend.word_tokenize(frase, preserve_line=True)
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return {"palavras_por_s": round(palavras / melhor) if melhor else 0, "segundos": round(melhor, 4)}
+
+
+def medir_concordancia(textos: List[str], candidato: str, referencia: str = BACKEND_PADRAO) -> Dict:
+    ref = backend_tokenizacao(referencia)
+    cand = backend_tokenizacao(candidato)
+    av_ref = AvaliadorTexto(ref)
+    av_cand = AvaliadorTexto(cand)
+
+    acertos_frases = previstas = esperadas = 0
+    acertos_tokens = tokens_cand = tokens_ref = 0
+    iguais = {"num_frases": 0, "num_palavras": 0, "nota": 0}
+    divergencias = []
+    for texto in textos:
+        fr_ref = _fronteiras(texto, ref.sent_tokenize(texto))
+        fr_cand = _fronteiras(texto, cand.sent_tokenize(texto))
+        acertos_frases += len(fr_ref & fr_cand)
+        previstas += len(fr_cand)
+        esperadas += len(fr_ref)
+
+        t_ref = Counter(ref.word_tokenize(texto))
+        t_cand = Counter(cand.word_tokenize(texto))
+        acertos_tokens += sum((t_ref & t_cand).values())
+        tokens_ref += sum(t_ref.values())
+        tokens_cand += sum(t_cand.values())
+
+        rel_ref = av_ref.avaliar_texto(texto)
+        rel_cand = av_cand.avaliar_texto(texto)
+        nota_ref = pontuar_e_gerar_feedback(rel_ref, TEMA, texto)["nota_final"]
+        nota_cand = pontuar_e_gerar_feedback(rel_cand, TEMA, texto)["nota_final"]
+        iguais["num_frases"] += rel_ref["num_frases"] == rel_cand["num_frases"]
+        iguais["num_palavras"] += rel_ref["num_palavras"] == rel_cand["num_palavras"]
+        iguais["nota"] += nota_ref == nota_cand
+        if nota_ref != nota_cand and len(divergencias) < 5:
+            divergencias.append({"inicio": texto[:60], "nota_referencia": nota_ref,
+                                 "nota_candidato": nota_cand})
+
+    n = len(textos) or 1
+    return {
+        "referencia": referencia,
+        "candidato": candidato,
+        "textos": len(textos),
+        "fronteiras_frase": _prf(acertos_frases, previstas, esperadas),
+        "tokens": _prf(acertos_tokens, tokens_cand, tokens_ref),
+        "textos_iguais": {campo: round(v / n, 4) for campo, v in iguais.items()},
+        "divergencias_nota": divergencias,
+    }
+
+
+def executar(pasta: Optional[str] = None, candidato: str = "rapido", semente: int = 0) -> Dict:
+    textos = textos_referencia(pasta, semente)
+    return {
+        "velocidade": {nome: medir_velocidade(nome, textos) for nome in BACKENDS},
+        "concordancia": medir_concordancia(textos, candidato),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compara os backends de tokenização com o NLTK.")
+    parser.add_argument("--pasta", default=None, help="inclui os .txt desta pasta no corpus")
+    parser.add_argument("--candidato", default="rapido", choices=sorted(BACKENDS))
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--minimo-f1", type=float, default=None,
+                        help="falha (código 1) se o F1 das fronteiras de frase ficar abaixo deste valor")
+    parser.add_argument("--saida", default=None, help="grava o resultado em JSON")
+    args = parser.parse_args(argv)
+
+    resultado = executar(args.pasta, args.candidato, args.semente)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resultado, f, indent=2, ensure_ascii=False)
+
+    f1 = resultado["concordancia"]["fronteiras_frase"]["f1"]
+    if args.minimo_f1 is not None and f1 < args.minimo_f1:
+        print(f"REGRESSÃO: F1 das fronteiras de frase {f1} < {args.minimo_f1}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,4 +4,4 @@ Este arquivo torna a pasta `data` um pacote Python, permitindo importações do
 `import data.main` ou `from data import avaliador`.
 """
 
-__all__ = ["avaliador", "feedback", "main"]
+__all__ = ["avaliador", "feedback", "lote", "main"]
@@ -1,195 +1,387 @@
 # avaliador.py
 import re
+from array import array
 from collections import Counter
-from nltk.tokenize import sent_tokenize, word_tokenize
+from typing import Dict, List, Optional, Tuple, Union
+try:
+    # Prefer relative imports when used as a package
+    from .documento import DocumentoTokenizado, excede_palavras
+    from .instrumentacao import etapa
+    from .relatorio import RelatorioAnalise
+    from .rubricas import RubricaCompilada, rubrica_do_genero, rubricas_registradas
+    from .tokenizacao import BackendTokenizacao
+except Exception:
+    # Fallback for direct script execution
+    from documento import DocumentoTokenizado, excede_palavras
+    from instrumentacao import etapa
+    from relatorio import RelatorioAnalise
+    from rubricas import RubricaCompilada, rubrica_do_genero, rubricas_registradas
+    from tokenizacao import BackendTokenizacao
+
+# ===========================
+# BUSCA DE MARCADORES (PASSAGEM ÚNICA)
+# ===========================
+class BuscadorMarcadores:
+    """Conta, em uma única passagem sobre o texto, todos os marcadores de todas as categorias.
+
+    Os marcadores são organizados numa trie e compilados em uma só expressão regular.
+    Em cada posição a regex casa o marcador mais longo; os marcadores que são prefixo
+    dele também são contabilizados, e a busca seguinte recomeça no caractere seguinte ao
+    início do casamento (ocorrências sobrepostas contam, como no teste `in`). O custo
+    depende do tamanho do texto, não do número de marcadores.
+    """
+
+    def __init__(self, categorias: Dict[str, Tuple[str, ...]]):
+        self.categorias = categorias
+        self._categorias_por_marcador: Dict[str, List[str]] = {}
+        for categoria, marcadores in categorias.items():
+            for m in marcadores:
+                self._categorias_por_marcador.setdefault(m, []).append(categoria)
+        todos = list(self._categorias_por_marcador)
+        # marcador casado -> ele mesmo + marcadores que são prefixo dele
+        self._creditos = {
+            m: [p for p in todos if m.startswith(p)]
+            for m in todos
+        }
+        self._regex = re.compile(self._trie_para_regex(todos))
+
+    @staticmethod
+    def _trie_para_regex(marcadores: List[str]) -> str:
+        trie: dict = {}
+        for m in marcadores:
+            no = trie
+            for ch in m:
+                no = no.setdefault(ch, {})
+            no[""] = True
+
+        def gerar(no: dict) -> str:
+            ramos = [re.escape(ch) + gerar(filho) for ch, filho in sorted(no.items()) if ch]
+            if not ramos:
+                return ""
+            corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+            if "" in no:
+                # marcador termina aqui, mas um mais longo pode continuar (guloso)
+                return "(?:" + corpo + ")?"
+            return corpo
+
+        return gerar(trie)
+
+    def contar(self, texto: str) -> Dict[str, Counter]:
+        """Retorna {categoria: Counter(marcador -> ocorrências)} para `texto`."""
+        contagens = {categoria: Counter() for categoria in self.categorias}
+        casados: Counter = Counter()
+        buscar = self._regex.search
+        pos = 0
+        while True:
+            m = buscar(texto, pos)
+            if m is None:
+                break
+            casados[m.group()] += 1
+            pos = m.start() + 1
+        for casado, n in casados.items():
+            for m in self._creditos[casado]:
+                for categoria in self._categorias_por_marcador[m]:
+                    contagens[categoria][m] += n
+        return contagens
+
 
 # ===========================
 # DETECTOR DE GÊNERO TEXTUAL
 # ===========================
 class DetectorGenero:
-    def detectar(self, texto):
+    ANIMAIS_FABULA = (
+        "leão", "raposa", "lobo", "corvo", "tartaruga", "lebre", "cervo",
+        "gato", "cachorro", "rato", "coelho", "água-viva"
+    )
+    MARCADORES = {
+        "animal": ANIMAIS_FABULA,
+        "moral": ("moral:", "moraleja", "lição", "ensinamento", "ensinamento moral"),
+        "conto": ("era uma vez", "certa vez", "numa noite", "um dia", "anos depois"),
+        "quando": ("quando",),
+        "disse": ("disse",),
+        "cronica": ("outro dia", "no ônibus", "no mercado", "cotidiano", "manhã seguinte"),
+        "artigo": ("na minha opinião", "defendo que", "acredito que"),
+        "argumento": ("portanto", "logo", "assim", "contudo", "entretanto", "tese", "dessa forma"),
+        "narrativo": ("era uma vez", "falou", "caminhou", "história", "personagem"),
+    }
+
+    # compilados uma única vez para todas as instâncias
+    _buscador = BuscadorMarcadores(MARCADORES)
+    # procura padrões do tipo 'o cachorro disse' ou 'a raposa falou' (indicando animal personificado)
+    _agente_padrao = re.compile(
+        r"\b(?:" + "|".join(re.escape(a) for a in ANIMAIS_FABULA) + r")\b"
+        + r"(?:\s+(?:\w+)){0,5}\s+(?:disse|falou|falavam|falou|diz|dizia|pensou|pensaram)\b",
+        re.I,
+    )
+    _capitulo = re.compile(r"\bcap(í|i)tulo\b")
+    _abertura_carta = re.compile(r"^(querido|querida|prezado|prezada|caro|cara)\b")
+    _fechamento_carta = re.compile(r"(atenciosamente|cordialmente|cumprimentos|grato|grata)\b")
+
+    def extrair_sinais(self, texto: str, inicio_do_texto: bool = True) -> "SinaisGenero":
+        """Extrai do texto (ou de um trecho dele) os sinais usados pela cascata de regras.
+
+        Sinais de trechos consecutivos podem ser combinados com `SinaisGenero.juntar`;
+        `inicio_do_texto` indica se o trecho abre o texto (saudação de carta).
+        """
         # Normaliza entrada
         texto_stripped = texto.strip()
         t = texto_stripped.lower()
+        sinais = SinaisGenero()
 
         # linhas não vazias (versos ou parágrafos)
-        linhas = [l.strip() for l in texto_stripped.splitlines() if l.strip()]
-
+        for l in texto_stripped.splitlines():
+            l = l.strip()
+            if l:
+                sinais.linhas += 1
+                if len(l.split()) <= 8:
+                    sinais.linhas_curtas += 1
+        sinais.capitulo = bool(self._capitulo.search(t))
+        sinais.abertura_carta = inicio_do_texto and bool(self._abertura_carta.match(t))
+        sinais.fechamento_carta = bool(self._fechamento_carta.search(t))
+
+        # Uma única passagem conta os marcadores de todas as regras
+        sinais.marcadores = self._buscador.contar(t)
+        if sinais.marcadores["animal"]:
+            sinais.animal_agente = bool(self._agente_padrao.search(t))
+        return sinais
+
+    def classificar(self, sinais: "SinaisGenero") -> str:
+        """Aplica a cascata de regras aos sinais extraídos."""
         # --- POEMA ---
         # Se houver múltiplas linhas e a maioria for curta (poucas palavras), é provável poema.
-        if len(linhas) >= 2:
-            curto = sum(1 for l in linhas if len(l.split()) <= 8)
-            if curto / len(linhas) >= 0.6 and not re.search(r"\bcap(í|i)tulo\b", t):
+        if sinais.linhas >= 2:
+            if sinais.linhas_curtas / sinais.linhas >= 0.6 and not sinais.capitulo:
                 return "poema"
 
         # --- CARTA ---
         # Procura saudações típicas no início e fechamentos formais no texto
-        abertura = re.match(r"^(querido|querida|prezado|prezada|caro|cara)\b", t)
-        fechamento = re.search(r"(atenciosamente|cordialmente|cumprimentos|grato|grata)\b", t)
-        if abertura and fechamento:
+        if sinais.abertura_carta and sinais.fechamento_carta:
             return "carta"
 
-        # --- FÁBULA ---
-        animais_fabula = [
-            "leão", "raposa", "lobo", "corvo", "tartaruga", "lebre", "cervo",
-            "gato", "cachorro", "rato", "coelho", "água-viva"
-        ]
-        marcadores_moral = ["moral:", "moraleja", "lição", "ensinamento", "ensinamento moral"]
+        marcadores = sinais.marcadores
 
+        # --- FÁBULA ---
         # Fábula: presença de animais + indicador de moral OR animal como agente (fala/ação humana)
-        has_animal = any(animal in t for animal in animais_fabula)
-        has_moral_marker = any(moral in t for moral in marcadores_moral)
-        # procura padrões do tipo 'o cachorro disse' ou 'a raposa falou' (indicando animal personificado)
-        animais_regex = r"\b(?:" + "|".join(re.escape(a) for a in animais_fabula) + r")\b"
-        agente_padrao = re.compile(animais_regex + r"(?:\s+(?:\w+)){0,5}\s+(?:disse|falou|falavam|falou|diz|dizia|pensou|pensaram)\b", re.I)
-        animal_agente = bool(agente_padrao.search(t))
-        if has_animal and (has_moral_marker or animal_agente):
+        has_animal = bool(marcadores["animal"])
+        has_moral_marker = bool(marcadores["moral"])
+        if has_animal and (has_moral_marker or sinais.animal_agente):
             return "fábula"
 
         # --- CONTO ---
-        marcadores_conto = ["era uma vez", "certa vez", "numa noite", "um dia", "anos depois"]
         # Conto costuma trazer marcadores narrativos e ser mais extenso que microconto
-        if any(p in t for p in marcadores_conto) or ("quando" in t and "disse" in t):
+        if marcadores["conto"] or (marcadores["quando"] and marcadores["disse"]):
             # evita confundir com fábula (já tratada acima)
             return "conto"
 
         # --- CRÔNICA ---
-        marcadores_cronica = ["outro dia", "no ônibus", "no mercado", "cotidiano", "manhã seguinte"]
-        if any(m in t for m in marcadores_cronica):
+        if marcadores["cronica"]:
             return "crônica"
 
         # NOTE: detecção de 'resumo' foi removida para evitar falsos positivos.
 
         # --- ARTIGO DE OPINIÃO ---
-        marcadores_artigo = ["na minha opinião", "defendo que", "acredito que"]
-        if any(p in t for p in marcadores_artigo):
+        if marcadores["artigo"]:
             return "artigo de opinião"
 
         # --- DISSERTAÇÃO ARGUMENTATIVA ---
-        # Exigir 2+ marcadores argumentativos para classificar como dissertação (regra mais rígida)
-        marcadores_argumento = ["portanto", "logo", "assim", "contudo", "entretanto", "tese", "dessa forma"]
-        marcadores_narrativos = ["era uma vez", "falou", "caminhou", "história", "personagem"]
-        contagem_argumentos = sum(1 for m in marcadores_argumento if m in t)
-        if contagem_argumentos >= 2 and not any(narr in t for narr in marcadores_narrativos):
+        # Exigir 2+ marcadores argumentativos (distintos) para classificar como dissertação
+        if len(marcadores["argumento"]) >= 2 and not marcadores["narrativo"]:
             return "dissertação"
 
         # Default: retornar "desconhecido" para forçar que o usuário escolha o gênero
         return "desconhecido"
 
+    def detectar(self, texto):
+        return self.classificar(self.extrair_sinais(texto))
+
+
+class SinaisGenero:
+    """Contagens e indicadores que alimentam a cascata do DetectorGenero."""
+
+    __slots__ = ("linhas", "linhas_curtas", "capitulo", "abertura_carta",
+                 "fechamento_carta", "animal_agente", "marcadores")
+
+    def __init__(self):
+        self.linhas = 0
+        self.linhas_curtas = 0
+        self.capitulo = False
+        self.abertura_carta = False
+        self.fechamento_carta = False
+        self.animal_agente = False
+        self.marcadores: Dict[str, Counter] = {c: Counter() for c in DetectorGenero.MARCADORES}
+
+    def juntar(self, outro: "SinaisGenero") -> "SinaisGenero":
+        """Acumula os sinais de um trecho seguinte do mesmo texto."""
+        self.linhas += outro.linhas
+        self.linhas_curtas += outro.linhas_curtas
+        self.capitulo = self.capitulo or outro.capitulo
+        self.fechamento_carta = self.fechamento_carta or outro.fechamento_carta
+        self.animal_agente = self.animal_agente or outro.animal_agente
+        for categoria, contagem in outro.marcadores.items():
+            self.marcadores[categoria].update(contagem)
+        return self
+
 
 # ===========================
 # ANALISADOR BÁSICO
 # ===========================
 class AnalisadorBasico:
-    def analisar(self, texto: str) -> dict:
-        texto_limpo = texto.strip()
-        frases = sent_tokenize(texto)
-        palavras = word_tokenize(texto)
-
-        numero_frases = len(frases)
+    _SEPARADOR_PARAGRAFO = re.compile(r"\n\s*\n")
+    _NAO_ESPACO = re.compile(r"\S")
+
+    def __init__(self, tokenizador: Union[None, str, BackendTokenizacao] = None):
+        # None = backend atual do processo (NLTK por padrão; ver tokenizacao.py)
+        self.tokenizador = tokenizador
+
+    def _blocos(self, texto: str) -> List[Tuple[int, int]]:
+        """(início, fim), sem aparar, dos blocos de `re.split(r"\\n\\s*\\n", texto)` que têm conteúdo."""
+        blocos = []
+        inicio = 0
+        for sep in self._SEPARADOR_PARAGRAFO.finditer(texto):
+            if self._NAO_ESPACO.search(texto, inicio, sep.start()):
+                blocos.append((inicio, sep.start()))
+            inicio = sep.end()
+        if self._NAO_ESPACO.search(texto, inicio):
+            blocos.append((inicio, len(texto)))
+        return blocos
+
+    def _offsets_paragrafos(self, texto: str) -> array:
+        """Offsets (início, fim) dos blocos não vazios separados por linha em branco,
+        já sem os espaços das pontas (equivale a `b.strip()` de cada bloco)."""
+        offsets = array("l")
+        inicio = 0
+        for sep in self._SEPARADOR_PARAGRAFO.finditer(texto):
+            self._anexar_bloco(texto, inicio, sep.start(), offsets)
+            inicio = sep.end()
+        self._anexar_bloco(texto, inicio, len(texto), offsets)
+        return offsets
+
+    def _anexar_bloco(self, texto: str, inicio: int, fim: int, offsets: array):
+        m = self._NAO_ESPACO.search(texto, inicio, fim)
+        if m is None:
+            return
+        inicio = m.start()
+        while texto[fim - 1].isspace():
+            fim -= 1
+        offsets.append(inicio)
+        offsets.append(fim)
+
+    def analisar(self, texto: str) -> RelatorioAnalise:
+        # Tokeniza uma única vez; o documento segue no relatório para o feedback
+        with etapa("tokenizacao") as medicao:
+            documento = DocumentoTokenizado.tokenizar(texto, self.tokenizador)
+            medicao.contar_tokens(documento.num_tokens)
+        return self.montar_relatorio(documento)
+
+    def _paragrafos_extensos(self, texto: str, paragrafos: array) -> array:
+        """Offsets dos parágrafos (de `paragrafos`) com mais de 120 palavras."""
+        extensos = array("l")
+        for i in range(0, len(paragrafos), 2):
+            ini, fim = paragrafos[i], paragrafos[i + 1]
+            if excede_palavras(texto, ini, fim, 120):
+                extensos.extend((ini, fim))
+        return extensos
+
+    def montar_relatorio(self, documento: DocumentoTokenizado, contador: Optional[Counter] = None,
+                         longas: Optional[List[int]] = None, paragrafos: Optional[array] = None,
+                         extensos: Optional[array] = None) -> RelatorioAnalise:
+        """Calcula as métricas a partir de um texto já tokenizado.
+
+        `contador` (palavras alfabéticas em minúsculas, na ordem do texto) e `longas`
+        (índices das frases com mais de 35 palavras) podem vir prontos, por exemplo
+        montados a partir de partes guardadas em cache (ver data/incremental.py); o mesmo
+        vale para os offsets dos `paragrafos` e dos parágrafos `extensos` (data/paralelo.py).
+        """
+        texto = documento.texto
+        palavras = documento.tokens
+
+        numero_frases = len(documento)
         numero_palavras = len(palavras)
         media_palavras_por_frase = numero_palavras / numero_frases if numero_frases > 0 else 0
 
-        palavras_minusculas = [p.lower() for p in palavras if p.isalpha()]
-        vocabulario_unico = len(set(palavras_minusculas))
-        variedade_vocabulario_pct = (vocabulario_unico / len(palavras_minusculas) * 100) if palavras_minusculas else 0
-
-        # Parágrafos: blocos não vazios separados por linha em branco
-        raw_pars = [b.strip() for b in re.split(r"\n\s*\n", texto) if b.strip()]
-        paragrafos = raw_pars   
-        paragrafos_extensos = [p for p in paragrafos if len(p.split()) > 120]
-
-        # Frases muito longas
-        frases_muito_longas = [f for f in frases if len(f.split()) > 35]
-
-        # Palavras mais frequentes
-        contador = Counter(palavras_minusculas)
-        mais_frequentes = contador.most_common(10)
-
-        # Repetições relevantes
-        repeticoes_relevantes = [w for w,c in contador.items() if c > 2]
-
-        return {
-            "num_frases": numero_frases,
-            "num_palavras": numero_palavras,
-            "media_palavras_por_frase": round(media_palavras_por_frase,2),
-            "variedade_vocabulario": round(variedade_vocabulario_pct,2),
-            "vocabulario_unico": vocabulario_unico,
-            "paragrafos_extensos": paragrafos_extensos,
-            "paragrafos": paragrafos,
-            "palavras_minusculas": palavras_minusculas,
-            "frases_muito_longas": frases_muito_longas,
-            "linhas": texto.split("\n"),
-            "mais_frequentes": mais_frequentes,
-            "repeticoes_relevantes": repeticoes_relevantes,
-        }
+        # Palavras mais frequentes / repetições: derivadas do Counter sob demanda
+        if contador is None:
+            contador = Counter(p.lower() for p in palavras if p.isalpha())
+        total_alfabeticas = sum(contador.values())
+        vocabulario_unico = len(contador)
+        variedade_vocabulario_pct = (vocabulario_unico / total_alfabeticas * 100) if total_alfabeticas else 0
+
+        # Parágrafos: blocos não vazios separados por linha em branco (guardados como offsets)
+        if paragrafos is None:
+            paragrafos = self._offsets_paragrafos(texto)
+            extensos = None
+        if extensos is None:
+            extensos = self._paragrafos_extensos(texto, paragrafos)
+
+        # Frases muito longas (contadas sobre os offsets, sem recortar as frases)
+        frases_muito_longas = array("l")
+        if longas is None:
+            longas = [i for i in range(numero_frases) if documento.frase_excede_palavras(i, 35)]
+        for i in longas:
+            frases_muito_longas.extend(documento.span_frase(i))
+
+        return RelatorioAnalise(
+            texto,
+            num_frases=numero_frases,
+            num_palavras=numero_palavras,
+            media_palavras_por_frase=round(media_palavras_por_frase, 2),
+            variedade_vocabulario=round(variedade_vocabulario_pct, 2),
+            vocabulario_unico=vocabulario_unico,
+            paragrafos=paragrafos,
+            extensos=extensos,
+            frases_longas=frases_muito_longas,
+            contador=contador,
+            documento=documento,
+        )
 
 
 # ===========================
 # AVALIADORES ESPECÍFICOS
 # ===========================
-class AvaliadorDissertacao:
-    def avaliar(self, rel: dict) -> dict:
-        notas = {"Estrutura":2, "Coesão":2, "Clareza":2}
+class AvaliadorRubrica:
+    """Notas de um gênero segundo a sua rubrica declarativa (ver data/rubricas.py)."""
 
-        if rel["media_palavras_por_frase"] > 25:
-            notas["Clareza"] -= 1
-        if len(rel["paragrafos_extensos"]) > 0:
-            notas["Estrutura"] -= 1
-        if rel["variedade_vocabulario"] < 25:
-            notas["Coesão"] -= 1
+    genero = "dissertação"
 
-        return notas
+    def __init__(self, rubrica: Optional[RubricaCompilada] = None):
+        self.rubrica = rubrica or rubrica_do_genero(self.genero)
 
-class AvaliadorConto:
-    def avaliar(self, rel: dict) -> dict:
-        notas = {"Criatividade":2, "Coesão":2}
-        if rel["num_frases"] < 5:
-            notas["Coesão"] -= 1
-        if rel["vocabulario_unico"] < 50:
-            notas["Criatividade"] -= 1
-        return notas
-
-class AvaliadorPoema:
-    def avaliar(self, rel: dict) -> dict:
-        notas = {"Musicalidade":2, "Imagem poética":2}
-        linhas = rel["linhas"]
-        versos_longos = [l for l in linhas if len(l.split()) > 10]
-        if len(versos_longos) > len(linhas)*0.4:
-            notas["Musicalidade"] -= 1
-        if rel["variedade_vocabulario"] < 20:
-            notas["Imagem poética"] -= 1
-        return notas
-
-class AvaliadorFabula:
     def avaliar(self, rel: dict) -> dict:
-        notas = {"Moralidade":2, "Narrativa":2}
-        if rel["num_frases"] < 4:
-            notas["Narrativa"] -= 1
-        if rel["variedade_vocabulario"] < 20:
-            notas["Moralidade"] -= 1
-        return notas
+        return self.rubrica.avaliar(rel)
+
+class AvaliadorDissertacao(AvaliadorRubrica):
+    genero = "dissertação"
+
+class AvaliadorConto(AvaliadorRubrica):
+    genero = "conto"
+
+class AvaliadorPoema(AvaliadorRubrica):
+    genero = "poema"
+
+class AvaliadorFabula(AvaliadorRubrica):
+    genero = "fábula"
 
 
 # ===========================
 # AVALIADOR PRINCIPAL
 # ===========================
 class AvaliadorTexto:
-    def __init__(self):
-        self.detect = DetectorGenero()
-        self.analisador = AnalisadorBasico()
-        self.avaliadores = {
-            "dissertação": AvaliadorDissertacao(),
-            "conto": AvaliadorConto(),
-            "poema": AvaliadorPoema(),
-            "fábula": AvaliadorFabula()
-        }
+    def __init__(self, tokenizador: Union[None, str, BackendTokenizacao] = None,
+                 detector: Optional[DetectorGenero] = None):
+        # detector: por padrão a cascata de regras (ver classificador.py para o estatístico)
+        self.detect = detector or DetectorGenero()
+        self.analisador = AnalisadorBasico(tokenizador)
+        # um avaliador por rubrica registrada (dissertação, conto, poema, fábula...)
+        self.avaliadores = {r.nome: AvaliadorRubrica(r) for r in rubricas_registradas()}
 
     def avaliar_texto(self, texto: str) -> dict:
-        genero = self.detect.detectar(texto)
-        relatorio = self.analisador.analisar(texto)
-        avaliador = self.avaliadores.get(genero, AvaliadorDissertacao())
-        notas = avaliador.avaliar(relatorio)
+        with etapa("detectar"):
+            genero = self.detect.detectar(texto)
+        with etapa("analisar"):
+            relatorio = self.analisador.analisar(texto)
+        avaliador = self.avaliadores.get(genero) or self.avaliadores["dissertação"]
+        with etapa("notas_genero"):
+            notas = avaliador.avaliar(relatorio)
 
         relatorio.update({
             "genero": genero,
@@ -199,8 +391,13 @@ class AvaliadorTexto:
 
 # Compatibilidade com main.py
 from typing import Optional
+_avaliador_padrao: Optional[AvaliadorTexto] = None
+
 def analisar_texto(texto: str, tema: Optional[str] = "") -> dict:
-    avaliador = AvaliadorTexto()
-    rel = avaliador.avaliar_texto(texto)
+    # Os avaliadores não guardam estado entre textos: uma instância por processo basta
+    global _avaliador_padrao
+    if _avaliador_padrao is None:
+        _avaliador_padrao = AvaliadorTexto()
+    rel = _avaliador_padrao.avaliar_texto(texto)
     rel["tema"] = tema
     return rel
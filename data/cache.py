@@ -0,0 +1,226 @@
+# cache.py
+# Cache de resultados endereçado por conteúdo: LRU em memória na frente de um banco
+# SQLite local, com remoção dos itens menos usados quando o arquivo passa do limite.
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .feedback import assinatura_rubrica
+    from .relatorio import contagem
+    from .tokenizacao import backend_tokenizacao
+except Exception:
+    # Fallback for direct script execution
+    from feedback import assinatura_rubrica
+    from relatorio import contagem
+    from tokenizacao import backend_tokenizacao
+
+# Campos guardados de cada relatório: só o que um acerto precisa para o registro, o
+# histórico e o relatório impresso (nunca as listas pesadas, que copiam o texto)
+_CAMPOS_PERSISTIDOS = (
+    "num_frases", "num_palavras", "media_palavras_por_frase", "variedade_vocabulario",
+    "vocabulario_unico", "mais_frequentes", "repeticoes_relevantes",
+    "genero", "genero_detectado", "tema", "avaliacao",
+)
+# Listas do relatório guardadas apenas como contagem (num_<chave>), como no modo em fluxo
+_CONTAGENS_PERSISTIDAS = ("paragrafos", "paragrafos_extensos", "frases_muito_longas")
+# Trecho do primeiro parágrafo guardado para o relatório impresso (o mesmo do modo em fluxo)
+_TAMANHO_PARAGRAFO_INICIAL = 400
+# Campos do feedback que não são persistidos (cópias do texto para uso interno)
+_CAMPOS_FEEDBACK_NAO_PERSISTIDOS = ("_texto_base",)
+
+
+def normalizar_texto(texto: str) -> str:
+    """Normalização usada na chave: Unicode NFC e quebras de linha no padrão '\\n'."""
+    texto = unicodedata.normalize("NFC", texto)
+    return texto.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def chave_cache(texto: str, tema: str = "", genero: Optional[str] = None,
+                genero_padrao: str = "", detector: str = "") -> str:
+    """Hash de (texto normalizado, tema, gênero forçado, gênero padrão, rubrica, tokenizador).
+
+    Qualquer mudança de rubrica ou de stopwords altera `assinatura_rubrica()` e,
+    portanto, invalida todas as chaves antigas. Resultados de backends de tokenização
+    diferentes ficam em chaves diferentes, assim como os de cada modelo de gênero
+    (`detector`, vazio para a cascata de regras).
+    """
+    partes = [
+        normalizar_texto(texto),
+        (tema or "").strip(),
+        (genero or "").strip().lower(),
+        (genero_padrao or "").strip().lower(),
+        assinatura_rubrica(),
+        backend_tokenizacao().nome,
+    ]
+    if detector:
+        partes.append(detector)
+    return hashlib.sha256("\x1f".join(partes).encode("utf-8")).hexdigest()
+
+
+def _serializar(rel, fb: dict) -> bytes:
+    dados = {k: rel[k] for k in _CAMPOS_PERSISTIDOS if k in rel}
+    for chave in _CONTAGENS_PERSISTIDAS:
+        dados["num_" + chave] = contagem(rel, chave)
+    if "paragrafo_inicial" in rel:
+        dados["paragrafo_inicial"] = rel["paragrafo_inicial"]
+    else:
+        paragrafos = rel.get("paragrafos") or [""]
+        dados["paragrafo_inicial"] = paragrafos[0][:_TAMANHO_PARAGRAFO_INICIAL]
+    fb = {k: v for k, v in fb.items() if k not in _CAMPOS_FEEDBACK_NAO_PERSISTIDOS}
+    return json.dumps({"rel": dados, "fb": fb}, ensure_ascii=False).encode("utf-8")
+
+
+def _desserializar(dados: bytes) -> Tuple[dict, dict]:
+    valor = json.loads(dados.decode("utf-8"))
+    rel = valor["rel"]
+    # JSON não tem tuplas; mantém o formato (palavra, contagem) de Counter.most_common
+    if "mais_frequentes" in rel:
+        rel["mais_frequentes"] = [tuple(x) for x in rel["mais_frequentes"]]
+    return rel, valor["fb"]
+
+
+# Tamanho total (comprimido) mantido pelo próprio SQLite, na mesma transação de cada
+# inserção ou remoção: todos os processos que usam o arquivo veem o mesmo número
+_ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS resultados ("
+    " chave TEXT PRIMARY KEY, valor BLOB NOT NULL,"
+    " tamanho INTEGER NOT NULL, acesso REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS idx_resultados_acesso ON resultados(acesso)",
+    "CREATE TABLE IF NOT EXISTS uso (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO uso (id, bytes)"
+    " SELECT 0, COALESCE(SUM(tamanho), 0) FROM resultados",
+    "CREATE TRIGGER IF NOT EXISTS uso_insert AFTER INSERT ON resultados"
+    " BEGIN UPDATE uso SET bytes = bytes + NEW.tamanho WHERE id = 0; END",
+    "CREATE TRIGGER IF NOT EXISTS uso_delete AFTER DELETE ON resultados"
+    " BEGIN UPDATE uso SET bytes = bytes - OLD.tamanho WHERE id = 0; END",
+    "CREATE TRIGGER IF NOT EXISTS uso_update AFTER UPDATE OF tamanho ON resultados"
+    " BEGIN UPDATE uso SET bytes = bytes + NEW.tamanho - OLD.tamanho WHERE id = 0; END",
+)
+
+
+class CacheResultados:
+    """LRU em memória + armazenamento SQLite opcional.
+
+    - `max_memoria`: número de resultados mantidos em memória
+    - `caminho`: arquivo SQLite (None = somente memória); pode ser compartilhado por
+      vários processos
+    - `max_bytes_disco`: tamanho máximo (dados comprimidos) antes de remover os itens
+      acessados há mais tempo
+    """
+
+    def __init__(self, caminho: Optional[str] = None, max_memoria: int = 256,
+                 max_bytes_disco: int = 64 * 1024 * 1024):
+        self.max_memoria = max_memoria
+        self.max_bytes_disco = max_bytes_disco
+        self._memoria: "OrderedDict[str, bytes]" = OrderedDict()
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self._db: Optional[sqlite3.Connection] = None
+        if caminho:
+            pasta = os.path.dirname(os.path.abspath(caminho))
+            os.makedirs(pasta, exist_ok=True)
+            self._db = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            with self._db:
+                for comando in _ESQUEMA:
+                    self._db.execute(comando)
+
+    # ---------------------------
+    # memória
+    # ---------------------------
+    def _lembrar(self, chave: str, dados: bytes):
+        self._memoria[chave] = dados
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_memoria:
+            self._memoria.popitem(last=False)
+
+    # ---------------------------
+    # API pública
+    # ---------------------------
+    def obter(self, chave: str) -> Optional[Tuple[dict, dict]]:
+        """Retorna (rel, fb) guardados para `chave`, ou None. Cada chamada devolve cópias novas."""
+        with self._trava:
+            dados = self._memoria.get(chave)
+            if dados is not None:
+                self._memoria.move_to_end(chave)
+            elif self._db is not None:
+                linha = self._db.execute(
+                    "SELECT valor FROM resultados WHERE chave = ?", (chave,)
+                ).fetchone()
+                if linha is not None:
+                    dados = zlib.decompress(linha[0])
+                    self._db.execute(
+                        "UPDATE resultados SET acesso = ? WHERE chave = ?", (time.time(), chave)
+                    )
+                    self._db.commit()
+                    self._lembrar(chave, dados)
+            if dados is None:
+                self.falhas += 1
+                return None
+            self.acertos += 1
+        return _desserializar(dados)
+
+    def guardar(self, chave: str, rel: dict, fb: dict):
+        dados = _serializar(rel, fb)
+        with self._trava:
+            self._lembrar(chave, dados)
+            if self._db is None:
+                return
+            comprimido = zlib.compress(dados)
+            # IMMEDIATE: a leitura do tamanho e a remoção acontecem sem outro processo no meio
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT INTO resultados (chave, valor, tamanho, acesso) VALUES (?, ?, ?, ?)"
+                    " ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor,"
+                    " tamanho = excluded.tamanho, acesso = excluded.acesso",
+                    (chave, comprimido, len(comprimido), time.time()),
+                )
+                usados = self._bytes_disco()
+                if usados > self.max_bytes_disco:
+                    self._remover_antigos(usados)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+    def _bytes_disco(self) -> int:
+        return self._db.execute("SELECT bytes FROM uso WHERE id = 0").fetchone()[0]
+
+    def _remover_antigos(self, usados: int):
+        """Remove os itens acessados há mais tempo até ficar em 90% do limite."""
+        alvo = int(self.max_bytes_disco * 0.9)
+        cursor = self._db.execute("SELECT chave, tamanho FROM resultados ORDER BY acesso")
+        remover = []
+        for chave, tamanho in cursor:
+            if usados <= alvo:
+                break
+            remover.append((chave,))
+            usados -= tamanho
+        self._db.executemany("DELETE FROM resultados WHERE chave = ?", remover)
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._trava:
+            bytes_disco = self._bytes_disco() if self._db is not None else 0
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "itens_memoria": len(self._memoria),
+            "bytes_disco": bytes_disco,
+        }
+
+    def fechar(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,366 @@
+# classificador.py
+# Detector de gênero estatístico, alternativa à cascata de regras do DetectorGenero:
+# palavras, pares de palavras, n-gramas de caracteres e alguns sinais de forma (linhas
+# curtas, primeira e última palavra) são espalhados por hashing num vetor esparso de
+# tamanho fixo, e um modelo linear (regressão logística multinomial) pontua todos os
+# gêneros de uma vez. Os pesos ficam num .npy aberto com mmap; a predição de um lote
+# inteiro é uma única operação sobre a matriz esparsa dos textos. Quando a confiança
+# do modelo é baixa, vale a cascata de regras.
+#
+#   python -m data.classificador treinar rotulados/ --modelo modelo_genero/
+#   python -m data.classificador testar outros_rotulados/ --modelo modelo_genero/
+#   python -m data.classificador prever turma/ --modelo modelo_genero/
+#
+# A pasta de treino tem uma subpasta por gênero (rotulados/poema/*.txt, rotulados/conto/*.txt...).
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import DetectorGenero
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import DetectorGenero
+
+VERSAO_MODELO = 1
+# Posições do vetor de características (os pesos ocupam DIMENSAO x gêneros floats)
+DIMENSAO_PADRAO = 2 ** 18
+# Probabilidade mínima do gênero previsto para dispensar as regras
+LIMIAR_CONFIANCA = 0.6
+
+ARQUIVO_PESOS = "pesos.npy"
+ARQUIVO_METADADOS = "modelo.json"
+
+_PALAVRA = re.compile(r"\w+")
+_SIMBOLO = re.compile(r"[^\w\s]")
+
+# Nomes de pasta sem acento -> gênero como o DetectorGenero devolve
+_APELIDOS_GENERO = {
+    "dissertacao": "dissertação",
+    "fabula": "fábula",
+    "cronica": "crônica",
+    "artigo": "artigo de opinião",
+    "artigo de opiniao": "artigo de opinião",
+}
+
+
+def normalizar_genero(nome: str) -> str:
+    nome = nome.strip().lower().replace("_", " ").replace("-", " ")
+    return _APELIDOS_GENERO.get(nome, nome)
+
+
+# ===========================
+# CARACTERÍSTICAS (HASHING)
+# ===========================
+def caracteristicas(texto: str) -> Counter:
+    """Contagem das características textuais de `texto`, ainda como strings."""
+    t = texto.lower()
+    palavras = _PALAVRA.findall(t)
+    contagem: Counter = Counter()
+    por_palavra = Counter(palavras)
+    for p, n in por_palavra.items():
+        contagem["p:" + p] += n
+        # n-gramas de caracteres de cada palavra distinta (radicais, flexões)
+        marcada = "<" + p + ">"
+        for tamanho in (3, 4):
+            for i in range(len(marcada) - tamanho + 1):
+                contagem["c:" + marcada[i:i + tamanho]] += n
+    for a, b in zip(palavras, palavras[1:]):
+        contagem["b:" + a + " " + b] += 1
+    contagem.update("s:" + s for s in _SIMBOLO.findall(t))
+
+    # forma do texto: proporção de linhas curtas (versos), abertura e fechamento
+    linhas = [l for l in (l.strip() for l in t.splitlines()) if l]
+    if len(linhas) >= 2:
+        curtas = sum(1 for l in linhas if len(l.split()) <= 8)
+        contagem["f:linhas_curtas:%d" % round(4 * curtas / len(linhas))] += 1
+    if palavras:
+        contagem["f:inicio:" + palavras[0]] += 1
+        contagem["f:fim:" + palavras[-1]] += 1
+    return contagem
+
+
+def vetorizar(textos: Sequence[str], dimensao: int = DIMENSAO_PADRAO
+              ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Matriz esparsa (formato CSR: índices, valores, início de cada linha) dos textos.
+
+    Cada característica vai para a posição crc32 % dimensao (colisões se somam); os
+    valores são 1 + log(contagem), com cada linha normalizada (norma L2 = 1).
+    """
+    indices: List[int] = []
+    valores: List[float] = []
+    inicio = [0]
+    for texto in textos:
+        linha: Dict[int, float] = {}
+        for nome, n in caracteristicas(texto).items():
+            i = zlib.crc32(nome.encode("utf-8")) % dimensao
+            linha[i] = linha.get(i, 0.0) + 1.0 + math.log(n)
+        norma = math.sqrt(sum(v * v for v in linha.values())) or 1.0
+        indices.extend(linha)
+        valores.extend(v / norma for v in linha.values())
+        inicio.append(len(indices))
+    return (np.array(indices, dtype=np.int64), np.array(valores, dtype=np.float32),
+            np.array(inicio, dtype=np.int64))
+
+
+def _somar_linhas(contribuicoes: np.ndarray, inicio: np.ndarray) -> np.ndarray:
+    """Soma as linhas de `contribuicoes` em cada segmento [inicio[i], inicio[i+1])."""
+    saida = np.zeros((len(inicio) - 1, contribuicoes.shape[1]), dtype=np.float64)
+    com_itens = np.diff(inicio) > 0
+    if com_itens.any():
+        saida[com_itens] = np.add.reduceat(contribuicoes, inicio[:-1][com_itens], axis=0)
+    return saida
+
+
+def _softmax(pontos: np.ndarray) -> np.ndarray:
+    pontos = pontos - pontos.max(axis=1, keepdims=True)
+    np.exp(pontos, out=pontos)
+    pontos /= pontos.sum(axis=1, keepdims=True)
+    return pontos
+
+
+# ===========================
+# MODELO LINEAR
+# ===========================
+class ClassificadorGenero:
+    """Regressão logística multinomial sobre características com hashing.
+
+    `pesos` tem forma (dimensao + 1, gêneros); a última linha é o viés. Carregado com
+    `carregar`, o array é um mmap: só as linhas das características presentes nos
+    textos são lidas do disco.
+    """
+
+    def __init__(self, pesos: np.ndarray, generos: Sequence[str], assinatura: Optional[str] = None):
+        if pesos.ndim != 2 or pesos.shape[1] != len(generos):
+            raise ValueError("pesos incompatíveis com a lista de gêneros")
+        self.pesos = pesos
+        self.generos = list(generos)
+        self.dimensao = pesos.shape[0] - 1
+        self._assinatura = assinatura
+
+    @property
+    def assinatura(self) -> str:
+        """Hash dos pesos e gêneros (gravado junto com o modelo; entra na chave do cache)."""
+        if self._assinatura is None:
+            h = hashlib.sha256("\x1f".join(self.generos).encode("utf-8"))
+            h.update(np.ascontiguousarray(self.pesos, dtype=np.float32).tobytes())
+            self._assinatura = h.hexdigest()[:16]
+        return self._assinatura
+
+    # ---------------------------
+    # predição
+    # ---------------------------
+    def probabilidades(self, textos: Sequence[str]) -> np.ndarray:
+        """Probabilidade de cada gênero (colunas, na ordem de `generos`) para cada texto."""
+        indices, valores, inicio = vetorizar(textos, self.dimensao)
+        pontos = _somar_linhas(self.pesos[indices] * valores[:, None], inicio)
+        pontos += self.pesos[self.dimensao]
+        return _softmax(pontos)
+
+    def prever_lote(self, textos: Sequence[str]) -> List[Tuple[str, float]]:
+        """(gênero mais provável, probabilidade) de cada texto."""
+        if not textos:
+            return []
+        prob = self.probabilidades(textos)
+        melhores = prob.argmax(axis=1)
+        return [(self.generos[g], float(prob[i, g])) for i, g in enumerate(melhores)]
+
+    def prever(self, texto: str) -> Tuple[str, float]:
+        return self.prever_lote([texto])[0]
+
+    # ---------------------------
+    # treino
+    # ---------------------------
+    @classmethod
+    def treinar(cls, textos: Sequence[str], rotulos: Sequence[str], dimensao: int = DIMENSAO_PADRAO,
+                epocas: int = 60, taxa: float = 0.5, regularizacao: float = 1e-4) -> "ClassificadorGenero":
+        """Ajusta os pesos por descida de gradiente (AdaGrad) na entropia cruzada.
+
+        Só as colunas de características presentes no corpus participam do treino; as
+        demais ficam com peso zero.
+        """
+        if len(textos) != len(rotulos) or not textos:
+            raise ValueError("é preciso ao menos um texto rotulado (e um rótulo por texto)")
+        generos = sorted(set(rotulos))
+        if len(generos) < 2:
+            raise ValueError("o treino precisa de textos de pelo menos dois gêneros")
+        indices, valores, inicio = vetorizar(textos, dimensao)
+        n = len(textos)
+        colunas, posicao = np.unique(indices, return_inverse=True)
+        linha_do_item = np.repeat(np.arange(n), np.diff(inicio))
+        alvo = np.zeros((n, len(generos)), dtype=np.float64)
+        alvo[np.arange(n), [generos.index(r) for r in rotulos]] = 1.0
+
+        w = np.zeros((len(colunas), len(generos)), dtype=np.float64)
+        vies = np.zeros(len(generos), dtype=np.float64)
+        acumulado_w = np.full_like(w, 1e-8)
+        acumulado_vies = np.full_like(vies, 1e-8)
+        for _ in range(epocas):
+            pontos = _somar_linhas(w[posicao] * valores[:, None], inicio) + vies
+            erro = (_softmax(pontos) - alvo) / n
+            por_item = erro[linha_do_item] * valores[:, None]
+            grad_w = np.empty_like(w)
+            for g in range(len(generos)):
+                grad_w[:, g] = np.bincount(posicao, weights=por_item[:, g], minlength=len(colunas))
+            grad_w += regularizacao * w
+            grad_vies = erro.sum(axis=0)
+            acumulado_w += grad_w * grad_w
+            acumulado_vies += grad_vies * grad_vies
+            w -= taxa * grad_w / np.sqrt(acumulado_w)
+            vies -= taxa * grad_vies / np.sqrt(acumulado_vies)
+
+        pesos = np.zeros((dimensao + 1, len(generos)), dtype=np.float32)
+        pesos[colunas] = w
+        pesos[dimensao] = vies
+        return cls(pesos, generos)
+
+    def acuracia(self, textos: Sequence[str], rotulos: Sequence[str]) -> float:
+        previstos = self.prever_lote(textos)
+        acertos = sum(1 for (g, _), r in zip(previstos, rotulos) if g == r)
+        return acertos / len(rotulos) if rotulos else 0.0
+
+    # ---------------------------
+    # persistência
+    # ---------------------------
+    def salvar(self, pasta: str):
+        os.makedirs(pasta, exist_ok=True)
+        np.save(os.path.join(pasta, ARQUIVO_PESOS), np.asarray(self.pesos, dtype=np.float32))
+        with open(os.path.join(pasta, ARQUIVO_METADADOS), "w", encoding="utf-8") as f:
+            json.dump({"versao": VERSAO_MODELO, "dimensao": self.dimensao, "generos": self.generos,
+                       "assinatura": self.assinatura}, f, indent=2, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, pasta: str) -> "ClassificadorGenero":
+        with open(os.path.join(pasta, ARQUIVO_METADADOS), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("versao") != VERSAO_MODELO:
+            raise ValueError(f"modelo de gênero na versão {meta.get('versao')}; esperada {VERSAO_MODELO}")
+        pesos = np.load(os.path.join(pasta, ARQUIVO_PESOS), mmap_mode="r")
+        if pesos.shape[0] != meta["dimensao"] + 1:
+            raise ValueError("pesos do modelo de gênero não correspondem aos metadados")
+        return cls(pesos, meta["generos"], meta.get("assinatura"))
+
+
+# ===========================
+# DETECTOR COM FALLBACK
+# ===========================
+class DetectorGeneroHibrido(DetectorGenero):
+    """Usa o classificador quando ele tem confiança; abaixo do limiar, a cascata de regras."""
+
+    def __init__(self, classificador: ClassificadorGenero, limiar: float = LIMIAR_CONFIANCA):
+        self.classificador = classificador
+        self.limiar = limiar
+
+    @property
+    def assinatura(self) -> str:
+        return f"{self.classificador.assinatura}@{self.limiar}"
+
+    def detectar(self, texto):
+        genero, confianca = self.classificador.prever(texto)
+        if confianca >= self.limiar:
+            return genero
+        return super().detectar(texto)
+
+    def detectar_lote(self, textos: Sequence[str]) -> List[Tuple[str, float, str]]:
+        """(gênero, confiança do modelo, origem) de cada texto; origem é "modelo" ou "regras"."""
+        resultado = []
+        for texto, (genero, confianca) in zip(textos, self.classificador.prever_lote(textos)):
+            if confianca >= self.limiar:
+                resultado.append((genero, confianca, "modelo"))
+            else:
+                resultado.append((super().detectar(texto), confianca, "regras"))
+        return resultado
+
+
+def carregar_detector(pasta: str, limiar: float = LIMIAR_CONFIANCA) -> DetectorGeneroHibrido:
+    return DetectorGeneroHibrido(ClassificadorGenero.carregar(pasta), limiar)
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+def ler_rotulados(pasta: str) -> Tuple[List[str], List[str]]:
+    """Textos e gêneros de uma pasta com uma subpasta (.txt dentro) por gênero."""
+    textos: List[str] = []
+    rotulos: List[str] = []
+    for nome in sorted(os.listdir(pasta)):
+        subpasta = os.path.join(pasta, nome)
+        if not os.path.isdir(subpasta):
+            continue
+        genero = normalizar_genero(nome)
+        for raiz, _, arquivos in os.walk(subpasta):
+            for arquivo in sorted(arquivos):
+                if arquivo.endswith(".txt"):
+                    with open(os.path.join(raiz, arquivo), "r", encoding="utf-8", errors="replace") as f:
+                        textos.append(f.read())
+                    rotulos.append(genero)
+    return textos, rotulos
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        from .lote import listar_arquivos
+    except Exception:
+        from lote import listar_arquivos
+
+    parser = argparse.ArgumentParser(description="Classificador de gênero por hashing de n-gramas.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p_treinar = sub.add_parser("treinar", help="treina com uma pasta rotulada (uma subpasta por gênero)")
+    p_treinar.add_argument("pasta")
+    p_treinar.add_argument("--modelo", required=True, help="pasta onde gravar o modelo")
+    p_treinar.add_argument("--dimensao", type=int, default=DIMENSAO_PADRAO)
+    p_treinar.add_argument("--epocas", type=int, default=60)
+    p_testar = sub.add_parser("testar", help="acurácia do modelo (e das regras) numa pasta rotulada")
+    p_testar.add_argument("pasta")
+    p_testar.add_argument("--modelo", required=True)
+    p_testar.add_argument("--limiar", type=float, default=LIMIAR_CONFIANCA)
+    p_prever = sub.add_parser("prever", help="gênero de cada .txt de um diretório (ou padrão glob)")
+    p_prever.add_argument("alvo")
+    p_prever.add_argument("--modelo", required=True)
+    p_prever.add_argument("--limiar", type=float, default=LIMIAR_CONFIANCA)
+    p_prever.add_argument("--recursivo", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.comando == "treinar":
+        textos, rotulos = ler_rotulados(args.pasta)
+        modelo = ClassificadorGenero.treinar(textos, rotulos, args.dimensao, args.epocas)
+        modelo.salvar(args.modelo)
+        print(f"{len(textos)} textos, gêneros: {', '.join(modelo.generos)}")
+        print(f"Acurácia no treino: {modelo.acuracia(textos, rotulos):.3f}. Modelo em: {args.modelo}")
+    elif args.comando == "testar":
+        textos, rotulos = ler_rotulados(args.pasta)
+        detector = carregar_detector(args.modelo, args.limiar)
+        regras = DetectorGenero()
+        resultado = detector.detectar_lote(textos)
+        n = len(textos) or 1
+        print(json.dumps({
+            "textos": len(textos),
+            "acuracia_modelo": round(detector.classificador.acuracia(textos, rotulos), 4),
+            "acuracia_hibrido": round(sum(g == r for (g, _, _), r in zip(resultado, rotulos)) / n, 4),
+            "acuracia_regras": round(sum(regras.detectar(t) == r for t, r in zip(textos, rotulos)) / n, 4),
+            "fracao_regras": round(sum(o == "regras" for _, _, o in resultado) / n, 4),
+        }, indent=2, ensure_ascii=False))
+    else:
+        arquivos = listar_arquivos(args.alvo, args.recursivo)
+        textos = []
+        for caminho in arquivos:
+            with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+                textos.append(f.read())
+        detector = carregar_detector(args.modelo, args.limiar)
+        for caminho, (genero, confianca, origem) in zip(arquivos, detector.detectar_lote(textos)):
+            print(json.dumps({"arquivo": caminho, "genero": genero, "confianca": round(confianca, 4),
+                              "origem": origem}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+# documento.py
+# Documento tokenizado uma única vez: frases, tokens e offsets compartilhados entre a
+# análise (AnalisadorBasico) e o feedback (_reescrever_frases_longas).
+#
+# Modelo de trechos: frases, parágrafos, linhas e tokens são pares (início, fim) de
+# offsets no texto original, guardados em arrays planos ([ini0, fim0, ini1, fim1, ...]);
+# as strings só são recortadas quando alguém lê o trecho, e as contagens de palavras
+# percorrem o próprio texto, sem criar substrings.
+
+import re
+from array import array
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+try:
+    # Prefer relative imports when used as a package
+    from .tokenizacao import BackendTokenizacao, obter_backend
+except Exception:
+    # Fallback for direct script execution
+    from tokenizacao import BackendTokenizacao, obter_backend
+
+_ULTIMO_TOKEN = re.compile(r"\S+\s*$")
+_PALAVRA = re.compile(r"\S+")
+# O Treebank do NLTK troca as aspas retas por `` e ''
+_ASPAS = re.compile(r"``|''|[\"“”]")
+
+
+# ===========================
+# TRECHOS (OFFSETS)
+# ===========================
+def contar_palavras(texto: str, inicio: int = 0, fim: Optional[int] = None,
+                    limite: Optional[int] = None) -> int:
+    """`len(texto[inicio:fim].split())` sem recortar o texto.
+
+    Com `limite`, para de contar assim que passa dele (devolve `limite + 1`).
+    """
+    if fim is None:
+        fim = len(texto)
+    n = 0
+    for _ in _PALAVRA.finditer(texto, inicio, fim):
+        n += 1
+        if limite is not None and n > limite:
+            break
+    return n
+
+
+def excede_palavras(texto: str, inicio: int, fim: int, limite: int) -> bool:
+    """True se `texto[inicio:fim]` tem mais de `limite` palavras."""
+    # mais de `limite` palavras ocupam pelo menos 2 * limite + 1 caracteres
+    if fim - inicio <= 2 * limite:
+        return False
+    return contar_palavras(texto, inicio, fim, limite) > limite
+
+
+@lru_cache(maxsize=8)
+def _linha_longa(limite: int):
+    # início de uma linha com mais de `limite` palavras (espaços sem quebra de linha entre elas)
+    return re.compile(r"^[^\S\n]*(?:\S+[^\S\n]+){%d}\S" % limite, re.M)
+
+
+def contar_linhas_longas(texto: str, limite: int) -> int:
+    """Quantas linhas de `texto.split("\\n")` têm mais de `limite` palavras, sem recortá-las."""
+    return sum(1 for _ in _linha_longa(limite).finditer(texto))
+
+
+def offsets_linhas(texto: str) -> array:
+    """Offsets das linhas de `texto` (os mesmos itens de `texto.split("\\n")`)."""
+    offsets = array("l")
+    inicio = 0
+    fim = texto.find("\n")
+    while fim >= 0:
+        offsets.append(inicio)
+        offsets.append(fim)
+        inicio = fim + 1
+        fim = texto.find("\n", inicio)
+    offsets.append(inicio)
+    offsets.append(len(texto))
+    return offsets
+
+
+def alinhar_tokens(texto: str, tokens: List[str], inicio: int, fim: int) -> array:
+    """Offsets de cada token de `texto[inicio:fim]`, na ordem.
+
+    Os tokens são procurados a partir do fim do anterior; as aspas convertidas pelo
+    Treebank (`` e '') casam com as aspas do texto. Um token sem correspondência literal
+    fica com um trecho vazio na posição atual.
+    """
+    offsets = array("l")
+    cursor = inicio
+    for token in tokens:
+        if token == "``" or token == "''":
+            m = _ASPAS.search(texto, cursor, fim)
+            ini, fim_token = (m.start(), m.end()) if m else (cursor, cursor)
+        else:
+            ini = texto.find(token, cursor, fim)
+            if ini < 0:
+                ini = fim_token = cursor
+            else:
+                fim_token = ini + len(token)
+        offsets.append(ini)
+        offsets.append(fim_token)
+        cursor = fim_token
+    return offsets
+
+
+class FatiasTexto(Sequence):
+    """Sequência somente-leitura de trechos de `texto` descritos por offsets (início, fim).
+
+    Cada item é recortado do texto apenas quando acessado.
+    """
+
+    __slots__ = ("_texto", "_offsets")
+
+    def __init__(self, texto: str, offsets: array):
+        self._texto = texto
+        self._offsets = offsets  # [ini0, fim0, ini1, fim1, ...]
+
+    def __len__(self) -> int:
+        return len(self._offsets) // 2
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("índice fora do intervalo")
+        return self._texto[self._offsets[2 * i]:self._offsets[2 * i + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        texto, o = self._texto, self._offsets
+        for i in range(0, len(o), 2):
+            yield texto[o[i]:o[i + 1]]
+
+    def offsets(self) -> Iterator[Tuple[int, int]]:
+        o = self._offsets
+        for i in range(0, len(o), 2):
+            yield o[i], o[i + 1]
+
+    def palavras(self, i: int, limite: Optional[int] = None) -> int:
+        """Palavras do item `i` (ver `contar_palavras`), sem recortá-lo."""
+        return contar_palavras(self._texto, self._offsets[2 * i], self._offsets[2 * i + 1], limite)
+
+    def excede_palavras(self, i: int, limite: int) -> bool:
+        return excede_palavras(self._texto, self._offsets[2 * i], self._offsets[2 * i + 1], limite)
+
+    def __eq__(self, outro) -> bool:
+        # igual a qualquer sequência com os mesmos trechos (inclusive a lista materializada)
+        if isinstance(outro, (FatiasTexto, list, tuple)):
+            return len(self) == len(outro) and all(a == b for a, b in zip(self, outro))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"FatiasTexto({list(self)!r})"
+
+
+def calcular_offsets(texto: str, frases: List[str]) -> List[Tuple[int, int]]:
+    """Posição (início, fim) de cada sentença em `texto`."""
+    offsets = []
+    cursor = 0
+    for f in frases:
+        # as sentenças do punkt são recortes do próprio texto, em ordem
+        inicio = texto.find(f, cursor)
+        if inicio < 0:
+            raise ValueError("sentença não encontrada no texto original")
+        fim = inicio + len(f)
+        offsets.append((inicio, fim))
+        cursor = fim
+    return offsets
+
+
+def corte_seguro(texto: str, offsets: List[Tuple[int, int]]) -> int:
+    """Quantas sentenças de `texto` já são definitivas quando mais texto vier depois.
+
+    O punkt decide cada quebra olhando o token atual e o seguinte; só as decisões no
+    último token (sem vizinho à direita) podem mudar quando o texto continua. A resposta
+    é o índice da última sentença que começa após um espaço e antes desse último token:
+    as anteriores são definitivas e o texto a partir dela deve ser retokenizado junto com
+    a continuação. Usado para tokenizar um texto em partes (parágrafos, blocos) com o
+    mesmo resultado de `sent_tokenize` sobre o texto inteiro.
+    """
+    m = _ULTIMO_TOKEN.search(texto)
+    limite = m.start() if m else len(texto)
+    for k in range(len(offsets) - 1, 0, -1):
+        inicio = offsets[k][0]
+        if inicio <= limite and texto[inicio - 1].isspace():
+            return k
+    return 0
+
+
+class DocumentoTokenizado:
+    """Resultado da tokenização de um texto.
+
+    - `frases`: sentenças como devolvidas por `sent_tokenize` (visão sobre `texto`)
+    - `tokens_por_frase`: tokens de cada sentença (mesma tokenização de `word_tokenize`)
+    - `offsets`: array plano com o (início, fim) de cada sentença em `texto`
+    - `inicio_tokens`: índice, em `tokens`, do primeiro token de cada sentença
+
+    As sentenças podem vir como strings (recortes do texto, cujos offsets são
+    calculados aqui) ou já como `offsets`; em ambos os casos só os offsets são guardados.
+    """
+
+    def __init__(self, texto: str, frases: Optional[List[str]], tokens_por_frase: List[List[str]],
+                 offsets: Optional[array] = None):
+        self.texto = texto
+        self.tokens_por_frase = tokens_por_frase
+        self._tokens: Optional[List[str]] = None
+        if offsets is None:
+            offsets = array("l")
+            for par in calcular_offsets(texto, frases):
+                offsets.extend(par)
+        self.offsets = offsets
+        self.frases = FatiasTexto(texto, offsets)
+        self.inicio_tokens: List[int] = []
+        total = 0
+        for tokens in tokens_por_frase:
+            self.inicio_tokens.append(total)
+            total += len(tokens)
+        self.num_tokens = total
+
+    @classmethod
+    def tokenizar(cls, texto: str,
+                  tokenizador: Union[None, str, BackendTokenizacao] = None) -> "DocumentoTokenizado":
+        """Tokeniza `texto` com o backend indicado (None = backend atual, ver tokenizacao.py)."""
+        backend = obter_backend(tokenizador)
+        frases = backend.sent_tokenize(texto)
+        # `word_tokenize(texto)` equivale a tokenizar cada sentença com preserve_line=True;
+        # fazemos isso uma vez por sentença para reaproveitar o resultado no feedback.
+        word_tokenize = backend.word_tokenize
+        tokens_por_frase = [word_tokenize(f, preserve_line=True) for f in frases]
+        return cls(texto, frases, tokens_por_frase)
+
+    def span_frase(self, i: int) -> Tuple[int, int]:
+        return self.offsets[2 * i], self.offsets[2 * i + 1]
+
+    @property
+    def offsets_frases(self) -> List[Tuple[int, int]]:
+        """(início, fim) de cada sentença, como lista de pares."""
+        return list(self.frases.offsets())
+
+    def offsets_tokens(self, i: int, ate: Optional[int] = None) -> array:
+        """Offsets (planos) dos tokens da sentença `i` no texto, alinhados sob demanda.
+
+        Com `ate`, alinha só os `ate` primeiros tokens.
+        """
+        inicio, fim = self.span_frase(i)
+        tokens = self.tokens_por_frase[i]
+        return alinhar_tokens(self.texto, tokens if ate is None else tokens[:ate], inicio, fim)
+
+    def frase_excede_palavras(self, i: int, limite: int) -> bool:
+        return excede_palavras(self.texto, self.offsets[2 * i], self.offsets[2 * i + 1], limite)
+
+    @property
+    def tokens(self) -> List[str]:
+        """Todos os tokens do texto, na ordem (equivale a `word_tokenize(texto)`)."""
+        if self._tokens is None:
+            self._tokens = [t for tokens in self.tokens_por_frase for t in tokens]
+        return self._tokens
+
+    def __len__(self) -> int:
+        return len(self.tokens_por_frase)
@@ -0,0 +1,391 @@
+# duplicatas.py
+# Detecção de redações quase idênticas num lote (e contra tudo o que já foi visto):
+# assinaturas MinHash sobre sequências de k palavras e LSH por bandas para achar os
+# pares candidatos sem comparar todos contra todos. As assinaturas ficam num banco
+# SQLite, de modo que cada nova redação é verificada sem recalcular as anteriores.
+
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AnalisadorBasico
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AnalisadorBasico
+
+# Primo logo acima de 2**32; com a, b e x (crc32) abaixo de 2**32, a*x + b cabe em 64 bits
+_PRIMO = np.uint64(4294967311)
+_MAX_32 = 2 ** 32 - 1
+# Shingles processados por vez no cálculo da assinatura (limita a memória em textos longos)
+_BLOCO_SHINGLES = 4096
+# Tamanho padrão da assinatura
+NUM_PERMUTACOES_PADRAO = 256
+# Probabilidade mínima de um par no limiar colidir em alguma banda
+RECALL_MINIMO = 0.99
+
+
+def _parametros_permutacoes(num_permutacoes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Coeficientes (a, b) das funções de hash, estáveis entre versões e máquinas."""
+    a, b = [], []
+    for i in range(num_permutacoes):
+        d = hashlib.blake2b(f"minhash:{i}".encode("ascii"), digest_size=16).digest()
+        a.append(int.from_bytes(d[:8], "little") % _MAX_32 + 1)
+        b.append(int.from_bytes(d[8:], "little") % _MAX_32)
+    return np.array(a, dtype=np.uint64), np.array(b, dtype=np.uint64)
+
+
+def bandas_para_limiar(limiar: float, num_permutacoes: int) -> Tuple[int, int]:
+    """(bandas, linhas) do LSH para `limiar`: o maior número de linhas por banda que ainda
+    faz um par no limiar colidir com probabilidade >= RECALL_MINIMO.
+
+    A concordância observada entre duas assinaturas oscila em torno da similaridade
+    (desvio sqrt(s(1-s)/num_permutacoes)); a conta usa o limiar menos dois desvios.
+    Mais linhas por banda sobem o limiar efetivo do LSH, (1/bandas)^(1/linhas), e cortam
+    os candidatos bem abaixo de `limiar` (redações diferentes sobre o mesmo tema).
+    """
+    s = max(0.01, limiar - 2 * math.sqrt(limiar * (1 - limiar) / num_permutacoes))
+    melhor = (num_permutacoes, 1)
+    for linhas in range(1, num_permutacoes + 1):
+        bandas = num_permutacoes // linhas
+        if 1 - (1 - s ** linhas) ** bandas < RECALL_MINIMO:
+            break
+        melhor = (bandas, linhas)
+    return melhor
+
+
+def shingles(palavras: List[str], k: int) -> List[str]:
+    """Sequências de k palavras (texto mais curto que k vira um único shingle)."""
+    if len(palavras) < k:
+        return [" ".join(palavras)] if palavras else []
+    return [" ".join(palavras[i:i + k]) for i in range(len(palavras) - k + 1)]
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def trechos_em_comum(palavras_a: List[str], palavras_b: List[str], k: int,
+                     maximo: int = 3) -> List[str]:
+    """Maiores trechos de `palavras_a` formados por shingles que também aparecem em `palavras_b`."""
+    em_b = set(shingles(palavras_b, k))
+    trechos: List[Tuple[int, int]] = []
+    inicio = None
+    n = max(0, len(palavras_a) - k + 1)
+    for i in range(n + 1):
+        comum = i < n and " ".join(palavras_a[i:i + k]) in em_b
+        if comum and inicio is None:
+            inicio = i
+        elif not comum and inicio is not None:
+            trechos.append((inicio, i - 1 + k))
+            inicio = None
+    trechos.sort(key=lambda t: t[1] - t[0], reverse=True)
+    return [" ".join(palavras_a[ini:fim]) for ini, fim in trechos[:maximo]]
+
+
+class ParDuplicado:
+    """Par de redações parecidas: similaridade (Jaccard dos shingles) e trechos em comum."""
+
+    __slots__ = ("id_a", "id_b", "similaridade", "similaridade_estimada", "trechos")
+
+    def __init__(self, id_a: str, id_b: str, similaridade: float,
+                 similaridade_estimada: float, trechos: List[str]):
+        self.id_a = id_a
+        self.id_b = id_b
+        self.similaridade = similaridade
+        self.similaridade_estimada = similaridade_estimada
+        self.trechos = trechos
+
+    def como_dict(self) -> Dict:
+        return {
+            "id_a": self.id_a,
+            "id_b": self.id_b,
+            "similaridade": round(self.similaridade, 4),
+            "similaridade_estimada": round(self.similaridade_estimada, 4),
+            "trechos": self.trechos,
+        }
+
+    def __repr__(self) -> str:
+        return f"ParDuplicado({self.id_a!r}, {self.id_b!r}, similaridade={self.similaridade:.2f})"
+
+
+class DetectorDuplicatas:
+    """MinHash + LSH com armazenamento opcional em SQLite.
+
+    - `k`: palavras por shingle
+    - `num_permutacoes`: tamanho da assinatura (padrão: 256); `bandas` divide a assinatura
+      para o LSH. Sem `bandas`, vale `bandas_para_limiar` (com 256 permutações e limiar 0,5:
+      85 bandas de 3 linhas; um par com similaridade 0,5 colide com probabilidade de ~99,99%
+      e um par com 0,1, de ~8%)
+    - `limiar`: similaridade mínima (Jaccard) para um par ser apontado
+    - `caminho`: banco SQLite com as assinaturas (None = somente memória); parâmetros não
+      informados seguem os que o banco usou ao ser criado
+    """
+
+    def __init__(self, caminho: Optional[str] = None, k: int = 5, num_permutacoes: Optional[int] = None,
+                 bandas: Optional[int] = None, limiar: float = 0.5):
+        self.k = k
+        self.limiar = limiar
+        self._db: Optional[sqlite3.Connection] = None
+        gravados = self._abrir(caminho) if caminho else {}
+        if num_permutacoes is None:
+            num_permutacoes = int(gravados.get("num_permutacoes", NUM_PERMUTACOES_PADRAO))
+        if bandas is None:
+            if gravados.get("num_permutacoes") == str(num_permutacoes) and "bandas" in gravados:
+                # as faixas gravadas só servem com o mesmo número de bandas
+                bandas = int(gravados["bandas"])
+            else:
+                bandas = bandas_para_limiar(limiar, num_permutacoes)[0]
+        if not 1 <= bandas <= num_permutacoes:
+            raise ValueError("bandas deve estar entre 1 e num_permutacoes")
+        self.num_permutacoes = num_permutacoes
+        # as bandas usam as primeiras bandas * linhas posições; a estimativa usa a assinatura toda
+        self.bandas = bandas
+        self.linhas = num_permutacoes // bandas
+        self._a, self._b = _parametros_permutacoes(num_permutacoes)
+        self._trava = threading.Lock()
+        # armazenamento em memória (usado quando não há banco)
+        self._faixas: List[Dict[int, List[str]]] = [{} for _ in range(bandas)]
+        self._assinaturas: Dict[str, np.ndarray] = {}
+        self._palavras: Dict[str, List[str]] = {}
+        if self._db is not None:
+            self._conferir_parametros(caminho, gravados)
+
+    # ---------------------------
+    # banco
+    # ---------------------------
+    def _abrir(self, caminho: str) -> Dict[str, str]:
+        """Abre (ou cria) o banco e devolve os parâmetros com que ele foi criado."""
+        pasta = os.path.dirname(os.path.abspath(caminho))
+        os.makedirs(pasta, exist_ok=True)
+        self._db = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS parametros (nome TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS assinaturas ("
+            " id TEXT PRIMARY KEY, assinatura BLOB NOT NULL, palavras BLOB NOT NULL, criado REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS faixas (banda INTEGER NOT NULL, chave INTEGER NOT NULL, id TEXT NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_faixas ON faixas(banda, chave)")
+        return dict(self._db.execute("SELECT nome, valor FROM parametros"))
+
+    def _conferir_parametros(self, caminho: str, gravados: Dict[str, str]):
+        parametros = {"k": str(self.k), "num_permutacoes": str(self.num_permutacoes), "bandas": str(self.bandas)}
+        if gravados and gravados != parametros:
+            self._db.close()
+            raise ValueError(f"o banco {caminho} foi criado com outros parâmetros: {gravados}")
+        self._db.executemany("INSERT OR IGNORE INTO parametros (nome, valor) VALUES (?, ?)",
+                             parametros.items())
+        self._db.commit()
+
+    def fechar(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        if self._db is not None:
+            return self._db.execute("SELECT COUNT(*) FROM assinaturas").fetchone()[0]
+        return len(self._assinaturas)
+
+    # ---------------------------
+    # assinaturas
+    # ---------------------------
+    def assinatura(self, palavras: List[str]) -> np.ndarray:
+        """Assinatura MinHash (num_permutacoes valores) dos shingles de `palavras`."""
+        hashes = np.array(
+            sorted({zlib.crc32(s.encode("utf-8")) for s in shingles(palavras, self.k)}),
+            dtype=np.uint64,
+        )
+        assinatura = np.full(self.num_permutacoes, np.iinfo(np.uint64).max, dtype=np.uint64)
+        a = self._a[:, None]
+        b = self._b[:, None]
+        for i in range(0, len(hashes), _BLOCO_SHINGLES):
+            bloco = hashes[None, i:i + _BLOCO_SHINGLES]
+            np.minimum(assinatura, ((a * bloco + b) % _PRIMO).min(axis=1), out=assinatura)
+        return assinatura
+
+    def _chaves_faixas(self, assinatura: np.ndarray) -> List[int]:
+        chaves = []
+        for banda in range(self.bandas):
+            trecho = assinatura[banda * self.linhas:(banda + 1) * self.linhas].tobytes()
+            d = hashlib.blake2b(trecho, digest_size=8).digest()
+            chaves.append(int.from_bytes(d, "little", signed=True))
+        return chaves
+
+    def _candidatos(self, chaves: List[int]) -> Set[str]:
+        candidatos: Set[str] = set()
+        if self._db is None:
+            for banda, chave in enumerate(chaves):
+                candidatos.update(self._faixas[banda].get(chave, ()))
+            return candidatos
+        for banda, chave in enumerate(chaves):
+            for (id_,) in self._db.execute(
+                "SELECT id FROM faixas WHERE banda = ? AND chave = ?", (banda, chave)
+            ):
+                candidatos.add(id_)
+        return candidatos
+
+    def _assinaturas_de(self, ids: List[str]) -> Iterator[Tuple[str, np.ndarray]]:
+        """(id, assinatura) dos candidatos; as palavras só são lidas para os que passam na estimativa."""
+        if self._db is None:
+            for id_ in ids:
+                yield id_, self._assinaturas[id_]
+            return
+        for i in range(0, len(ids), 500):
+            grupo = ids[i:i + 500]
+            marcadores = ", ".join("?" * len(grupo))
+            for id_, assinatura in self._db.execute(
+                f"SELECT id, assinatura FROM assinaturas WHERE id IN ({marcadores})", grupo
+            ).fetchall():
+                yield id_, np.frombuffer(assinatura, dtype=np.uint64)
+
+    def _palavras_de(self, id_: str) -> List[str]:
+        if self._db is None:
+            return self._palavras[id_]
+        (palavras,) = self._db.execute("SELECT palavras FROM assinaturas WHERE id = ?", (id_,)).fetchone()
+        return zlib.decompress(palavras).decode("utf-8").split(" ")
+
+    def _guardar(self, id_: str, assinatura: np.ndarray, palavras: List[str], chaves: List[int]):
+        if self._db is None:
+            self._assinaturas[id_] = assinatura
+            self._palavras[id_] = palavras
+            for banda, chave in enumerate(chaves):
+                self._faixas[banda].setdefault(chave, []).append(id_)
+            return
+        self._db.execute(
+            "INSERT INTO assinaturas (id, assinatura, palavras, criado) VALUES (?, ?, ?, ?)",
+            (id_, assinatura.tobytes(), zlib.compress(" ".join(palavras).encode("utf-8")), time.time()),
+        )
+        self._db.executemany(
+            "INSERT INTO faixas (banda, chave, id) VALUES (?, ?, ?)",
+            [(banda, chave, id_) for banda, chave in enumerate(chaves)],
+        )
+        self._db.commit()
+
+    def contem(self, id_: str) -> bool:
+        if self._db is None:
+            return id_ in self._assinaturas
+        return self._db.execute("SELECT 1 FROM assinaturas WHERE id = ?", (id_,)).fetchone() is not None
+
+    # ---------------------------
+    # API pública
+    # ---------------------------
+    def adicionar(self, id_: str, palavras: List[str]) -> List[ParDuplicado]:
+        """Compara a redação com todas as já guardadas e depois a guarda.
+
+        `palavras` são as palavras em minúsculas do texto (rel["palavras_minusculas"]).
+        Retorna os pares com similaridade >= limiar, do mais ao menos parecido.
+        """
+        palavras = [p for p in palavras if p]
+        if not palavras:
+            return []
+        assinatura = self.assinatura(palavras)
+        chaves = self._chaves_faixas(assinatura)
+        with self._trava:
+            if self.contem(id_):
+                raise ValueError(f"identificador já registrado: {id_}")
+            pares = []
+            meus_shingles: Optional[Set[str]] = None
+            for outro, assinatura_outro in self._assinaturas_de(sorted(self._candidatos(chaves))):
+                estimada = float(np.mean(assinatura == assinatura_outro))
+                # folga para o erro da estimativa antes da conferência exata
+                if estimada < self.limiar - 0.15:
+                    continue
+                palavras_outro = self._palavras_de(outro)
+                if meus_shingles is None:
+                    meus_shingles = set(shingles(palavras, self.k))
+                similaridade = jaccard(meus_shingles, set(shingles(palavras_outro, self.k)))
+                if similaridade >= self.limiar:
+                    pares.append(ParDuplicado(outro, id_, similaridade, estimada,
+                                              trechos_em_comum(palavras, palavras_outro, self.k)))
+            self._guardar(id_, assinatura, palavras, chaves)
+        pares.sort(key=lambda p: p.similaridade, reverse=True)
+        return pares
+
+    def verificar_lote(self, itens: Iterable[Tuple[str, List[str]]]) -> Iterator[ParDuplicado]:
+        """Adiciona cada (id, palavras) em ordem, gerando os pares encontrados."""
+        for id_, palavras in itens:
+            yield from self.adicionar(id_, palavras)
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+_ANALISADOR: Optional[AnalisadorBasico] = None
+
+
+def palavras_do_arquivo(caminho: str, encoding: str = "utf-8") -> Tuple[str, List[str]]:
+    """(caminho, palavras em minúsculas) de um .txt, com a tokenização do AnalisadorBasico."""
+    global _ANALISADOR
+    if _ANALISADOR is None:
+        _ANALISADOR = AnalisadorBasico()
+    with open(caminho, "r", encoding=encoding) as f:
+        texto = f.read()
+    return caminho, _ANALISADOR.analisar(texto)["palavras_minusculas"]
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        from .lote import listar_arquivos
+    except Exception:
+        from lote import listar_arquivos
+
+    parser = argparse.ArgumentParser(
+        description="Aponta redações quase idênticas (MinHash + LSH) num lote de arquivos .txt."
+    )
+    parser.add_argument("alvo", help="diretório com arquivos .txt ou padrão glob")
+    parser.add_argument("--banco", default=None,
+                        help="SQLite com as assinaturas já vistas (novas redações são comparadas a elas)")
+    parser.add_argument("--limiar", type=float, default=0.5, help="similaridade mínima (padrão: 0.5)")
+    parser.add_argument("--k", type=int, default=5, help="palavras por shingle (padrão: 5)")
+    parser.add_argument("--recursivo", action="store_true", help="inclui subdiretórios")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="processos para tokenizar (padrão: núcleos da máquina)")
+    parser.add_argument("--saida", default=None, help="grava os pares em JSONL (padrão: tela)")
+    args = parser.parse_args(argv)
+
+    detector = DetectorDuplicatas(args.banco, k=args.k, limiar=args.limiar)
+    arquivos = [a for a in listar_arquivos(args.alvo, args.recursivo) if not detector.contem(a)]
+    processos = max(1, min(args.processos or os.cpu_count() or 1, len(arquivos) or 1))
+    saida = open(args.saida, "w", encoding="utf-8") if args.saida else None
+    total = 0
+    try:
+        if processos == 1:
+            itens = map(palavras_do_arquivo, arquivos)
+            pares = list(detector.verificar_lote(itens))
+        else:
+            with multiprocessing.Pool(processes=processos) as pool:
+                itens = pool.imap(palavras_do_arquivo, arquivos, chunksize=8)
+                pares = list(detector.verificar_lote(itens))
+        for par in pares:
+            linha = json.dumps(par.como_dict(), ensure_ascii=False)
+            if saida:
+                saida.write(linha + "\n")
+            else:
+                print(linha)
+            total += 1
+    finally:
+        if saida:
+            saida.close()
+        detector.fechar()
+    print(f"{len(arquivos)} arquivos novos verificados; {total} pares acima de {args.limiar}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,347 @@
+# estatisticas_turma.py
+# Médias, desvios e percentis da turma por critério (`pontuar_e_gerar_feedback()["detalhe"]`)
+# e por métrica do AnalisadorBasico, calculados em fluxo: cada avaliação atualiza momentos
+# correntes (Welford), mínimo, máximo e um histograma de faixas fixas, sem guardar os
+# relatórios. Agregados de processos ou execuções diferentes se combinam com `juntar`
+# (momentos pela fórmula de Chan, histogramas somando faixas) e o estado inteiro cabe num
+# JSON pequeno, usado como checkpoint de lotes longos.
+#
+#   python -m data.lote turma/ --estatisticas-turma turma.json
+#   python -m data.lote turma/ --estatisticas-turma turma.json --retomar   # após uma interrupção
+#   python -m data.estatisticas_turma resultados_lote.jsonl --juntar turma_b.json
+
+import argparse
+import bisect
+import json
+import math
+import os
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    # Prefer relative imports when used as a package
+    from .historico import CRITERIOS, METRICAS
+except Exception:
+    # Fallback for direct script execution
+    from historico import CRITERIOS, METRICAS
+
+# Limites superiores das faixas de cada campo; a última faixa é aberta. Campos discretos
+# (notas) têm uma faixa por valor possível, o que torna seus percentis exatos.
+FAIXAS: Dict[str, Sequence[float]] = {
+    "nota_final": tuple(range(-1, 11)),
+    **{criterio: (0, 1, 2) for criterio in CRITERIOS},
+    "num_palavras": tuple(range(50, 2001, 50)),
+    "num_frases": tuple(range(5, 201, 5)),
+    "media_palavras_por_frase": tuple(range(1, 61)),
+    "variedade_vocabulario": tuple(range(2, 101, 2)),
+    "vocabulario_unico": tuple(range(25, 1001, 25)),
+    "num_paragrafos": tuple(range(1, 31)),
+}
+DISCRETOS = frozenset(("nota_final", "num_paragrafos") + CRITERIOS)
+CAMPOS = ("nota_final",) + CRITERIOS + METRICAS
+
+# Percentis mostrados no resumo
+PERCENTIS = (10, 25, 50, 75, 90)
+
+# Avaliações entre dois checkpoints gravados pelo lote
+CHECKPOINT_A_CADA = 200
+
+
+# ===========================
+# MOMENTOS DE UM CAMPO
+# ===========================
+class MomentosCorrentes:
+    """Contagem, média, soma dos quadrados dos desvios (M2), extremos e histograma de um campo.
+
+    `adicionar` é O(1) (a faixa sai de uma busca binária em limites fixos) e `juntar`
+    produz o mesmo estado que teria sido obtido vendo todos os valores num só agregador.
+    """
+
+    __slots__ = ("limites", "discreto", "n", "media", "m2", "minimo", "maximo", "faixas")
+
+    def __init__(self, limites: Sequence[float], discreto: bool = False):
+        self.limites = tuple(limites)
+        self.discreto = discreto
+        self.n = 0
+        self.media = 0.0
+        self.m2 = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.faixas = [0] * (len(self.limites) + 1)
+
+    def adicionar(self, valor: float):
+        self.n += 1
+        delta = valor - self.media
+        self.media += delta / self.n
+        self.m2 += delta * (valor - self.media)
+        if valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+        self.faixas[bisect.bisect_left(self.limites, valor)] += 1
+
+    def juntar(self, outro: "MomentosCorrentes") -> "MomentosCorrentes":
+        if outro.limites != self.limites:
+            raise ValueError("momentos com faixas diferentes")
+        if not outro.n:
+            return self
+        n = self.n + outro.n
+        delta = outro.media - self.media
+        self.media += delta * outro.n / n
+        self.m2 += outro.m2 + delta * delta * self.n * outro.n / n
+        self.n = n
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.faixas = [a + b for a, b in zip(self.faixas, outro.faixas)]
+        return self
+
+    @property
+    def variancia(self) -> float:
+        """Variância amostral (n - 1); 0 com menos de dois valores."""
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def desvio(self) -> float:
+        return math.sqrt(self.variancia)
+
+    def percentil(self, p: float) -> float:
+        """Percentil `p` (0-100) pelo histograma.
+
+        Nos campos discretos é o valor exato; nos contínuos, interpolação linear dentro
+        da faixa, com erro menor que a largura dela.
+        """
+        if not self.n:
+            return 0.0
+        alvo = self.n * p / 100
+        acumulado = 0
+        for i, n in enumerate(self.faixas):
+            if not n or acumulado + n < alvo:
+                acumulado += n
+                continue
+            inferior = self.limites[i - 1] if i > 0 else self.minimo
+            superior = self.limites[i] if i < len(self.limites) else self.maximo
+            inferior, superior = max(inferior, self.minimo), min(superior, self.maximo)
+            if self.discreto:
+                return superior
+            return inferior + (superior - inferior) * (alvo - acumulado) / n
+        return self.maximo
+
+    def resumo(self) -> Dict:
+        if not self.n:
+            return {"n": 0}
+        saida = {
+            "n": self.n,
+            "media": round(self.media, 3),
+            "desvio": round(self.desvio, 3),
+            "minimo": self.minimo,
+            "maximo": self.maximo,
+        }
+        for p in PERCENTIS:
+            saida["mediana" if p == 50 else f"p{p}"] = round(self.percentil(p), 2)
+        return saida
+
+    def como_dict(self) -> Dict:
+        return {
+            "n": self.n, "media": self.media, "m2": self.m2,
+            "minimo": self.minimo if self.n else None,
+            "maximo": self.maximo if self.n else None,
+            "limites": list(self.limites), "discreto": self.discreto,
+            "faixas": list(self.faixas),
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> "MomentosCorrentes":
+        momentos = cls(dados["limites"], dados.get("discreto", False))
+        if len(dados["faixas"]) != len(momentos.faixas):
+            raise ValueError("número de faixas não corresponde aos limites")
+        momentos.n = dados["n"]
+        momentos.media = dados["media"]
+        momentos.m2 = dados["m2"]
+        if momentos.n:
+            momentos.minimo = dados["minimo"]
+            momentos.maximo = dados["maximo"]
+        momentos.faixas = list(dados["faixas"])
+        return momentos
+
+
+# ===========================
+# AGREGADOR DA TURMA
+# ===========================
+class EstatisticasTurma:
+    """Estatísticas correntes da turma para a nota final, os critérios e as métricas.
+
+        estat = EstatisticasTurma()
+        for registro in avaliar_lote(arquivos):
+            estat.adicionar_registro(registro)
+        estat.resumo()  # {"avaliacoes": ..., "campos": {"clareza": {"media": ..., ...}}}
+
+    A memória não cresce com o número de avaliações. Sem tema, o feedback dá adequação 2
+    a qualquer texto; por isso registros de lotes sem tema ficam fora desse critério.
+    """
+
+    def __init__(self):
+        self.avaliacoes = 0
+        self.erros = 0
+        # último arquivo contado; o lote retoma a partir dele (a lista de arquivos é ordenada)
+        self.ultimo_arquivo: Optional[str] = None
+        # tamanho da saída do lote quando o estado foi gravado (o que vier depois é refeito)
+        self.bytes_saida: Optional[int] = None
+        self.campos: Dict[str, MomentosCorrentes] = {
+            campo: MomentosCorrentes(FAIXAS[campo], campo in DISCRETOS) for campo in CAMPOS
+        }
+
+    def adicionar_registro(self, registro: Dict, tema: Optional[str] = None):
+        """Conta uma avaliação no formato de `lote.montar_registro` ou `gravador.resumo_relatorio`.
+
+        `tema` é o tema do lote (o de `registro["tema"]` quando omitido); vazio deixa a
+        adequação de fora. Sem nenhum dos dois a adequação é contada.
+        """
+        if registro.get("arquivo"):
+            self.ultimo_arquivo = registro["arquivo"]
+        if "erro" in registro or "nota_final" not in registro:
+            self.erros += 1
+            return
+        self.avaliacoes += 1
+        if tema is None:
+            tema = registro.get("tema")
+        sem_tema = tema is not None and not tema.strip()
+        campos = self.campos
+        campos["nota_final"].adicionar(registro["nota_final"])
+        detalhe = registro.get("detalhe") or {}
+        for criterio in CRITERIOS:
+            valor = detalhe.get(criterio)
+            if valor is None or (criterio == "adequacao" and sem_tema):
+                continue
+            campos[criterio].adicionar(valor)
+        metricas = registro.get("metricas") or {}
+        for metrica in METRICAS:
+            valor = metricas.get(metrica)
+            if valor is not None:
+                campos[metrica].adicionar(valor)
+
+    def adicionar(self, rel, fb: Dict, arquivo: Optional[str] = None):
+        """Conta uma avaliação a partir do relatório do avaliador e do feedback."""
+        self.adicionar_registro({
+            "tema": rel.get("tema"),
+            "arquivo": arquivo,
+            "nota_final": fb["nota_final"],
+            "detalhe": fb["detalhe"],
+            "metricas": {m: rel.get(m) for m in METRICAS},
+        })
+
+    def adicionar_registros(self, registros: Iterable[Dict], tema: Optional[str] = None) -> "EstatisticasTurma":
+        for registro in registros:
+            self.adicionar_registro(registro, tema)
+        return self
+
+    def juntar(self, outro: "EstatisticasTurma") -> "EstatisticasTurma":
+        self.avaliacoes += outro.avaliacoes
+        self.erros += outro.erros
+        for campo, momentos in outro.campos.items():
+            if campo in self.campos:
+                self.campos[campo].juntar(momentos)
+            else:
+                self.campos[campo] = MomentosCorrentes.de_dict(momentos.como_dict())
+        return self
+
+    def resumo(self) -> Dict:
+        return {
+            "avaliacoes": self.avaliacoes,
+            "erros": self.erros,
+            "campos": {campo: momentos.resumo() for campo, momentos in self.campos.items()},
+        }
+
+    # ---------------------------
+    # serialização (checkpoint)
+    # ---------------------------
+    def como_dict(self) -> Dict:
+        return {
+            "avaliacoes": self.avaliacoes,
+            "erros": self.erros,
+            "ultimo_arquivo": self.ultimo_arquivo,
+            "bytes_saida": self.bytes_saida,
+            "campos": {campo: momentos.como_dict() for campo, momentos in self.campos.items()},
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> "EstatisticasTurma":
+        estat = cls()
+        estat.avaliacoes = dados["avaliacoes"]
+        estat.erros = dados.get("erros", 0)
+        estat.ultimo_arquivo = dados.get("ultimo_arquivo")
+        estat.bytes_saida = dados.get("bytes_saida")
+        for campo, momentos in dados["campos"].items():
+            estat.campos[campo] = MomentosCorrentes.de_dict(momentos)
+        return estat
+
+    def salvar(self, caminho: str):
+        """Grava o estado num arquivo temporário e o troca de lugar: um checkpoint
+        interrompido no meio nunca deixa o anterior corrompido."""
+        temporario = caminho + ".tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False)
+        os.replace(temporario, caminho)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "EstatisticasTurma":
+        with open(caminho, "r", encoding="utf-8") as f:
+            return cls.de_dict(json.load(f))
+
+
+def ler_registros_jsonl(caminho: str) -> Iterable[Dict]:
+    """Lê um JSONL do lote uma linha por vez (linhas em branco são ignoradas)."""
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+def imprimir_resumo(resumo: Dict):
+    print(f"Avaliações: {resumo['avaliacoes']} (erros: {resumo['erros']})")
+    print(f"{'campo':<26}{'n':>6}{'média':>9}{'desvio':>9}{'mín':>8}{'p25':>8}"
+          f"{'mediana':>9}{'p75':>8}{'máx':>8}")
+    for campo, dados in resumo["campos"].items():
+        if not dados["n"]:
+            continue
+        print(f"{campo:<26}{dados['n']:>6}{dados['media']:>9}{dados['desvio']:>9}{dados['minimo']:>8}"
+              f"{dados['p25']:>8}{dados['mediana']:>9}{dados['p75']:>8}{dados['maximo']:>8}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Médias, desvios e percentis da turma a partir de resultados do lote (JSONL)."
+    )
+    parser.add_argument("resultados", nargs="*", default=[], help="arquivos JSONL gerados por data.lote")
+    parser.add_argument("--juntar", nargs="*", default=[], metavar="ESTADO_JSON",
+                        help="estados gravados antes (--salvar ou --estatisticas-turma do lote)")
+    parser.add_argument("--salvar", default=None, metavar="ESTADO_JSON",
+                        help="grava o estado combinado para juntá-lo a lotes futuros")
+    parser.add_argument("--saida", default=None, help="grava o resumo em JSON")
+    parser.add_argument("--tema", default=None,
+                        help="tema usado no lote (o JSONL do lote não o repete); com --tema '' "
+                             "a adequação fica de fora")
+    args = parser.parse_args(argv)
+
+    if not args.resultados and not args.juntar:
+        parser.error("informe ao menos um JSONL de resultados ou um estado em --juntar")
+
+    estat = EstatisticasTurma()
+    for caminho in args.resultados:
+        estat.adicionar_registros(ler_registros_jsonl(caminho), args.tema)
+    for caminho in args.juntar:
+        estat.juntar(EstatisticasTurma.carregar(caminho))
+
+    resumo = estat.resumo()
+    imprimir_resumo(resumo)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, indent=2, ensure_ascii=False)
+    if args.salvar:
+        estat.salvar(args.salvar)
+        print(f"Estado gravado em: {args.salvar}")
+
+
+if __name__ == "__main__":
+    main()
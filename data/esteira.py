@@ -0,0 +1,482 @@
+# esteira.py
+# Avaliação de uma pasta inteira em estágios concorrentes: threads de leitura trazem os
+# arquivos do disco antes da hora (com fallback de codificação), um pool de processos
+# avalia os textos e o estágio de gravação escreve os resultados (e, se pedido, um
+# relatório .txt por arquivo). Os estágios são ligados por filas limitadas: um estágio
+# lento segura os anteriores (contrapressão) em vez de acumular textos na memória, e a
+# leitura/gravação em discos lentos ou de rede se sobrepõe ao processamento.
+#
+# Contadores por estágio (itens, tempo ocupado, vazão) e por fila (profundidade, esperas
+# com a fila cheia ou vazia) mostram qual estágio é o gargalo.
+#
+#   python -m data.esteira /mnt/turma --saida notas.jsonl --leitores 8 --estatisticas esteira.json
+
+import argparse
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .gravador import FORMATOS, GravadorRelatorios, formatar_txt, resumo_relatorio
+    from .lote import (
+        GENERO_PADRAO,
+        GENEROS_VALIDOS,
+        avaliar_no_processo,
+        iniciar_trabalhador,
+        listar_arquivos,
+        montar_registro,
+    )
+    from .tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend
+except Exception:
+    # Fallback for direct script execution
+    from gravador import FORMATOS, GravadorRelatorios, formatar_txt, resumo_relatorio
+    from lote import (
+        GENERO_PADRAO,
+        GENEROS_VALIDOS,
+        avaliar_no_processo,
+        iniciar_trabalhador,
+        listar_arquivos,
+        montar_registro,
+    )
+    from tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend
+
+# Codificações tentadas, em ordem; latin-1 aceita qualquer sequência de bytes
+CODIFICACOES = ("utf-8", "cp1252", "latin-1")
+LEITORES_PADRAO = 4
+# Itens em cada fila entre estágios (e, portanto, arquivos lidos/avaliados à frente)
+PROFUNDIDADE_PADRAO = 32
+
+_FIM = object()
+
+
+# ===========================
+# LEITURA COM FALLBACK DE CODIFICAÇÃO
+# ===========================
+def ler_texto(caminho: str, codificacoes: Sequence[str] = CODIFICACOES) -> Tuple[str, str, int]:
+    """(texto, codificação usada, bytes lidos) de um arquivo.
+
+    Tenta cada codificação em ordem; o BOM do UTF-8 é descartado e as quebras de linha
+    ficam como na leitura em modo texto ("\\r\\n" e "\\r" viram "\\n").
+    """
+    with open(caminho, "rb") as f:
+        dados = f.read()
+    for codificacao in codificacoes:
+        try:
+            texto = dados.decode(codificacao)
+            break
+        except UnicodeDecodeError:
+            continue
+    else:
+        codificacao = codificacoes[-1]
+        texto = dados.decode(codificacao, errors="replace")
+    if texto.startswith("\ufeff"):
+        texto = texto[1:]
+    if "\r" in texto:
+        texto = texto.replace("\r\n", "\n").replace("\r", "\n")
+    return texto, codificacao, len(dados)
+
+
+# ===========================
+# CONTADORES
+# ===========================
+class EstatisticasEstagio:
+    """Itens, erros, bytes e tempo ocupado de um estágio (somados entre as suas threads)."""
+
+    def __init__(self, nome: str, paralelismo: int = 1):
+        self.nome = nome
+        self.paralelismo = max(1, paralelismo)
+        self.itens = 0
+        self.erros = 0
+        self.bytes = 0
+        self.ocupado_s = 0.0
+        self._trava = threading.Lock()
+
+    def registrar(self, segundos: float, bytes_: int = 0, erro: bool = False):
+        with self._trava:
+            self.itens += 1
+            self.erros += erro
+            self.bytes += bytes_
+            self.ocupado_s += segundos
+
+    def como_dict(self, duracao: float) -> Dict:
+        return {
+            "itens": self.itens,
+            "erros": self.erros,
+            "bytes": self.bytes,
+            "ocupado_s": round(self.ocupado_s, 3),
+            "itens_por_s": round(self.itens / duracao, 2) if duracao else 0.0,
+            # fração do tempo em que as `paralelismo` threads/processos estiveram ocupados
+            "ocupacao": round(self.ocupado_s / (duracao * self.paralelismo), 3) if duracao else 0.0,
+        }
+
+
+class FilaMedida(queue.Queue):
+    """Fila limitada que mede a profundidade e quanto os produtores/consumidores esperaram.
+
+    Esperas com a fila cheia indicam que o estágio seguinte é o gargalo; com a fila
+    vazia, o anterior.
+    """
+
+    def __init__(self, nome: str, maxsize: int):
+        super().__init__(maxsize)
+        self.nome = nome
+        self.max_profundidade = 0
+        self.esperas_cheia = 0
+        self.espera_cheia_s = 0.0
+        self.esperas_vazia = 0
+        self.espera_vazia_s = 0.0
+        self._soma_profundidade = 0
+        self._amostras = 0
+
+    def put(self, item, block=True, timeout=None):
+        try:
+            super().put(item, block=False)
+        except queue.Full:
+            if not block:
+                raise
+            inicio = time.perf_counter()
+            super().put(item, True, timeout)
+            self.esperas_cheia += 1
+            self.espera_cheia_s += time.perf_counter() - inicio
+        profundidade = self.qsize()
+        self.max_profundidade = max(self.max_profundidade, profundidade)
+        self._soma_profundidade += profundidade
+        self._amostras += 1
+
+    def get(self, block=True, timeout=None):
+        try:
+            return super().get(block=False)
+        except queue.Empty:
+            if not block:
+                raise
+            inicio = time.perf_counter()
+            item = super().get(True, timeout)
+            self.esperas_vazia += 1
+            self.espera_vazia_s += time.perf_counter() - inicio
+            return item
+
+    def como_dict(self) -> Dict:
+        return {
+            "capacidade": self.maxsize,
+            "max_profundidade": self.max_profundidade,
+            "profundidade_media": round(self._soma_profundidade / self._amostras, 2) if self._amostras else 0.0,
+            "esperas_cheia": self.esperas_cheia,
+            "espera_cheia_s": round(self.espera_cheia_s, 3),
+            "esperas_vazia": self.esperas_vazia,
+            "espera_vazia_s": round(self.espera_vazia_s, 3),
+        }
+
+
+# ===========================
+# TAREFA DO PROCESSO AVALIADOR
+# ===========================
+def avaliar_lido(caminho: str, texto: str, tema: str = "", genero: Optional[str] = None,
+                 genero_padrao: str = GENERO_PADRAO,
+                 com_relatorio: bool = False) -> Tuple[Dict, Optional[Dict], float]:
+    """(registro, resumo para o .txt ou None, segundos) de um texto já lido do disco.
+
+    O registro é o mesmo de `lote.avaliar_arquivo`.
+    """
+    inicio = time.perf_counter()
+    registro: Dict = {"arquivo": caminho}
+    resumo = None
+    try:
+        if not texto.strip():
+            registro["erro"] = "arquivo vazio"
+        else:
+            rel, fb = avaliar_no_processo(texto, tema, genero, genero_padrao)
+            registro.update(montar_registro(rel, fb))
+            if com_relatorio:
+                resumo = resumo_relatorio(rel, fb, tema, caminho)
+    except Exception as e:
+        registro["erro"] = f"{type(e).__name__}: {e}"
+    return registro, resumo, time.perf_counter() - inicio
+
+
+# ===========================
+# ESTEIRA
+# ===========================
+class EsteiraAvaliacao:
+    """Leitura (threads) → avaliação (processos) → gravação, ligadas por filas limitadas.
+
+    - `leitores`: threads de leitura; em discos de rede, mais leitores escondem a latência
+    - `profundidade`: capacidade de cada fila entre estágios
+    - `pasta_relatorios`: grava também um relatório .txt por arquivo (relativo a `raiz`)
+
+    Os resultados saem na ordem de `arquivos`.
+    """
+
+    def __init__(self, tema: str = "", genero: Optional[str] = None, genero_padrao: str = GENERO_PADRAO,
+                 processos: Optional[int] = None, leitores: int = LEITORES_PADRAO,
+                 profundidade: int = PROFUNDIDADE_PADRAO, caminho_cache: Optional[str] = None,
+                 modelo_genero: Optional[str] = None, confianca_genero: Optional[float] = None,
+                 pasta_relatorios: Optional[str] = None, raiz: Optional[str] = None):
+        self.tema = tema
+        self.genero = genero
+        self.genero_padrao = genero_padrao
+        self.processos = max(1, processos or os.cpu_count() or 1)
+        self.leitores = max(1, leitores)
+        self.profundidade = max(1, profundidade)
+        self.caminho_cache = caminho_cache
+        self.modelo_genero = modelo_genero
+        self.confianca_genero = confianca_genero
+        self.pasta_relatorios = pasta_relatorios
+        self.raiz = raiz
+        self.leitura = EstatisticasEstagio("leitura", self.leitores)
+        self.avaliacao = EstatisticasEstagio("avaliacao", self.processos)
+        self.gravacao = EstatisticasEstagio("gravacao")
+        self.lidos = FilaMedida("lidos", self.profundidade)
+        self.avaliados = FilaMedida("avaliados", self.profundidade)
+        self._inicio = 0.0
+        self._fim: Optional[float] = None
+        self._cancelar = threading.Event()
+        self._despacho_encerrado = threading.Event()
+
+    # ---------------------------
+    # estágios
+    # ---------------------------
+    def _ler(self, caminho: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """(texto, codificação, erro), executado nas threads de leitura."""
+        inicio = time.perf_counter()
+        try:
+            texto, codificacao, tamanho = ler_texto(caminho)
+        except Exception as e:
+            self.leitura.registrar(time.perf_counter() - inicio, erro=True)
+            return None, None, f"{type(e).__name__}: {e}"
+        self.leitura.registrar(time.perf_counter() - inicio, tamanho)
+        return texto, codificacao, None
+
+    def _estagio_leitura(self, arquivos: List[str], leitores: ThreadPoolExecutor):
+        try:
+            for caminho in arquivos:
+                if self._cancelar.is_set():
+                    break
+                # put bloqueia com a fila cheia: a leitura não passa muito à frente da avaliação
+                self.lidos.put((caminho, leitores.submit(self._ler, caminho)))
+        finally:
+            # se o despacho já terminou ninguém mais lê a fila: não esperar por espaço para sempre
+            while not self._despacho_encerrado.is_set():
+                try:
+                    self.lidos.put(_FIM, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def _estagio_despacho(self, executor):
+        """Envia cada texto lido ao pool, na ordem; a fila `avaliados` limita os que estão em andamento.
+
+        Se o pool quebrar (um processo avaliador morreu), este e os demais arquivos viram
+        registros de erro; a fila `lidos` continua sendo consumida até o fim.
+        """
+        com_relatorio = self.pasta_relatorios is not None
+        quebrado: Optional[str] = None
+        try:
+            while True:
+                item = self.lidos.get()
+                if item is _FIM:
+                    return
+                caminho, leitura = item
+                if self._cancelar.is_set():
+                    continue
+                texto, codificacao, erro = leitura.result()
+                if erro is None and quebrado is None:
+                    try:
+                        futuro = executor.submit(avaliar_lido, caminho, texto, self.tema, self.genero,
+                                                 self.genero_padrao, com_relatorio)
+                    except Exception as e:  # BrokenProcessPool, executor já encerrado...
+                        quebrado = f"{type(e).__name__}: {e}"
+                    else:
+                        self.avaliados.put((caminho, codificacao, futuro))
+                        continue
+                erro = erro or quebrado
+                self.avaliados.put((caminho, codificacao, ({"arquivo": caminho, "erro": erro}, None, 0.0)))
+        except BaseException:
+            # falha inesperada: interrompe a leitura e esvazia `lidos` para ela poder terminar
+            self._cancelar.set()
+            while self.lidos.get() is not _FIM:
+                pass
+            raise
+        finally:
+            self._despacho_encerrado.set()
+            self.avaliados.put(_FIM)
+
+    def _gravar_relatorio(self, caminho: str, resumo: Dict):
+        relativo = os.path.relpath(caminho, self.raiz) if self.raiz else os.path.basename(caminho)
+        destino = os.path.join(self.pasta_relatorios, os.path.splitext(relativo)[0] + "_relatorio.txt")
+        os.makedirs(os.path.dirname(destino) or ".", exist_ok=True)
+        with open(destino, "w", encoding="utf-8") as f:
+            f.write(formatar_txt(resumo))
+
+    def _estagio_gravacao(self, gravador: GravadorRelatorios):
+        while True:
+            item = self.avaliados.get()
+            if item is _FIM:
+                return
+            caminho, codificacao, resultado = item
+            if isinstance(resultado, Future):
+                try:
+                    resultado = resultado.result()
+                except Exception as e:  # processo avaliador morreu, etc.
+                    resultado = ({"arquivo": caminho, "erro": f"{type(e).__name__}: {e}"}, None, 0.0)
+            registro, resumo, segundos = resultado
+            if segundos:
+                self.avaliacao.registrar(segundos, erro="erro" in registro)
+            if codificacao and codificacao != CODIFICACOES[0]:
+                registro["codificacao"] = codificacao
+            inicio = time.perf_counter()
+            if gravador.formato != "jsonl":
+                # CSV e .txt mostram o tema em cada relatório
+                registro = dict(registro, tema=self.tema)
+            gravador.escrever(registro)
+            if resumo is not None:
+                self._gravar_relatorio(caminho, resumo)
+            self.gravacao.registrar(time.perf_counter() - inicio)
+
+    # ---------------------------
+    # execução
+    # ---------------------------
+    def _criar_executor(self):
+        iniciais = (self.caminho_cache, self.modelo_genero, self.confianca_genero)
+        if self.processos > 1:
+            return ProcessPoolExecutor(max_workers=self.processos, initializer=iniciar_trabalhador,
+                                       initargs=iniciais)
+        # um único processo: a avaliação roda numa thread para leitura e gravação seguirem adiante
+        iniciar_trabalhador(*iniciais)
+        return ThreadPoolExecutor(max_workers=1)
+
+    def executar(self, arquivos: Sequence[str], gravador: GravadorRelatorios) -> Dict:
+        """Avalia `arquivos` e grava um registro por arquivo; devolve as estatísticas."""
+        arquivos = list(arquivos)
+        self._inicio = time.perf_counter()
+        self._fim = None
+        self._cancelar.clear()
+        self._despacho_encerrado.clear()
+        executor = self._criar_executor()
+        leitores = ThreadPoolExecutor(max_workers=self.leitores, thread_name_prefix="esteira-leitura")
+        threads = [
+            threading.Thread(target=self._estagio_leitura, args=(arquivos, leitores),
+                             name="esteira-leitura", daemon=True),
+            threading.Thread(target=self._estagio_despacho, args=(executor,),
+                             name="esteira-despacho", daemon=True),
+        ]
+        for t in threads:
+            t.start()
+        try:
+            # a gravação roda nesta thread; ela consome tudo, então as outras sempre terminam
+            self._estagio_gravacao(gravador)
+        except BaseException:
+            # interrompe a leitura e esvazia a fila para as outras threads poderem terminar
+            self._cancelar.set()
+            while self.avaliados.get() is not _FIM:
+                pass
+            raise
+        finally:
+            for t in threads:
+                t.join()
+            leitores.shutdown()
+            executor.shutdown()
+            self._fim = time.perf_counter()
+        return self.estatisticas()
+
+    def estatisticas(self) -> Dict:
+        duracao = (self._fim or time.perf_counter()) - self._inicio
+        estagios = {e.nome: e.como_dict(duracao) for e in (self.leitura, self.avaliacao, self.gravacao)}
+        return {
+            "duracao_s": round(duracao, 3),
+            "estagios": estagios,
+            "filas": {f.nome: f.como_dict() for f in (self.lidos, self.avaliados)},
+            "gargalo": max(estagios, key=lambda nome: estagios[nome]["ocupacao"]),
+        }
+
+    def progresso(self) -> str:
+        return (f"[esteira] lidos {self.leitura.itens} | avaliados {self.avaliacao.itens} | "
+                f"gravados {self.gravacao.itens} | fila lidos {self.lidos.qsize()}/{self.profundidade} | "
+                f"fila avaliados {self.avaliados.qsize()}/{self.profundidade}")
+
+
+def _mostrar_progresso(esteira: EsteiraAvaliacao, intervalo: float, parar: threading.Event):
+    while not parar.wait(intervalo):
+        print(esteira.progresso(), file=sys.stderr, flush=True)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Avalia uma pasta de .txt com leitura, avaliação e gravação em estágios concorrentes."
+    )
+    parser.add_argument("alvo", help="diretório com arquivos .txt ou padrão glob")
+    parser.add_argument("--tema", default="", help="tema da atividade")
+    parser.add_argument("--genero", default=None,
+                        help="gênero a aplicar em todos os textos (sobrescreve a detecção)")
+    parser.add_argument("--genero-padrao", default=GENERO_PADRAO,
+                        help="gênero usado quando a detecção retorna 'desconhecido'")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="processos de avaliação (padrão: núcleos da máquina)")
+    parser.add_argument("--leitores", type=int, default=LEITORES_PADRAO,
+                        help=f"threads de leitura (padrão: {LEITORES_PADRAO}; aumente em discos de rede)")
+    parser.add_argument("--profundidade", type=int, default=PROFUNDIDADE_PADRAO,
+                        help=f"itens em cada fila entre estágios (padrão: {PROFUNDIDADE_PADRAO})")
+    parser.add_argument("--recursivo", action="store_true", help="inclui subdiretórios")
+    parser.add_argument("--saida", default="resultados_lote.jsonl", help="arquivo de saída")
+    parser.add_argument("--formato", default=None, choices=FORMATOS,
+                        help="formato da saída (padrão: pela extensão de --saida)")
+    parser.add_argument("--pasta-relatorios", default=None, metavar="PASTA",
+                        help="grava também um relatório .txt por arquivo nesta pasta")
+    parser.add_argument("--cache", default=None, help="arquivo SQLite do cache de resultados")
+    parser.add_argument("--tokenizador", default=None, choices=sorted(BACKENDS),
+                        help=f"backend de tokenização (padrão: {BACKEND_PADRAO})")
+    parser.add_argument("--modelo-genero", default=None, metavar="PASTA",
+                        help="detecta o gênero com o classificador treinado (python -m data.classificador)")
+    parser.add_argument("--confianca-genero", type=float, default=None,
+                        help="confiança mínima do classificador; abaixo dela valem as regras")
+    parser.add_argument("--progresso", type=float, default=None, metavar="SEGUNDOS",
+                        help="mostra a cada N segundos (stderr) quantos itens passaram e o estado das filas")
+    parser.add_argument("--estatisticas", default=None, metavar="ARQUIVO_JSON",
+                        help="grava os contadores por estágio e por fila neste arquivo")
+    args = parser.parse_args(argv)
+
+    if args.genero and args.genero.strip().lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero inválido: {args.genero}")
+    if args.genero_padrao.lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero padrão inválido: {args.genero_padrao}")
+    if args.tokenizador:
+        os.environ["AVALIADOR_TOKENIZADOR"] = args.tokenizador
+        definir_backend(args.tokenizador)
+
+    arquivos = listar_arquivos(args.alvo, args.recursivo)
+    if not arquivos:
+        print("Nenhum arquivo .txt encontrado.")
+        return
+    esteira = EsteiraAvaliacao(args.tema, args.genero, args.genero_padrao.lower(),
+                               processos=min(args.processos or os.cpu_count() or 1, len(arquivos)),
+                               leitores=args.leitores, profundidade=args.profundidade,
+                               caminho_cache=args.cache, modelo_genero=args.modelo_genero,
+                               confianca_genero=args.confianca_genero,
+                               pasta_relatorios=args.pasta_relatorios,
+                               raiz=args.alvo if os.path.isdir(args.alvo) else None)
+    parar = threading.Event()
+    if args.progresso:
+        threading.Thread(target=_mostrar_progresso, args=(esteira, args.progresso, parar), daemon=True).start()
+    try:
+        with GravadorRelatorios(args.saida, args.formato, anexar=False) as gravador:
+            estatisticas = esteira.executar(arquivos, gravador)
+    finally:
+        parar.set()
+
+    print(f"{gravador.escritos} arquivos avaliados em {estatisticas['duracao_s']}s. Resultados em: {args.saida}")
+    for nome, dados in estatisticas["estagios"].items():
+        print(f"  {nome:<10} {dados['itens']:>6} itens  {dados['itens_por_s']:>8} itens/s  "
+              f"ocupação {dados['ocupacao']:.0%}")
+    print(f"  gargalo: {estatisticas['gargalo']}")
+    if args.estatisticas:
+        with open(args.estatisticas, "w", encoding="utf-8") as f:
+            json.dump(estatisticas, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,43 @@
 # feedback.py
 # Gera comentários didáticos e sugestões com base no relatório do avaliador.
 
+import hashlib
 import re
-from typing import Dict, List, Tuple
-from nltk.tokenize import sent_tokenize, word_tokenize
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple, Union
 try:
     # Prefer relative imports when used as a package
-    from .avaliador import (
-        AvaliadorDissertacao,
-        AvaliadorConto,
-        AvaliadorPoema,
-        AvaliadorFabula
+    from .documento import DocumentoTokenizado
+    from .instrumentacao import etapa, medir
+    from .rubricas import (
+        CONTEXTO_GENERICO,
+        RUBRICA_FEEDBACK,
+        assinatura_rubricas,
+        rubrica_do_genero,
+        rubrica_registrada,
     )
+    from .tema import IndiceTema
+    from .tokenizacao import BackendTokenizacao, obter_backend
 except Exception:
     # Fallback for direct script execution
-    from avaliador import (
-        AvaliadorDissertacao,
-        AvaliadorConto,
-        AvaliadorPoema,
-        AvaliadorFabula
+    from documento import DocumentoTokenizado
+    from instrumentacao import etapa, medir
+    from rubricas import (
+        CONTEXTO_GENERICO,
+        RUBRICA_FEEDBACK,
+        assinatura_rubricas,
+        rubrica_do_genero,
+        rubrica_registrada,
     )
+    from tema import IndiceTema
+    from tokenizacao import BackendTokenizacao, obter_backend
 
 # -----------------------------------------------------
-# Seleciona a classe de avaliação conforme o gênero
+# Seleciona a rubrica conforme o gênero
 # -----------------------------------------------------
+# As rubricas são compiladas uma única vez e ficam num registro (data/rubricas.py)
 def selecionar_avaliador(genero: str):
-    genero = genero.lower()
-    if genero in ["dissertação", "dissertacao"]:
-        return AvaliadorDissertacao()
-    if genero == "conto":
-        return AvaliadorConto()
-    if genero == "poema":
-        return AvaliadorPoema()
-    if genero in ["fábula", "fabula"]:
-        return AvaliadorFabula()
-    return AvaliadorDissertacao()  # fallback seguro
+    return rubrica_do_genero(genero)  # fallback seguro: dissertação
 
 
 # -----------------------------------------------------
@@ -46,6 +49,23 @@ _STOPWORDS = {
     "entre","sob","sobre","sem","sua","suas","seu","seus"
 }
 
+# -----------------------------------------------------
+# Versão da rubrica: as definições das rubricas (limiares, critérios, comentários) já
+# entram na assinatura; incremente a versão quando mudar a lógica do código que as
+# aplica, para que resultados antigos guardados em cache não sejam reaproveitados.
+# -----------------------------------------------------
+VERSAO_RUBRICA = "2"  # 2: adequação ao tema por radicais, sem acentos e sem stopwords
+
+def assinatura_rubrica() -> str:
+    """Identifica a rubrica em uso (versão + definições das rubricas + stopwords)."""
+    base = VERSAO_RUBRICA + "|" + assinatura_rubricas() + "|" + ",".join(sorted(_STOPWORDS))
+    return hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
+
+@lru_cache(maxsize=128)
+def indice_do_tema(tema: str) -> IndiceTema:
+    """Índice do tema, construído uma vez e reaproveitado por todas as redações da atividade."""
+    return IndiceTema(tema, stopwords=_STOPWORDS)
+
 def _filtrar_repeticoes(repeticoes: List[str]) -> List[str]:
     """Remove palavras curtas e stopwords da análise de repetição."""
     return [w for w in repeticoes if len(w) > 2 and w.lower() not in _STOPWORDS]
@@ -54,49 +74,56 @@ def _filtrar_repeticoes(repeticoes: List[str]) -> List[str]:
 # -----------------------------------------------------
 # FUNÇÃO PRINCIPAL DE FEEDBACK
 # -----------------------------------------------------
-def _detokenize(tokens: List[str]) -> str:
-    # Reconstrói uma string a partir de tokens simples, ajustando espaçamento antes de
-    # pontuação comum.
-    s = " ".join(tokens)
-    s = s.replace(' ,', ',').replace(' .', '.').replace(' ;', ';').replace(' :', ':')
-    s = s.replace(" ( ", " (").replace(" ) ", ") ")
-    s = s.replace(" ' ", "'")
-    # corrige espaços antes de exclamações/interrogações
-    s = s.replace(' !', '!').replace(' ?', '?')
-    # remove espaços duplos
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-
-def _reescrever_frases_longas(texto: str, max_words: int = 35, max_suggestions: int = 3) -> List[str]:
+_ESPACOS = re.compile(r"\s+")
+_TEM_PALAVRA = re.compile(r"\w")
+
+
+def _trecho(texto: str, inicio: int, fim: int) -> str:
+    """`texto[inicio:fim]` numa linha só (quebras de linha e espaços repetidos viram um espaço)."""
+    return _ESPACOS.sub(" ", texto[inicio:fim]).strip()
+
+
+def _documento_para_reescrita(texto: str, backend: BackendTokenizacao) -> DocumentoTokenizado:
+    """Tokeniza `texto` do zero (usado quando não há DocumentoTokenizado disponível)."""
+    try:
+        return DocumentoTokenizado.tokenizar(texto, backend)
+    except Exception:
+        # sem tokenizador: frases separadas pela pontuação final, tokens pelos espaços
+        sentencas = [s.strip() for s in re.split(r"[\.\?!]", texto) if s.strip()]
+        return DocumentoTokenizado(texto, sentencas, [s.split() for s in sentencas])
+
+
+@medir("reescrita")
+def _reescrever_frases_longas(texto: str, max_words: int = 35, max_suggestions: int = 3,
+                              documento: Optional[DocumentoTokenizado] = None,
+                              tokenizador: Union[None, str, BackendTokenizacao] = None) -> List[str]:
     """Gera reescritas melhores para frases muito longas usando tokenização.
 
     Estratégia:
     - Tokeniza sentenças; para sentenças longas procura um ponto de divisão natural
       (vírgula, ponto-e-vírgula, conjunção) próximo ao centro.
     - Se não encontrar, divide no meio preservando capitalização e pontuação.
+    - As duas partes são recortadas do texto original pelos offsets dos tokens.
     - Produz até `max_suggestions` sugestões no total (não por sentença).
+
+    Se `documento` for informado, reaproveita suas sentenças e tokens em vez de
+    tokenizar `texto` novamente; senão usa o backend `tokenizador` (None = atual).
     """
     sugestões: List[str] = []
-    try:
-        sentencas = sent_tokenize(texto)
-    except Exception:
-        sentencas = [s.strip() for s in re.split(r"[\.\?!]", texto) if s.strip()]
+    if documento is None:
+        documento = _documento_para_reescrita(texto, obter_backend(tokenizador))
+    texto = documento.texto
 
     # tokens/pontuações preferidas para cortes
     punct_candidates = {',', ';', ':'}
     conj_candidates = {'e', 'mas', 'porém', 'contudo', 'quando', 'enquanto', 'porque', 'pois'}
 
-    for s in sentencas:
-        # simplificação: use word_tokenize para obter tokens (inclui pontuação)
-        try:
-            tokens = word_tokenize(s)
-        except Exception:
-            tokens = s.split()
-
+    for n, tokens in enumerate(documento.tokens_por_frase):
         # contar palavras (tokens alfanuméricos)
-        word_tokens = [t for t in tokens if re.search(r"\w", t)]
-        if len(word_tokens) <= max_words:
+        if len(tokens) <= max_words:
+            continue
+        tem_palavra = _TEM_PALAVRA.search
+        if sum(1 for t in tokens if tem_palavra(t)) <= max_words:
             continue
 
         mid = len(tokens) // 2
@@ -118,12 +145,15 @@ def _reescrever_frases_longas(texto: str, max_words: int = 35, max_suggestions:
         if split_idx is None:
             split_idx = mid
 
-        # construir partes preservando tokens
-        left = tokens[:split_idx]
-        right = tokens[split_idx:]
+        # recortar o texto original no ponto de divisão (fim do último token da esquerda
+        # e início do primeiro token da direita), preservando a grafia da redação
+        inicio, fim = documento.span_frase(n)
+        spans = documento.offsets_tokens(n, split_idx + 1)
+        corte_esquerda = spans[2 * split_idx - 1] if split_idx > 0 else inicio
+        corte_direita = spans[2 * split_idx] if split_idx < len(tokens) else fim
 
-        left_text = _detokenize(left)
-        right_text = _detokenize(right)
+        left_text = _trecho(texto, inicio, corte_esquerda)
+        right_text = _trecho(texto, corte_direita, fim)
 
         # garantir pontuação final adequada
         if not re.search(r"[\.\?!]$", left_text):
@@ -143,162 +173,71 @@ def _reescrever_frases_longas(texto: str, max_words: int = 35, max_suggestions:
     return sugestões
 
 
-def pontuar_e_gerar_feedback(rel: Dict, tema: str = "", texto: str = None) -> Dict:
+@medir("feedback")
+def pontuar_e_gerar_feedback(rel: Dict, tema: str = "", texto: str = None,
+                             indice_tema: Optional[IndiceTema] = None) -> Dict:
 
     repeticoes_raw = rel.get("repeticoes_relevantes", [])
     repeticoes = _filtrar_repeticoes(repeticoes_raw)
 
-    frases_muito_longas = rel.get("frases_muito_longas", [])
-    paragrafos_extensos = rel.get("paragrafos_extensos", [])
-    variedade_vocab = rel.get("variedade_vocabulario", 0)
-    adequacao_tema = 0  # default
-
-    total_paragrafos = len(rel.get("paragrafos", []))
-    total_palavras = rel.get("num_palavras", 0)
-    tamanho_frase = rel.get("media_palavras_por_frase", 0)
-
     genero = rel.get("genero", "dissertação")
     avaliador = selecionar_avaliador(genero)
-    notas_genero = avaliador.avaliar(rel)
-
-    comentarios: List[str] = []
-    sugestoes: List[str] = []
-    contexto_genero: List[str] = []
-    sugestoes_por_genero: List[str] = []
-    detalhe = {}
-
-    # =====================================================
-    # 1) Estrutura
-    # =====================================================
-    estrutura = 2
-    if total_paragrafos <= 1:
-        estrutura = 0
-        comentarios.append("Estrutura: O texto está muito compacto; organize-o melhor em parágrafos.")
-    elif total_paragrafos == 2:
-        estrutura = 1
-        comentarios.append("Estrutura: Boa tentativa, mas os parágrafos ainda podem ser divididos melhor.")
-    else:
-        comentarios.append("Estrutura: Boa organização em parágrafos.")
-
-    if paragrafos_extensos:
-        comentarios.append(f"Estrutura: Existem {len(paragrafos_extensos)} parágrafos muito longos.")
-        sugestoes.append("Divida os parágrafos mais extensos para facilitar a leitura.")
-
-    # Gera comentários iniciais por gênero (contextualização educativa)
-    genero_lower = genero.lower()
-    if genero_lower in ["dissertação", "dissertacao"]:
-        contexto_genero.append("Dissertação: foque em tese clara, argumentos e conclusão coerente.")
-        sugestoes_por_genero.append("Garanta uma tese assertiva e use conectores para ligar argumentos.")
-    elif genero_lower == "conto":
-        contexto_genero.append("Conto: priorize enredo, sequência de eventos e um desfecho marcante.")
-        sugestoes_por_genero.append("Trabalhe a construção de cena e personagens; elimine descrições supérfluas.")
-    elif genero_lower == "poema":
-        contexto_genero.append("Poema: atenção à concisão, ritmo e imagens poéticas.")
-        sugestoes_por_genero.append("Varie os versos e utilize imagens e metáforas para enriquecer as estrofes.")
-    elif genero_lower in ["fábula", "fabula"]:
-        contexto_genero.append("Fábula: destaque a ação dos personagens animais e deixe a moral explícita.")
-        sugestoes_por_genero.append("Reforce a moral no final e simplifique a narrativa para maior impacto.")
-    else:
-        contexto_genero.append(f"Gênero detectado: {genero}. Ajuste o texto conforme os critérios gerais.")
-
-    # =====================================================
-    # 2) Coesão
-    # =====================================================
-    coesao = 2
-    if tamanho_frase > 36:
-        coesao = 0
-        comentarios.append("Coesão: Muitas frases longas; períodos extensos prejudicam a ligação entre ideias.")
-    elif tamanho_frase > 26:
-        coesao = 1
-        comentarios.append("Coesão: Algumas frases longas; é possível melhorar conectores e pontuação.")
-    else:
-        comentarios.append("Coesão: Boa fluidez entre as frases.")
-
-    # =====================================================
-    # 3) Clareza
-    # =====================================================
-    clareza = 2
-    if total_palavras < 80:
-        clareza = 0
-        comentarios.append("Clareza: O texto está muito curto; falta desenvolvimento das ideias.")
-
-    if repeticoes:
-        clareza = max(0, clareza - 1)
-        comentarios.append("Clareza: Há repetição de palavras; varie seu vocabulário.")
-        sugestoes.append(f"Varie palavras repetidas, como '{repeticoes[0]}', utilizando sinônimos adequados.")
-
-    if frases_muito_longas:
-        clareza = max(0, clareza - 1)
-        comentarios.append("Clareza: Algumas frases muito longas dificultam a compreensão.")
-        sugestoes.append("Divida frases longas em períodos menores para facilitar a leitura.")
-
-    # =====================================================
-    # 4) Vocabulário
-    # =====================================================
-    vocab = 2
-    if variedade_vocab < 30:
-        vocab = 0
-        comentarios.append("Vocabulário: Pouca variedade; procure diversificar o uso de palavras.")
-    elif variedade_vocab < 45:
-        vocab = 1
-        comentarios.append("Vocabulário: Variedade moderada; pode-se ampliar o repertório lexical.")
-    else:
-        comentarios.append("Vocabulário: Muito bom repertório lexical.")
-
-    # Adiciona sugestões específicas por gênero quando aplicável
-    if sugestoes_por_genero:
-        sugestoes.extend(sugestoes_por_genero)
-
-    # =====================================================
-    # 5) Adequação ao tema
-    # =====================================================
-    adequacao = 2
-    if tema:
-        # Heurística melhor: checar presença das palavras do tema no conjunto de palavras do texto
-        palavras_tema = [w for w in re.findall(r"\w+", tema.lower())]
-        palavras_texto = set(rel.get("palavras_minusculas", []))
-        matches = sum(1 for w in palavras_tema if w in palavras_texto)
-        if matches == 0:
-            adequacao = 0
-            comentarios.append("Adequação ao tema: Pouca relação com o tema informado.")
-        elif matches < max(1, len(palavras_tema)//2):
-            adequacao = 1
-            comentarios.append("Adequação ao tema: Relação parcial com o tema; pode aprofundar o foco.")
+    with etapa("notas_genero"):
+        notas_genero = avaliador.avaliar(rel)
+
+    # Adequação ao tema: radicais do tema (sem acentos/stopwords) contra os radicais do
+    # vocabulário do texto; `indice_tema` permite pesos por palavra (ver data/tema.py).
+    # -1 indica tema não informado.
+    adequacao = -1
+    if tema or indice_tema is not None:
+        indice = indice_tema if indice_tema is not None else indice_do_tema(tema)
+        if "vocabulario" in rel:
+            palavras_texto = rel["vocabulario"]
         else:
-            comentarios.append("Adequação ao tema: Boa relação com o tema.")
+            palavras_texto = set(rel.get("palavras_minusculas", []))
+        with etapa("tema"):
+            adequacao = indice.pontuar(palavras_texto).nota
+
+    # Critérios 0-2 (estrutura, coesão, clareza, vocabulário, adequação): uma passagem
+    # pela rubrica compilada (ver data/rubricas.py)
+    resultado = RUBRICA_FEEDBACK.aplicar(
+        rel,
+        extras={"num_repeticoes": len(repeticoes), "adequacao": adequacao},
+        contexto={"repeticao": repeticoes[0] if repeticoes else ""},
+    )
+    detalhe = resultado.notas
+    comentarios: List[str] = resultado.comentarios
+
+    # Contextualização educativa por gênero (exposta separadamente dos comentários)
+    perfil = rubrica_registrada(genero)
+    if perfil is not None and perfil.contexto:
+        contexto_genero = [perfil.contexto]
     else:
-        comentarios.append("Adequação ao tema: Tema não informado; avaliação feita apenas pelo texto.")
+        contexto_genero = [CONTEXTO_GENERICO.format(genero=genero)]
+    sugestoes_por_genero: List[str] = [perfil.sugestao] if perfil is not None and perfil.sugestao else []
+    sugestoes: List[str] = resultado.sugestoes + sugestoes_por_genero
 
     # =====================================================
     # NOTA FINAL
     # =====================================================
-    total_pontos = estrutura + coesao + clareza + vocab + adequacao
+    total_pontos = sum(detalhe.values())
     nota_final = round(total_pontos, 2)
 
-    detalhe.update({
-        "estrutura": estrutura,
-        "coesao": coesao,
-        "clareza": clareza,
-        "vocabulario": vocab,
-        "adequacao": adequacao
-    })
-
-    # exemplo de reescrita
-    exemplo_reescrita = []
-    if frases_muito_longas:
-        exemplo_reescrita.append("Exemplo: transforme uma frase longa em duas mais curtas.")
-
-    # Exemplos adicionais por gênero
-    if genero_lower == "poema":
-        exemplo_reescrita.append("Exemplo (poema): substitua descrições literais por imagens sensoriais e varie o comprimento dos versos.")
-    if genero_lower in ["fábula", "fabula"]:
-        exemplo_reescrita.append("Exemplo (fábula): torne a moral mais explícita na última frase.")
-    if genero_lower == "conto":
-        exemplo_reescrita.append("Exemplo (conto): acrescente um detalhe de personagem que explique a motivação do conflito.")
-
-    # Auto-reescrita: gera exemplos automáticos a partir do texto (se fornecido)
-    texto_base = texto if texto is not None else "\n".join(rel.get("linhas", []))
-    exemplo_reescrita_auto = _reescrever_frases_longas(texto_base)
+    # exemplo de reescrita (regras da rubrica + exemplo do gênero)
+    exemplo_reescrita = resultado.exemplos
+    if perfil is not None and perfil.exemplo:
+        exemplo_reescrita.append(perfil.exemplo)
+
+    # Auto-reescrita: gera exemplos automáticos a partir do texto (se fornecido),
+    # reaproveitando a tokenização feita pelo AnalisadorBasico quando possível
+    documento = rel.get("documento")
+    if texto is None:
+        texto_base = documento.texto if documento is not None else "\n".join(rel.get("linhas", []))
+    else:
+        texto_base = texto
+    if documento is not None and documento.texto != texto_base:
+        documento = None
+    exemplo_reescrita_auto = _reescrever_frases_longas(texto_base, documento=documento)
 
     # Não alteramos a ordem de 'comentarios' original; expomos contexto de gênero separadamente
 
@@ -0,0 +1,234 @@
+# fluxo.py
+# Análise em fluxo para arquivos muito grandes: lê o arquivo linha a linha (com buffer),
+# tokeniza parágrafo por parágrafo e mantém apenas agregados, de modo que a memória
+# fica limitada pelo maior parágrafo e não pelo arquivo inteiro.
+
+import re
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AvaliadorTexto, SinaisGenero
+    from .documento import DocumentoTokenizado, calcular_offsets, corte_seguro
+    from .tokenizacao import sent_tokenize, word_tokenize
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AvaliadorTexto, SinaisGenero
+    from documento import DocumentoTokenizado, calcular_offsets, corte_seguro
+    from tokenizacao import sent_tokenize, word_tokenize
+
+# Quantas frases longas são guardadas como exemplo (para as sugestões de reescrita)
+MAX_EXEMPLOS_FRASES_LONGAS = 3
+# Tamanho do trecho inicial do primeiro parágrafo mantido para o relatório impresso
+TAMANHO_PARAGRAFO_INICIAL = 400
+# Caracteres pendentes (sentença ainda aberta) acima dos quais o começo da sentença deixa
+# de ser retokenizado e passa a contar só pelos totais; sem isso, parágrafos sem pontuação
+# final (poemas, listas) acumulariam o arquivo inteiro e seriam retokenizados a cada parágrafo
+LIMITE_PENDENTE = 2000
+# Ponto final (talvez seguido de fechamentos) no fim de um trecho: o word_tokenize o separa
+# no fim do texto, mas não no meio; um trecho assim não pode ser contado à parte
+_TERMINA_EM_PONTO = re.compile(r"\.[\]\)}>\"']*\s*$")
+
+
+def ler_paragrafos(caminho: str, encoding: str = "utf-8") -> Iterator[Tuple[str, str]]:
+    """Gera (separador, paragrafo) lendo o arquivo linha a linha.
+
+    `paragrafo` é o bloco de texto original (sem as linhas em branco que o precedem) e
+    `separador` é o texto exato entre o bloco anterior e este. Juntando todos os pares
+    obtém-se o arquivo original. Os blocos equivalem aos de `re.split(r"\\n\\s*\\n", texto)`.
+    """
+    separador: List[str] = []
+    bloco: List[str] = []
+    with open(caminho, "r", encoding=encoding) as f:
+        for linha in f:
+            # linha só com espaços e terminada em quebra: faz parte da separação
+            if not linha.strip() and linha.endswith("\n"):
+                if bloco:
+                    # a quebra de linha final do bloco pertence ao separador
+                    ultimo = bloco[-1]
+                    bloco[-1] = ultimo[:-1]
+                    texto_bloco = "".join(bloco)
+                    yield "".join(separador), texto_bloco
+                    separador, bloco = ["\n"], []
+                separador.append(linha)
+            else:
+                bloco.append(linha)
+    if bloco:
+        yield "".join(separador), "".join(bloco)
+    elif separador:
+        yield "".join(separador), ""
+
+
+class AnalisadorFluxo:
+    """Calcula as mesmas métricas do AnalisadorBasico sem carregar o arquivo inteiro.
+
+    As sentenças do fim de cada parágrafo que ainda podem mudar (ver `corte_seguro`) ficam
+    pendentes e são tokenizadas de novo junto com o parágrafo seguinte; assim as sentenças
+    obtidas são as mesmas de `sent_tokenize` sobre o texto completo.
+
+    Quando o trecho pendente passa de `LIMITE_PENDENTE` caracteres (parágrafos seguidos sem
+    pontuação final, como em poemas e listas), a parte da sentença aberta anterior ao
+    parágrafo atual já é definitiva: ela é contada em totais correntes (tokens, palavras) e
+    sai do trecho pendente, e a sentença só é contada como frase quando terminar. As
+    métricas continuam as de `sent_tokenize` sobre o texto completo; apenas o exemplo de
+    uma frase longa assim fica limitado aos primeiros `LIMITE_PENDENTE` caracteres.
+
+    A detecção de gênero soma os sinais de cada parágrafo; a única outra diferença possível
+    em relação ao texto completo é o padrão "animal + verbo de fala" atravessando parágrafos.
+    """
+
+    def __init__(self):
+        self.avaliador = AvaliadorTexto()
+
+    def analisar_arquivo(self, caminho: str, encoding: str = "utf-8") -> Dict:
+        detector = self.avaliador.detect
+        sinais: Optional[SinaisGenero] = None
+
+        num_frases = 0
+        num_palavras = 0
+        contador: Counter = Counter()
+        num_frases_longas = 0
+        exemplos_longas: List[str] = []
+        exemplos_tokens: List[List[str]] = []
+        num_paragrafos = 0
+        num_paragrafos_extensos = 0
+        paragrafo_inicial = ""
+        num_linhas = 1
+        num_versos_longos = 0
+        pendente = ""
+        # começo já contado da sentença aberta: [palavras, texto e tokens do exemplo]
+        aberta: Optional[list] = None
+
+        def acumular(trecho: str):
+            """Conta um trecho da sentença aberta (ou a sentença inteira)."""
+            nonlocal num_palavras, aberta
+            tokens = word_tokenize(trecho, preserve_line=True)
+            num_palavras += len(tokens)
+            contador.update(t.lower() for t in tokens if t.isalpha())
+            if aberta is None:
+                aberta = [len(trecho.split()), trecho, tokens]
+                return
+            aberta[0] += len(trecho.split())
+            if len(aberta[1]) + len(trecho) <= LIMITE_PENDENTE:
+                aberta[1] += trecho
+                aberta[2].extend(tokens)
+
+        def contabilizar(frase: str):
+            nonlocal num_frases, num_frases_longas, aberta
+            acumular(frase)
+            palavras, texto, tokens = aberta
+            aberta = None
+            num_frases += 1
+            if palavras > 35:
+                num_frases_longas += 1
+                if len(exemplos_longas) < MAX_EXEMPLOS_FRASES_LONGAS:
+                    exemplos_longas.append(texto)
+                    exemplos_tokens.append(tokens)
+
+        for separador, paragrafo in ler_paragrafos(caminho, encoding):
+            # linhas (texto.split("\n")) e versos longos
+            num_linhas += separador.count("\n") + paragrafo.count("\n")
+            for linha in paragrafo.split("\n"):
+                if len(linha.split()) > 10:
+                    num_versos_longos += 1
+            for linha in separador.split("\n"):
+                if len(linha.split()) > 10:
+                    num_versos_longos += 1
+
+            bloco = paragrafo.strip()
+            if not bloco:
+                continue
+            num_paragrafos += 1
+            if num_paragrafos == 1:
+                paragrafo_inicial = bloco[:TAMANHO_PARAGRAFO_INICIAL]
+            if len(bloco.split()) > 120:
+                num_paragrafos_extensos += 1
+
+            trecho = detector.extrair_sinais(paragrafo, inicio_do_texto=sinais is None)
+            sinais = trecho if sinais is None else sinais.juntar(trecho)
+
+            unidade = pendente + separador + paragrafo if pendente else paragrafo
+            frases = sent_tokenize(unidade)
+            if not frases:
+                pendente = ""
+                continue
+            offsets = calcular_offsets(unidade, frases)
+            k = corte_seguro(unidade, offsets)
+            for frase in frases[:k]:
+                contabilizar(frase)
+            inicio = offsets[k][0]
+            # início do parágrafo atual na unidade; antes dele a sentença aberta é definitiva
+            atual = len(unidade) - len(paragrafo)
+            if (len(unidade) - inicio > LIMITE_PENDENTE and inicio < atual < offsets[k][1]
+                    and not _TERMINA_EM_PONTO.search(unidade, inicio, atual)):
+                acumular(unidade[inicio:atual])
+                inicio = atual
+            pendente = unidade[inicio:]
+        if pendente:
+            for frase in sent_tokenize(pendente):
+                contabilizar(frase)
+
+        vocabulario_unico = len(contador)
+        total_alfabeticas = sum(contador.values())
+        media = num_palavras / num_frases if num_frases > 0 else 0
+        variedade = (vocabulario_unico / total_alfabeticas * 100) if total_alfabeticas else 0
+
+        rel = {
+            "num_frases": num_frases,
+            "num_palavras": num_palavras,
+            "media_palavras_por_frase": round(media, 2),
+            "variedade_vocabulario": round(variedade, 2),
+            "vocabulario_unico": vocabulario_unico,
+            "num_paragrafos": num_paragrafos,
+            "num_paragrafos_extensos": num_paragrafos_extensos,
+            "num_frases_muito_longas": num_frases_longas,
+            "num_linhas": num_linhas,
+            "num_versos_longos": num_versos_longos,
+            "paragrafo_inicial": paragrafo_inicial,
+            "frases_muito_longas": exemplos_longas,
+            "mais_frequentes": contador.most_common(10),
+            "repeticoes_relevantes": [w for w, c in contador.items() if c > 2],
+            "vocabulario": contador.keys(),
+            # documento só com as frases longas de exemplo, para as sugestões de reescrita
+            "documento": DocumentoTokenizado("\n\n".join(exemplos_longas), exemplos_longas, exemplos_tokens),
+        }
+
+        genero = detector.classificar(sinais or SinaisGenero())
+        avaliador = self.avaliador.avaliadores.get(genero) or self.avaliador.avaliadores["dissertação"]
+        rel["genero"] = genero
+        rel["avaliacao"] = avaliador.avaliar(rel)
+        return rel
+
+
+def analisar_arquivo_em_fluxo(caminho: str, tema: Optional[str] = "", encoding: str = "utf-8") -> Dict:
+    """Equivalente a `analisar_texto(ler_arquivo_txt(caminho), tema)` com memória limitada."""
+    rel = AnalisadorFluxo().analisar_arquivo(caminho, encoding)
+    rel["tema"] = tema
+    return rel
+
+
+def main(argv: Optional[List[str]] = None):
+    import argparse
+    try:
+        from .feedback import pontuar_e_gerar_feedback
+        from .main import imprimir_relatorio_completo
+    except Exception:
+        from feedback import pontuar_e_gerar_feedback
+        from main import imprimir_relatorio_completo
+
+    parser = argparse.ArgumentParser(
+        description="Avalia um arquivo .txt muito grande em fluxo (memória limitada)."
+    )
+    parser.add_argument("arquivo", help="caminho do arquivo .txt")
+    parser.add_argument("--tema", default="", help="tema da atividade")
+    parser.add_argument("--encoding", default="utf-8", help="codificação do arquivo")
+    args = parser.parse_args(argv)
+
+    rel = analisar_arquivo_em_fluxo(args.arquivo, args.tema, args.encoding)
+    fb = pontuar_e_gerar_feedback(rel, args.tema)
+    imprimir_relatorio_completo(None, args.tema, rel, fb)
+
+
+if __name__ == "__main__":
+    main()
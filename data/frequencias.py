@@ -0,0 +1,314 @@
+# frequencias.py
+# Palavras mais usadas de uma turma inteira (ou de um semestre de redações) com memória
+# fixa: um esboço Space-Saving guarda no máximo `capacidade` palavras com a contagem
+# estimada e o erro máximo de cada uma. Esboços de processos diferentes (ou de execuções
+# diferentes, gravados em JSON) podem ser combinados sem perder as garantias de erro.
+# As palavras seguem o filtro das repetições do feedback (alfabéticas, mais de 2 letras,
+# fora das stopwords).
+#
+#   python -m data.frequencias turma/ --top 20
+#   python -m data.frequencias turma_b/ --juntar semestre.json --salvar semestre.json
+
+import argparse
+import heapq
+import json
+import multiprocessing
+import os
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .feedback import _STOPWORDS
+    from .tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend, obter_backend
+except Exception:
+    # Fallback for direct script execution
+    from feedback import _STOPWORDS
+    from tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend, obter_backend
+
+# Palavras monitoradas por padrão; o erro de qualquer contagem fica abaixo de total / capacidade
+CAPACIDADE_PADRAO = 2000
+
+
+def palavra_relevante(palavra: str) -> bool:
+    """Mesmo critério das repetições relevantes do feedback (ver `_filtrar_repeticoes`)."""
+    return palavra.isalpha() and len(palavra) > 2 and palavra.lower() not in _STOPWORDS
+
+
+class EsbocoFrequencias:
+    """Esboço Space-Saving (Metwally et al.) das palavras mais frequentes de muitos textos.
+
+    Guarda no máximo `capacidade` palavras. Para cada palavra monitorada, a contagem real
+    fica em [contagem - erro, contagem]; uma palavra fora do esboço apareceu no máximo
+    `minimo()` vezes, e `minimo()` nunca passa de `total / capacidade`.
+    """
+
+    def __init__(self, capacidade: int = CAPACIDADE_PADRAO):
+        if capacidade < 1:
+            raise ValueError("capacidade deve ser positiva")
+        self.capacidade = capacidade
+        self.total = 0
+        self._contagens: Dict[str, int] = {}
+        self._erros: Dict[str, int] = {}
+        # (contagem, palavra) com entradas obsoletas descartadas sob demanda
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._contagens)
+
+    def __contains__(self, palavra: str) -> bool:
+        return palavra in self._contagens
+
+    # ---------------------------
+    # menor contagem monitorada
+    # ---------------------------
+    def _empilhar(self, palavra: str):
+        heapq.heappush(self._heap, (self._contagens[palavra], palavra))
+        # cada atualização deixa uma entrada velha no heap; reconstrói antes que ele cresça demais
+        if len(self._heap) > 4 * self.capacidade + 64:
+            self._reconstruir_heap()
+
+    def _reconstruir_heap(self):
+        self._heap = [(c, p) for p, c in self._contagens.items()]
+        heapq.heapify(self._heap)
+
+    def _menor(self) -> Tuple[int, str]:
+        heap = self._heap
+        while heap:
+            contagem, palavra = heap[0]
+            if self._contagens.get(palavra) == contagem:
+                return contagem, palavra
+            heapq.heappop(heap)
+        raise IndexError("esboço vazio")
+
+    def minimo(self) -> int:
+        """Limite superior da contagem de qualquer palavra fora do esboço."""
+        if len(self._contagens) < self.capacidade:
+            return 0
+        return self._menor()[0]
+
+    # ---------------------------
+    # atualização
+    # ---------------------------
+    def adicionar(self, palavra: str, peso: int = 1):
+        """Conta `peso` ocorrências de `palavra` (já normalizada)."""
+        self.total += peso
+        contagens = self._contagens
+        if palavra in contagens:
+            contagens[palavra] += peso
+        elif len(contagens) < self.capacidade:
+            contagens[palavra] = peso
+            self._erros[palavra] = 0
+        else:
+            # a palavra nova herda a contagem da menos frequente, que sai do esboço
+            menor, removida = self._menor()
+            heapq.heappop(self._heap)
+            del contagens[removida]
+            del self._erros[removida]
+            contagens[palavra] = menor + peso
+            self._erros[palavra] = menor
+        self._empilhar(palavra)
+
+    def adicionar_contagens(self, contagens: Dict[str, int]):
+        """Soma um Counter de palavras (por exemplo, o de um texto), filtrando as irrelevantes."""
+        for palavra, n in contagens.items():
+            palavra = palavra.lower()
+            if n > 0 and palavra_relevante(palavra):
+                self.adicionar(palavra, n)
+
+    def adicionar_tokens(self, tokens: Iterable[str]):
+        """Conta os tokens de um texto (como os de `word_tokenize`)."""
+        self.adicionar_contagens(Counter(t.lower() for t in tokens if t.isalpha()))
+
+    def juntar(self, outro: "EsbocoFrequencias") -> "EsbocoFrequencias":
+        """Combina dois esboços (Agarwal et al., 2012), mantendo as garantias de erro.
+
+        Uma palavra ausente de um dos lados pode ter aparecido lá até `minimo()` vezes;
+        esse valor entra na contagem e no erro. Ficam as `capacidade` maiores contagens.
+        """
+        meu_minimo = self.minimo()
+        outro_minimo = outro.minimo()
+        contagens: Dict[str, int] = {}
+        erros: Dict[str, int] = {}
+        for palavra, c in self._contagens.items():
+            c_outro = outro._contagens.get(palavra)
+            if c_outro is None:
+                contagens[palavra] = c + outro_minimo
+                erros[palavra] = self._erros[palavra] + outro_minimo
+            else:
+                contagens[palavra] = c + c_outro
+                erros[palavra] = self._erros[palavra] + outro._erros[palavra]
+        for palavra, c in outro._contagens.items():
+            if palavra not in contagens:
+                contagens[palavra] = c + meu_minimo
+                erros[palavra] = outro._erros[palavra] + meu_minimo
+        if len(contagens) > self.capacidade:
+            mantidas = heapq.nlargest(self.capacidade, contagens.items(), key=lambda x: (x[1], x[0]))
+            contagens = dict(mantidas)
+            erros = {p: erros[p] for p in contagens}
+        self._contagens = contagens
+        self._erros = erros
+        self.total += outro.total
+        self._reconstruir_heap()
+        return self
+
+    # ---------------------------
+    # consulta
+    # ---------------------------
+    def estimativa(self, palavra: str) -> Tuple[int, int]:
+        """(contagem estimada, erro máximo); para palavras fora do esboço, (minimo, minimo)."""
+        if palavra in self._contagens:
+            return self._contagens[palavra], self._erros[palavra]
+        m = self.minimo()
+        return m, m
+
+    def mais_frequentes(self, k: int = 10) -> List[Dict]:
+        """As `k` palavras de maior contagem estimada, com o intervalo da contagem real.
+
+        `garantida` indica que a palavra está entre as k mais frequentes de fato: mesmo
+        no pior caso ela supera a contagem estimada de qualquer palavra abaixo dela.
+        """
+        ordenadas = sorted(self._contagens.items(), key=lambda x: (-x[1], x[0]))
+        seguinte = ordenadas[k][1] if len(ordenadas) > k else self.minimo()
+        resultado = []
+        for palavra, c in ordenadas[:k]:
+            erro = self._erros[palavra]
+            resultado.append({
+                "palavra": palavra,
+                "contagem": c,
+                "erro": erro,
+                "minimo": c - erro,
+                "garantida": c - erro >= seguinte,
+            })
+        return resultado
+
+    def resumo(self, k: int = 10) -> Dict:
+        return {
+            "total": self.total,
+            "capacidade": self.capacidade,
+            "monitoradas": len(self),
+            "erro_maximo": self.minimo(),
+            "mais_frequentes": self.mais_frequentes(k),
+        }
+
+    # ---------------------------
+    # serialização
+    # ---------------------------
+    def como_dict(self) -> Dict:
+        return {
+            "capacidade": self.capacidade,
+            "total": self.total,
+            "palavras": [[p, c, self._erros[p]] for p, c in self._contagens.items()],
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> "EsbocoFrequencias":
+        esboco = cls(dados["capacidade"])
+        esboco.total = dados["total"]
+        for palavra, c, erro in dados["palavras"]:
+            esboco._contagens[palavra] = c
+            esboco._erros[palavra] = erro
+        esboco._reconstruir_heap()
+        return esboco
+
+    def salvar(self, caminho: str):
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump(self.como_dict(), f, ensure_ascii=False)
+
+    @classmethod
+    def carregar(cls, caminho: str) -> "EsbocoFrequencias":
+        with open(caminho, "r", encoding="utf-8") as f:
+            return cls.de_dict(json.load(f))
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+def esboco_dos_arquivos(tarefa: Tuple[List[str], int]) -> Dict:
+    """Esboço (serializado) de um grupo de arquivos; roda num processo trabalhador."""
+    caminhos, capacidade = tarefa
+    backend = obter_backend()
+    esboco = EsbocoFrequencias(capacidade)
+    for caminho in caminhos:
+        with open(caminho, "r", encoding="utf-8", errors="replace") as f:
+            esboco.adicionar_tokens(backend.word_tokenize(f.read()))
+    return esboco.como_dict()
+
+
+def esboco_do_lote(arquivos: List[str], capacidade: int = CAPACIDADE_PADRAO,
+                   processos: Optional[int] = None) -> EsbocoFrequencias:
+    """Cada processo resume um grupo de arquivos num esboço; os esboços são combinados aqui."""
+    processos = max(1, min(processos or os.cpu_count() or 1, len(arquivos) or 1))
+    if processos == 1:
+        return EsbocoFrequencias.de_dict(esboco_dos_arquivos((arquivos, capacidade)))
+    # alguns grupos por processo equilibram turmas com textos de tamanhos diferentes
+    n_grupos = processos * 4
+    grupos = [(arquivos[i::n_grupos], capacidade) for i in range(n_grupos) if arquivos[i::n_grupos]]
+    esboco = EsbocoFrequencias(capacidade)
+    with multiprocessing.Pool(processes=processos) as pool:
+        for dados in pool.imap(esboco_dos_arquivos, grupos):
+            esboco.juntar(EsbocoFrequencias.de_dict(dados))
+    return esboco
+
+
+def imprimir_resumo(resumo: Dict):
+    print(f"Palavras contadas: {resumo['total']} | erro máximo por contagem: {resumo['erro_maximo']}")
+    for i, item in enumerate(resumo["mais_frequentes"], 1):
+        intervalo = (f"{item['contagem']}" if not item["erro"]
+                     else f"{item['minimo']}–{item['contagem']}")
+        marca = "" if item["garantida"] else "  (posição incerta)"
+        print(f"{i:3d}. {item['palavra']:<20} {intervalo}{marca}")
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        from .lote import listar_arquivos
+    except Exception:
+        from lote import listar_arquivos
+
+    parser = argparse.ArgumentParser(
+        description="Palavras mais usadas num lote de .txt, com memória fixa (esboço Space-Saving)."
+    )
+    parser.add_argument("alvo", nargs="?", default=None, help="diretório com arquivos .txt ou padrão glob")
+    parser.add_argument("--top", type=int, default=20, help="quantas palavras mostrar (padrão: 20)")
+    parser.add_argument("--capacidade", type=int, default=CAPACIDADE_PADRAO,
+                        help=f"palavras monitoradas (padrão: {CAPACIDADE_PADRAO})")
+    parser.add_argument("--juntar", nargs="*", default=[], metavar="ESBOCO_JSON",
+                        help="esboços gravados antes (--salvar) a combinar com este lote")
+    parser.add_argument("--salvar", default=None, metavar="ESBOCO_JSON",
+                        help="grava o esboço combinado para juntá-lo a lotes futuros")
+    parser.add_argument("--recursivo", action="store_true", help="inclui subdiretórios")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: núcleos da máquina)")
+    parser.add_argument("--tokenizador", default=None, choices=sorted(BACKENDS),
+                        help=f"backend de tokenização (padrão: {BACKEND_PADRAO})")
+    parser.add_argument("--saida", default=None, help="grava o resumo em JSON")
+    args = parser.parse_args(argv)
+
+    if not args.alvo and not args.juntar:
+        parser.error("informe um alvo ou ao menos um esboço em --juntar")
+    if args.tokenizador:
+        os.environ["AVALIADOR_TOKENIZADOR"] = args.tokenizador
+        definir_backend(args.tokenizador)
+
+    esboco = EsbocoFrequencias(args.capacidade)
+    if args.alvo:
+        arquivos = listar_arquivos(args.alvo, args.recursivo)
+        if not arquivos:
+            print("Nenhum arquivo .txt encontrado.")
+        esboco.juntar(esboco_do_lote(arquivos, args.capacidade, args.processos))
+    for caminho in args.juntar:
+        esboco.juntar(EsbocoFrequencias.carregar(caminho))
+
+    resumo = esboco.resumo(args.top)
+    imprimir_resumo(resumo)
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(resumo, f, indent=2, ensure_ascii=False)
+    if args.salvar:
+        esboco.salvar(args.salvar)
+        print(f"Esboço gravado em: {args.salvar}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# gravador.py
+# Gravação de relatórios em volume: muitas avaliações anexadas a um único arquivo
+# (JSONL, CSV ou o texto do relatório .txt) por uma thread em segundo plano, com
+# buffer grande, descarga (flush) periódica e rotação por tamanho. Quem produz os
+# registros só coloca cada um numa fila e nunca espera pelo disco.
+
+import csv
+import datetime
+import io
+import json
+import os
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+try:
+    # Prefer relative imports when used as a package
+    from .relatorio import contagem
+except Exception:
+    # Fallback for direct script execution
+    from relatorio import contagem
+
+FORMATOS = ("jsonl", "csv", "txt")
+
+# Colunas do CSV (registros de lote.montar_registro ou de resumo_relatorio)
+COLUNAS_CSV = (
+    "arquivo", "tema", "genero", "genero_detectado", "nota_final", "pontos",
+    "estrutura", "coesao", "clareza", "vocabulario", "adequacao",
+    "num_palavras", "num_frases", "media_palavras_por_frase", "variedade_vocabulario",
+    "vocabulario_unico", "num_paragrafos", "comentarios", "sugestoes", "erro",
+)
+_DETALHES_CSV = ("estrutura", "coesao", "clareza", "vocabulario", "adequacao")
+
+# Separa os relatórios quando vários são gravados no mesmo .txt
+SEPARADOR_TXT = "\n" + "=" * 60 + "\n\n"
+
+_FIM = object()  # sentinela que encerra a thread de gravação
+
+
+# ===========================
+# FORMATOS
+# ===========================
+def resumo_relatorio(rel, fb: Dict, tema: str = "", arquivo: Optional[str] = None) -> Dict:
+    """Registro com tudo o que o relatório .txt mostra (também serve para JSONL/CSV)."""
+    paragrafos = rel.get("paragrafos", [])
+    primeiro_par = paragrafos[0] if paragrafos else rel.get("paragrafo_inicial", "")
+    repeticoes = [w for w in rel.get("repeticoes_relevantes", []) if len(w) > 2]
+    registro: Dict = {}
+    if arquivo is not None:
+        registro["arquivo"] = arquivo
+    registro.update({
+        "data": datetime.datetime.now().isoformat(),
+        "tema": tema,
+        "genero": rel.get("genero"),
+        "nota_final": fb["nota_final"],
+        "pontos": fb["pontos"],
+        "detalhe": fb.get("detalhe", {}),
+        "comentarios": fb["comentarios"],
+        "sugestoes": fb["sugestoes"],
+        "metricas": {
+            "num_palavras": rel.get("num_palavras", 0),
+            "num_frases": rel.get("num_frases", 0),
+            "media_palavras_por_frase": rel.get("media_palavras_por_frase", 0),
+            "variedade_vocabulario": rel.get("variedade_vocabulario", 0),
+            "vocabulario_unico": rel.get("vocabulario_unico", 0),
+            "num_paragrafos": contagem(rel, "paragrafos"),
+        },
+        # 201 caracteres bastam para o .txt saber se precisa das reticências
+        "paragrafo_inicial": primeiro_par[:201],
+        "mais_frequentes": [list(x) for x in rel.get("mais_frequentes", [])[:5]],
+        "repeticoes_relevantes": repeticoes[:10],
+    })
+    return registro
+
+
+def formatar_jsonl(registro: Dict) -> str:
+    return json.dumps(registro, ensure_ascii=False) + "\n"
+
+
+def _linha_csv(valores: List) -> str:
+    saida = io.StringIO()
+    csv.writer(saida, lineterminator="\n").writerow(valores)
+    return saida.getvalue()
+
+
+def cabecalho_csv() -> str:
+    return _linha_csv(list(COLUNAS_CSV))
+
+
+def formatar_csv(registro: Dict) -> str:
+    detalhe = registro.get("detalhe") or {}
+    metricas = registro.get("metricas") or {}
+    valores = []
+    for coluna in COLUNAS_CSV:
+        if coluna in _DETALHES_CSV:
+            valor = detalhe.get(coluna, "")
+        elif coluna in metricas:
+            valor = metricas[coluna]
+        else:
+            valor = registro.get(coluna, "")
+        if isinstance(valor, (list, tuple)):
+            valor = " | ".join(str(v) for v in valor)
+        elif valor is None:
+            valor = ""
+        valores.append(valor)
+    return _linha_csv(valores)
+
+
+def formatar_txt(registro: Dict) -> str:
+    """Texto do relatório .txt (o mesmo layout de `salvar_relatorio_em_txt`)."""
+    partes = ["RELATÓRIO DE AVALIAÇÃO\n"]
+    if "arquivo" in registro:
+        partes.append(f"ARQUIVO: {registro['arquivo']}\n")
+    partes.append(f"DATA: {registro.get('data') or datetime.datetime.now().isoformat()}\n\n")
+    if "erro" in registro:
+        partes.append(f"ERRO: {registro['erro']}\n")
+        return "".join(partes)
+    partes.append(f"TEMA: {registro.get('tema', '')}\n\n")
+    partes.append(f"NOTA: {registro['nota_final']} /10  (pontos: {registro['pontos']}/10)\n\n")
+    partes.append("Comentários:\n")
+    for c in registro["comentarios"]:
+        partes.append(" - " + c + "\n")
+    partes.append("\nSugestões:\n")
+    for s in registro["sugestoes"]:
+        partes.append(" - " + s + "\n")
+    metricas = registro.get("metricas", {})
+    partes.append("\nResumo das métricas:\n")
+    partes.append(f" - Número de palavras: {metricas.get('num_palavras', 0)}\n")
+    partes.append(f" - Número de frases: {metricas.get('num_frases', 0)}\n")
+    partes.append(f" - Média de palavras por frase: {metricas.get('media_palavras_por_frase', 0)}\n")
+    partes.append(f" - Variedade de vocabulário (%): {metricas.get('variedade_vocabulario', 0)}\n")
+    partes.append(f" - Vocabulário único (tokens): {metricas.get('vocabulario_unico', 0)}\n")
+    partes.append(f" - Parágrafos detectados: {metricas.get('num_paragrafos', 0)}\n")
+    primeiro_par = registro.get("paragrafo_inicial", "")
+    if primeiro_par:
+        resumo = primeiro_par[:200].replace("\n", " ")
+        if len(primeiro_par) > 200:
+            resumo = resumo.rstrip() + "..."
+        partes.append(f"   Exemplo (início): {resumo}\n")
+    mais_freq = registro.get("mais_frequentes", [])[:5]
+    if mais_freq:
+        partes.append(" - Palavras mais frequentes:\n")
+        for w, c in mais_freq:
+            partes.append(f"    {w}: {c}\n")
+    repeticoes = registro.get("repeticoes_relevantes", [])[:10]
+    if repeticoes:
+        partes.append(f" - Repetições relevantes (ex.): {', '.join(repeticoes)}\n")
+    return "".join(partes)
+
+
+_FORMATADORES: Dict[str, Callable[[Dict], str]] = {
+    "jsonl": formatar_jsonl,
+    "csv": formatar_csv,
+    "txt": formatar_txt,
+}
+
+
+def formato_do_caminho(caminho: str) -> str:
+    """Formato deduzido da extensão do arquivo (.csv, .txt; o resto é JSONL)."""
+    extensao = os.path.splitext(caminho)[1].lower().lstrip(".")
+    return extensao if extensao in ("csv", "txt") else "jsonl"
+
+
+# ===========================
+# GRAVADOR EM SEGUNDO PLANO
+# ===========================
+class GravadorRelatorios:
+    """Anexa registros a um arquivo JSONL, CSV ou .txt a partir de uma thread própria.
+
+        with GravadorRelatorios("notas.csv") as gravador:
+            for registro in registros:
+                gravador.escrever(registro)
+
+    - `tamanho_buffer`: buffer do arquivo (bytes); a escrita no disco acontece em blocos
+    - `intervalo_flush`: segundos entre descargas do buffer (o arquivo fica legível por
+      outras ferramentas durante o lote); None = só ao fechar
+    - `max_bytes`: ao passar desse tamanho o arquivo é rotacionado (caminho.1, caminho.2...
+      até `copias`); None = sem rotação
+    - `anexar`: False recria o arquivo ao abrir (como o `--saida` do lote)
+    - `max_fila`: registros aguardando gravação; com a fila cheia, `escrever` espera
+
+    Um erro de gravação na thread é relançado na próxima chamada a `escrever`,
+    `descarregar` ou `fechar`.
+    """
+
+    def __init__(self, caminho: str, formato: Optional[str] = None,
+                 tamanho_buffer: int = 1024 * 1024, intervalo_flush: Optional[float] = 1.0,
+                 max_bytes: Optional[int] = None, copias: int = 5, anexar: bool = True,
+                 max_fila: int = 10000):
+        formato = formato or formato_do_caminho(caminho)
+        if formato not in FORMATOS:
+            raise ValueError(f"formato desconhecido: {formato} (use {', '.join(FORMATOS)})")
+        self.caminho = caminho
+        self.formato = formato
+        self.tamanho_buffer = tamanho_buffer
+        self.intervalo_flush = intervalo_flush
+        self.max_bytes = max_bytes
+        self.copias = max(1, copias)
+        self._formatar = _FORMATADORES[formato]
+        self._fila: "queue.Queue" = queue.Queue(maxsize=max_fila)
+        self._erro: Optional[BaseException] = None
+        self._arquivo = None
+        self._abrir(anexar)
+        self.escritos = 0
+        self.rotacoes = 0
+        self._thread = threading.Thread(target=self._executar, name="gravador-relatorios", daemon=True)
+        self._thread.start()
+
+    # ---------------------------
+    # lado do produtor
+    # ---------------------------
+    def escrever(self, registro: Dict):
+        self._verificar_erro()
+        if self._thread is None:
+            raise ValueError("gravador já foi fechado")
+        self._fila.put(registro)
+
+    def descarregar(self) -> int:
+        """Espera a gravação de tudo o que já foi passado a `escrever` e descarrega o buffer.
+
+        Devolve o tamanho (bytes) do arquivo atual nesse ponto.
+        """
+        self._verificar_erro()
+        if self._thread is None:
+            raise ValueError("gravador já foi fechado")
+        pronto = threading.Event()
+        self._fila.put(pronto)
+        while not pronto.wait(0.1):
+            if self._erro is not None or not self._thread.is_alive():
+                break
+        self._verificar_erro()
+        return self._tamanho
+
+    def fechar(self):
+        """Grava o que estiver na fila, descarrega o buffer e fecha o arquivo."""
+        if self._thread is not None:
+            self._fila.put(_FIM)
+            self._thread.join()
+            self._thread = None
+        self._verificar_erro()
+
+    def __enter__(self) -> "GravadorRelatorios":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    def _verificar_erro(self):
+        if self._erro is not None:
+            erro, self._erro = self._erro, None
+            raise erro
+
+    # ---------------------------
+    # lado da thread de gravação
+    # ---------------------------
+    def _abrir(self, anexar: bool = True):
+        self._arquivo = open(self.caminho, "a" if anexar else "w", encoding="utf-8",
+                             newline="", buffering=self.tamanho_buffer)
+        # bytes já no arquivo (contados aqui para a rotação não depender de tell())
+        self._tamanho = self._arquivo.tell()
+        if self.formato == "csv" and self._tamanho == 0:
+            self._escrever_texto(cabecalho_csv())
+
+    def _escrever_texto(self, texto: str):
+        self._arquivo.write(texto)
+        self._tamanho += len(texto.encode("utf-8"))
+
+    def _rotacionar(self):
+        self._arquivo.close()
+        for i in range(self.copias - 1, 0, -1):
+            origem = f"{self.caminho}.{i}"
+            if os.path.exists(origem):
+                os.replace(origem, f"{self.caminho}.{i + 1}")
+        os.replace(self.caminho, f"{self.caminho}.1")
+        self.rotacoes += 1
+        self._abrir()
+
+    def _gravar(self, registros: List[Dict]):
+        partes: List[str] = []
+        tamanho = self._tamanho
+        for registro in registros:
+            texto = self._formatar(registro)
+            if self.formato == "txt" and tamanho > 0:
+                texto = SEPARADOR_TXT + texto
+            partes.append(texto)
+            tamanho += len(texto.encode("utf-8"))
+            if self.max_bytes is not None and tamanho >= self.max_bytes:
+                self._arquivo.write("".join(partes))
+                partes = []
+                self._rotacionar()
+                tamanho = self._tamanho
+        if partes:
+            self._arquivo.write("".join(partes))
+            self._tamanho = tamanho
+        self.escritos += len(registros)
+
+    def _executar(self):
+        ultimo_flush = time.monotonic()
+        terminou = False
+        pedidos: List[threading.Event] = []
+        try:
+            while not terminou:
+                espera = None
+                if self.intervalo_flush is not None:
+                    espera = max(0.0, ultimo_flush + self.intervalo_flush - time.monotonic())
+                try:
+                    item = self._fila.get(timeout=espera)
+                except queue.Empty:
+                    item = None
+                # junta tudo o que já está na fila numa única escrita
+                lote: List[Dict] = []
+                pedidos = []
+                while item is not None:
+                    if item is _FIM:
+                        terminou = True
+                        break
+                    if isinstance(item, threading.Event):
+                        pedidos.append(item)  # pedido de `descarregar`
+                    else:
+                        lote.append(item)
+                    try:
+                        item = self._fila.get_nowait()
+                    except queue.Empty:
+                        item = None
+                if lote:
+                    self._gravar(lote)
+                if pedidos:
+                    self._arquivo.flush()
+                    for pronto in pedidos:
+                        pronto.set()
+                if (self.intervalo_flush is not None
+                        and time.monotonic() - ultimo_flush >= self.intervalo_flush):
+                    self._arquivo.flush()
+                    ultimo_flush = time.monotonic()
+        except BaseException as e:
+            self._erro = e
+            # libera quem espera em `descarregar` (o erro é relançado lá)
+            for pronto in pedidos:
+                pronto.set()
+            # esvazia a fila para não bloquear o produtor (os registros se perdem)
+            while not terminou:
+                item = self._fila.get()
+                if item is _FIM:
+                    terminou = True
+                elif isinstance(item, threading.Event):
+                    item.set()
+        finally:
+            self._arquivo.close()
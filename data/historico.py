@@ -0,0 +1,390 @@
+# historico.py
+# Histórico de avaliações por aluno: cada correção vira uma linha num banco SQLite
+# (modo WAL, somente inserção) com a nota final, as notas por critério (`detalhe`), o
+# gênero e as métricas principais do AnalisadorBasico. Índices por aluno, atividade,
+# gênero e data deixam consultas como "como evoluiu a clareza deste aluno no semestre?"
+# e percentis de uma turma na casa dos milissegundos, sem reler relatórios .txt.
+#
+#   python -m data.lote turma/ --historico historico.db --atividade "Redação 3"
+#   python -m data.historico historico.db tendencia --aluno joana --campo clareza
+#   python -m data.historico historico.db percentis --campo nota_final --atividade "Redação 3"
+
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+try:
+    # Prefer relative imports when used as a package
+    from .relatorio import contagem
+except Exception:
+    # Fallback for direct script execution
+    from relatorio import contagem
+
+# Critérios de `pontuar_e_gerar_feedback()["detalhe"]`
+CRITERIOS = ("estrutura", "coesao", "clareza", "vocabulario", "adequacao")
+# Métricas do AnalisadorBasico guardadas em cada avaliação
+METRICAS = ("num_palavras", "num_frases", "media_palavras_por_frase", "variedade_vocabulario",
+            "vocabulario_unico", "num_paragrafos")
+# Colunas numéricas aceitas nas consultas de tendência e percentis
+CAMPOS = ("nota_final", "pontos") + CRITERIOS + METRICAS
+# Campos com poucos valores possíveis (notas), cuja distribuição por atividade e gênero
+# é mantida à parte a cada inserção
+CAMPOS_DISTRIBUICAO = ("nota_final", "pontos") + CRITERIOS
+
+_COLUNAS = ("aluno", "atividade", "genero", "data", "tema", "arquivo") + CAMPOS
+_POSICAO = {coluna: i for i, coluna in enumerate(_COLUNAS)}
+
+# Inserções acumuladas antes de uma transação
+TAMANHO_LOTE = 500
+
+_ESQUEMA = (
+    "CREATE TABLE IF NOT EXISTS avaliacoes ("
+    " id INTEGER PRIMARY KEY,"
+    " aluno TEXT NOT NULL, atividade TEXT NOT NULL, genero TEXT NOT NULL,"
+    " data REAL NOT NULL, tema TEXT NOT NULL, arquivo TEXT,"
+    " nota_final REAL, pontos REAL,"
+    + "".join(f" {c} REAL," for c in CRITERIOS)
+    + " num_palavras INTEGER, num_frases INTEGER, media_palavras_por_frase REAL,"
+    " variedade_vocabulario REAL, vocabulario_unico INTEGER, num_paragrafos INTEGER)",
+    "CREATE INDEX IF NOT EXISTS idx_avaliacoes_aluno ON avaliacoes(aluno, data)",
+    "CREATE INDEX IF NOT EXISTS idx_avaliacoes_atividade ON avaliacoes(atividade, data)",
+    "CREATE INDEX IF NOT EXISTS idx_avaliacoes_genero ON avaliacoes(genero, data)",
+    "CREATE INDEX IF NOT EXISTS idx_avaliacoes_data ON avaliacoes(data)",
+    # ocorrências de cada valor das notas; como o histórico só cresce, as contagens são exatas
+    "CREATE TABLE IF NOT EXISTS distribuicao ("
+    " atividade TEXT NOT NULL, genero TEXT NOT NULL, campo TEXT NOT NULL,"
+    " valor REAL NOT NULL, n INTEGER NOT NULL,"
+    " PRIMARY KEY (campo, atividade, genero, valor))",
+    # somente inserção: o histórico não é reescrito
+    "CREATE TRIGGER IF NOT EXISTS avaliacoes_sem_update BEFORE UPDATE ON avaliacoes"
+    " BEGIN SELECT RAISE(ABORT, 'histórico é somente inserção'); END",
+    "CREATE TRIGGER IF NOT EXISTS avaliacoes_sem_delete BEFORE DELETE ON avaliacoes"
+    " BEGIN SELECT RAISE(ABORT, 'histórico é somente inserção'); END",
+)
+
+
+def _data_em_segundos(data: Union[None, float, str, datetime.datetime]) -> float:
+    if data is None:
+        return time.time()
+    if isinstance(data, str):
+        data = datetime.datetime.fromisoformat(data)
+    if isinstance(data, datetime.datetime):
+        return data.timestamp()
+    return float(data)
+
+
+def aluno_do_arquivo(caminho: str) -> str:
+    """Identificação do aluno pelo nome do arquivo ("turma/joana.txt" -> "joana")."""
+    return os.path.splitext(os.path.basename(caminho))[0]
+
+
+def percentil(contagens: Sequence[Tuple[float, int]], p: float) -> Optional[float]:
+    """Percentil `p` (interpolação linear, como `np.percentile`) de pares (valor, ocorrências)
+    em ordem crescente de valor."""
+    total = sum(n for _, n in contagens)
+    if not total:
+        return None
+    posicao = (total - 1) * p / 100.0
+    baixo = int(posicao)
+    alto = min(baixo + 1, total - 1)
+    v_baixo = v_alto = None
+    acumulado = 0
+    for valor, n in contagens:
+        acumulado += n
+        if v_baixo is None and acumulado > baixo:
+            v_baixo = valor
+        if acumulado > alto:
+            v_alto = valor
+            break
+    return v_baixo + (v_alto - v_baixo) * (posicao - baixo)
+
+
+class HistoricoAvaliacoes:
+    """Banco de avaliações, somente inserção, com inserções agrupadas em transações.
+
+    - `caminho`: arquivo SQLite (criado se não existir; ":memory:" para testes)
+    - `tamanho_lote`: avaliações acumuladas em memória antes de cada gravação
+
+    As consultas gravam antes o que estiver pendente; `fechar` (ou o `with`) grava o resto.
+    """
+
+    def __init__(self, caminho: str, tamanho_lote: int = TAMANHO_LOTE):
+        if caminho != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+        self.caminho = caminho
+        self.tamanho_lote = max(1, tamanho_lote)
+        self._trava = threading.Lock()
+        self._pendentes: List[Tuple] = []
+        self._db = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # com WAL, NORMAL só perde a última transação numa queda de energia, nunca corrompe o banco
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        for comando in _ESQUEMA:
+            self._db.execute(comando)
+        self._db.commit()
+
+    # ---------------------------
+    # inserção
+    # ---------------------------
+    def registrar_registro(self, registro: Dict, aluno: Optional[str] = None, atividade: str = "",
+                           data: Union[None, float, str, datetime.datetime] = None, tema: Optional[str] = None):
+        """Acrescenta uma avaliação no formato de `lote.montar_registro` ou `gravador.resumo_relatorio`.
+
+        Sem `aluno`, usa o nome do arquivo do registro; registros com erro são ignorados.
+        """
+        if "erro" in registro or "nota_final" not in registro:
+            return
+        arquivo = registro.get("arquivo")
+        if aluno is None:
+            if not arquivo:
+                raise ValueError("informe o aluno (o registro não tem o campo 'arquivo')")
+            aluno = aluno_do_arquivo(arquivo)
+        detalhe = registro.get("detalhe") or {}
+        metricas = registro.get("metricas") or {}
+        linha = (
+            aluno, atividade or "", registro.get("genero") or "",
+            _data_em_segundos(data if data is not None else registro.get("data")),
+            (tema if tema is not None else registro.get("tema")) or "", arquivo,
+            registro["nota_final"], registro.get("pontos"),
+        ) + tuple(detalhe.get(c) for c in CRITERIOS) + tuple(metricas.get(m) for m in METRICAS)
+        with self._trava:
+            self._pendentes.append(linha)
+            if len(self._pendentes) >= self.tamanho_lote:
+                self._gravar_pendentes()
+
+    def registrar(self, aluno: str, rel, fb: Dict, atividade: str = "", tema: str = "",
+                  data: Union[None, float, str, datetime.datetime] = None, arquivo: Optional[str] = None):
+        """Acrescenta uma avaliação a partir do relatório do avaliador e do feedback."""
+        registro = {
+            "genero": rel.get("genero"),
+            "nota_final": fb["nota_final"],
+            "pontos": fb["pontos"],
+            "detalhe": fb.get("detalhe", {}),
+            "metricas": {m: (contagem(rel, "paragrafos") if m == "num_paragrafos" else rel.get(m, 0))
+                         for m in METRICAS},
+        }
+        if arquivo is not None:
+            registro["arquivo"] = arquivo
+        self.registrar_registro(registro, aluno, atividade, data, tema)
+
+    def _gravar_pendentes(self):
+        if not self._pendentes:
+            return
+        marcadores = ", ".join("?" * len(_COLUNAS))
+        distribuicao: Counter = Counter()
+        for linha in self._pendentes:
+            for campo in CAMPOS_DISTRIBUICAO:
+                valor = linha[_POSICAO[campo]]
+                if valor is not None:
+                    distribuicao[(linha[1], linha[2], campo, valor)] += 1
+        with self._db:  # uma transação por lote: avaliações e distribuição andam juntas
+            self._db.executemany(
+                f"INSERT INTO avaliacoes ({', '.join(_COLUNAS)}) VALUES ({marcadores})", self._pendentes
+            )
+            self._db.executemany(
+                "INSERT INTO distribuicao (atividade, genero, campo, valor, n) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (campo, atividade, genero, valor) DO UPDATE SET n = n + excluded.n",
+                [chave + (n,) for chave, n in distribuicao.items()],
+            )
+        self._pendentes = []
+
+    def descarregar(self):
+        """Grava as avaliações acumuladas."""
+        with self._trava:
+            self._gravar_pendentes()
+
+    def fechar(self):
+        if self._db is not None:
+            self.descarregar()
+            self._db.close()
+            self._db = None
+
+    def __enter__(self) -> "HistoricoAvaliacoes":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+        return False
+
+    # ---------------------------
+    # consultas
+    # ---------------------------
+    @staticmethod
+    def _filtros(aluno: Optional[str] = None, atividade: Optional[str] = None,
+                 genero: Optional[str] = None, desde=None, ate=None) -> Tuple[str, List]:
+        condicoes, parametros = [], []
+        for coluna, valor in (("aluno", aluno), ("atividade", atividade), ("genero", genero)):
+            if valor is not None:
+                condicoes.append(f"{coluna} = ?")
+                parametros.append(valor)
+        if desde is not None:
+            condicoes.append("data >= ?")
+            parametros.append(_data_em_segundos(desde))
+        if ate is not None:
+            condicoes.append("data < ?")
+            parametros.append(_data_em_segundos(ate))
+        return (" WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+    def _consultar(self, sql: str, parametros: Sequence = ()) -> List[Tuple]:
+        with self._trava:
+            self._gravar_pendentes()
+            return self._db.execute(sql, parametros).fetchall()
+
+    @staticmethod
+    def _validar_campo(campo: str) -> str:
+        if campo not in CAMPOS:
+            raise ValueError(f"campo desconhecido: {campo} (use {', '.join(CAMPOS)})")
+        return campo
+
+    def __len__(self) -> int:
+        return self._consultar("SELECT COUNT(*) FROM avaliacoes")[0][0]
+
+    def avaliacoes(self, aluno: Optional[str] = None, atividade: Optional[str] = None,
+                   genero: Optional[str] = None, desde=None, ate=None, limite: Optional[int] = None) -> List[Dict]:
+        """Avaliações (mais antigas primeiro) que atendem aos filtros."""
+        where, parametros = self._filtros(aluno, atividade, genero, desde, ate)
+        sql = f"SELECT {', '.join(_COLUNAS)} FROM avaliacoes{where} ORDER BY data, id"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return [dict(zip(_COLUNAS, linha)) for linha in self._consultar(sql, parametros)]
+
+    def tendencia(self, aluno: str, campo: str = "nota_final", atividade: Optional[str] = None,
+                  genero: Optional[str] = None, desde=None, ate=None) -> Dict:
+        """Evolução de `campo` para um aluno: pontos (data, atividade, valor) e a inclinação
+        da reta de mínimos quadrados, em unidades do campo por dia."""
+        campo = self._validar_campo(campo)
+        where, parametros = self._filtros(aluno, atividade, genero, desde, ate)
+        linhas = self._consultar(
+            f"SELECT data, atividade, {campo} FROM avaliacoes{where} AND {campo} IS NOT NULL"
+            " ORDER BY data, id", parametros)
+        pontos = [{"data": datetime.datetime.fromtimestamp(d).isoformat(timespec="seconds"),
+                   "atividade": a, "valor": v} for d, a, v in linhas]
+        inclinacao = None
+        if len(linhas) >= 2:
+            dias = [d / 86400.0 for d, _, _ in linhas]
+            valores = [v for _, _, v in linhas]
+            media_x = sum(dias) / len(dias)
+            media_y = sum(valores) / len(valores)
+            sxx = sum((x - media_x) ** 2 for x in dias)
+            if sxx > 0:
+                sxy = sum((x - media_x) * (y - media_y) for x, y in zip(dias, valores))
+                inclinacao = sxy / sxx
+        return {"aluno": aluno, "campo": campo, "pontos": pontos, "inclinacao_por_dia": inclinacao}
+
+    def percentis(self, campo: str = "nota_final", percentis: Iterable[float] = (10, 25, 50, 75, 90),
+                  aluno: Optional[str] = None, atividade: Optional[str] = None,
+                  genero: Optional[str] = None, desde=None, ate=None) -> Dict:
+        """Contagem, média e percentis de `campo` nas avaliações que atendem aos filtros.
+
+        O banco devolve só os valores distintos com suas ocorrências, e os percentis são
+        interpolados sobre essa distribuição. Para as notas filtradas só por atividade e
+        gênero, a distribuição já está pronta na tabela `distribuicao`.
+        """
+        campo = self._validar_campo(campo)
+        if campo in CAMPOS_DISTRIBUICAO and aluno is None and desde is None and ate is None:
+            where, parametros = self._filtros(None, atividade, genero)
+            where = (where + " AND " if where else " WHERE ") + "campo = ?"
+            contagens = self._consultar(
+                f"SELECT valor, SUM(n) FROM distribuicao{where} GROUP BY valor ORDER BY valor",
+                parametros + [campo])
+        else:
+            where, parametros = self._filtros(aluno, atividade, genero, desde, ate)
+            where = (where + " AND " if where else " WHERE ") + f"{campo} IS NOT NULL"
+            contagens = self._consultar(
+                f"SELECT {campo}, COUNT(*) FROM avaliacoes{where} GROUP BY {campo} ORDER BY {campo}",
+                parametros)
+        total = sum(n for _, n in contagens)
+        return {
+            "campo": campo,
+            "avaliacoes": total,
+            "media": round(sum(v * n for v, n in contagens) / total, 4) if total else None,
+            "percentis": {f"p{p:g}": percentil(contagens, p) for p in percentis},
+        }
+
+    def medias_por_atividade(self, campo: str = "nota_final", aluno: Optional[str] = None,
+                             genero: Optional[str] = None) -> List[Dict]:
+        """Média de `campo` em cada atividade, na ordem em que as atividades aconteceram."""
+        campo = self._validar_campo(campo)
+        where, parametros = self._filtros(aluno, None, genero)
+        linhas = self._consultar(
+            f"SELECT atividade, COUNT({campo}), AVG({campo}), MIN(data) FROM avaliacoes{where}"
+            " GROUP BY atividade ORDER BY MIN(data)", parametros)
+        return [{"atividade": a, "avaliacoes": n, "media": round(m, 4) if m is not None else None}
+                for a, n, m, _ in linhas]
+
+
+# ===========================
+# LINHA DE COMANDO
+# ===========================
+def importar_jsonl(historico: HistoricoAvaliacoes, caminho: str, atividade: str = "",
+                   data=None) -> int:
+    """Importa os registros de uma saída JSONL de `data.lote` (aluno = nome do arquivo)."""
+    total = 0
+    with open(caminho, "r", encoding="utf-8") as f:
+        for linha in f:
+            linha = linha.strip()
+            if not linha:
+                continue
+            registro = json.loads(linha)
+            if "erro" in registro or "nota_final" not in registro:
+                continue
+            historico.registrar_registro(registro, atividade=atividade, data=data)
+            total += 1
+    return total
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Consultas ao histórico de avaliações por aluno.")
+    parser.add_argument("banco", help="arquivo SQLite do histórico")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_importar = sub.add_parser("importar", help="importa a saída JSONL de um lote")
+    p_importar.add_argument("jsonl")
+    p_importar.add_argument("--atividade", default="")
+    p_importar.add_argument("--data", default=None, help="data da atividade (ISO, padrão: agora)")
+
+    def filtros(p, com_aluno=True):
+        if com_aluno:
+            p.add_argument("--aluno", default=None)
+        p.add_argument("--atividade", default=None)
+        p.add_argument("--genero", default=None)
+        p.add_argument("--desde", default=None, help="data inicial (ISO)")
+        p.add_argument("--ate", default=None, help="data final (ISO, exclusiva)")
+        p.add_argument("--campo", default="nota_final", choices=CAMPOS)
+
+    p_tendencia = sub.add_parser("tendencia", help="evolução de um campo para um aluno")
+    filtros(p_tendencia, com_aluno=False)
+    p_tendencia.add_argument("--aluno", required=True)
+    p_percentis = sub.add_parser("percentis", help="média e percentis de um campo")
+    filtros(p_percentis)
+    p_atividades = sub.add_parser("atividades", help="média de um campo por atividade")
+    p_atividades.add_argument("--aluno", default=None)
+    p_atividades.add_argument("--genero", default=None)
+    p_atividades.add_argument("--campo", default="nota_final", choices=CAMPOS)
+    args = parser.parse_args(argv)
+
+    with HistoricoAvaliacoes(args.banco) as historico:
+        if args.comando == "importar":
+            total = importar_jsonl(historico, args.jsonl, args.atividade, args.data)
+            print(f"{total} avaliações importadas para {args.banco}.")
+            return
+        if args.comando == "tendencia":
+            resultado = historico.tendencia(args.aluno, args.campo, args.atividade, args.genero,
+                                            args.desde, args.ate)
+        elif args.comando == "percentis":
+            resultado = historico.percentis(args.campo, aluno=args.aluno, atividade=args.atividade,
+                                            genero=args.genero, desde=args.desde, ate=args.ate)
+        else:
+            resultado = historico.medias_por_atividade(args.campo, args.aluno, args.genero)
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# incremental.py
+# Reavaliação incremental de rascunhos: o texto é dividido nos mesmos blocos do
+# AnalisadorBasico (linha em branco) e a tokenização de cada bloco (frases, tokens,
+# contagem de palavras, frases longas) fica em cache pelo hash do seu conteúdo. Ao
+# reenviar uma redação com um ou dois parágrafos alterados, só eles são tokenizados de
+# novo; as métricas do documento são remontadas a partir das partes guardadas e são
+# idênticas às de uma análise completa.
+
+import hashlib
+import threading
+from array import array
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AnalisadorBasico, AvaliadorTexto
+    from .documento import DocumentoTokenizado, calcular_offsets, corte_seguro, excede_palavras
+    from .instrumentacao import etapa
+    from .relatorio import RelatorioAnalise
+    from .tokenizacao import BackendTokenizacao, obter_backend
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AnalisadorBasico, AvaliadorTexto
+    from documento import DocumentoTokenizado, calcular_offsets, corte_seguro, excede_palavras
+    from instrumentacao import etapa
+    from relatorio import RelatorioAnalise
+    from tokenizacao import BackendTokenizacao, obter_backend
+
+# Unidades (blocos) mantidas em cache por padrão; uma redação tem de 3 a 10
+MAX_UNIDADES = 4096
+
+
+class _Unidade:
+    """Tokenização de um bloco do texto, reaproveitável em qualquer documento que o contenha.
+
+    - `offsets`: (início, fim) das sentenças definitivas, relativos ao início da unidade
+    - `tokens_por_frase`: tokens dessas sentenças
+    - `contador`: palavras alfabéticas (minúsculas) dessas sentenças, na ordem
+    - `longas`: índices (locais) das sentenças com mais de 35 palavras
+    - `resto`: posição, no bloco, do trecho final ainda pendente (ver `corte_seguro`);
+      None quando o bloco é o último do texto e não há pendência
+    """
+
+    __slots__ = ("offsets", "tokens_por_frase", "contador", "longas", "resto")
+
+    def __init__(self, unidade: str, offsets: List[Tuple[int, int]],
+                 tokens_por_frase: List[List[str]], resto: Optional[int]):
+        self.offsets = array("l")
+        for par in offsets:
+            self.offsets.extend(par)
+        self.tokens_por_frase = tokens_por_frase
+        self.contador = Counter(t.lower() for tokens in tokens_por_frase for t in tokens if t.isalpha())
+        self.longas = [i for i, (ini, fim) in enumerate(offsets) if excede_palavras(unidade, ini, fim, 35)]
+        self.resto = resto
+
+
+class AnalisadorIncremental(AnalisadorBasico):
+    """AnalisadorBasico com cache de tokenização por bloco de texto.
+
+    Cada unidade tokenizada é o bloco atual precedido do trecho ainda pendente do bloco
+    anterior (as sentenças finais de um bloco podem continuar no seguinte, como no modo
+    em fluxo); a chave do cache é o hash dessa unidade. Um bloco alterado invalida a
+    própria unidade e, no máximo, a seguinte, se a pendência mudar.
+
+    O relatório devolvido é o mesmo de `AnalisadorBasico.analisar(texto)`.
+    """
+
+    def __init__(self, max_unidades: int = MAX_UNIDADES,
+                 tokenizador: Union[None, str, BackendTokenizacao] = None):
+        super().__init__(tokenizador)
+        self.max_unidades = max_unidades
+        self._unidades: "OrderedDict[bytes, _Unidade]" = OrderedDict()
+        self._trava = threading.Lock()
+        self.reaproveitadas = 0
+        self.recalculadas = 0
+
+    @staticmethod
+    def _chave(unidade: str, final: bool, backend: BackendTokenizacao) -> bytes:
+        h = hashlib.blake2b(unidade.encode("utf-8"), digest_size=16)
+        h.update(b"\x01" if final else b"\x00")
+        h.update(backend.nome.encode("utf-8"))
+        return h.digest()
+
+    def _obter(self, chave: bytes) -> Optional[_Unidade]:
+        with self._trava:
+            parte = self._unidades.get(chave)
+            if parte is not None:
+                self._unidades.move_to_end(chave)
+            return parte
+
+    def _guardar(self, chave: bytes, parte: _Unidade):
+        with self._trava:
+            self._unidades[chave] = parte
+            while len(self._unidades) > self.max_unidades:
+                self._unidades.popitem(last=False)
+
+    @staticmethod
+    def _tokenizar_unidade(unidade: str, final: bool, backend: BackendTokenizacao) -> _Unidade:
+        frases = backend.sent_tokenize(unidade)
+        offsets = calcular_offsets(unidade, frases)
+        resto: Optional[int] = None
+        if not final and frases:
+            k = corte_seguro(unidade, offsets)
+            resto = offsets[k][0]
+            frases = frases[:k]
+            offsets = offsets[:k]
+        word_tokenize = backend.word_tokenize
+        tokens_por_frase = [word_tokenize(f, preserve_line=True) for f in frases]
+        return _Unidade(unidade, offsets, tokens_por_frase, resto)
+
+    def _parte(self, unidade: str, final: bool, backend: BackendTokenizacao) -> _Unidade:
+        chave = self._chave(unidade, final, backend)
+        parte = self._obter(chave)
+        if parte is None:
+            parte = self._tokenizar_unidade(unidade, final, backend)
+            self._guardar(chave, parte)
+            self.recalculadas += 1
+        else:
+            self.reaproveitadas += 1
+        return parte
+
+    def tokenizar(self, texto: str) -> Tuple[DocumentoTokenizado, Counter, List[int]]:
+        """Documento tokenizado, contador de palavras e índices das frases longas,
+        montados a partir das unidades em cache (e das novas, tokenizadas aqui)."""
+        offsets = array("l")
+        tokens_por_frase: List[List[str]] = []
+        contador: Counter = Counter()
+        longas: List[int] = []
+        blocos = self._blocos(texto)
+        backend = obter_backend(self.tokenizador)
+        # início, em `texto`, do trecho ainda pendente; a primeira unidade começa no
+        # início do texto (o punkt inclui os espaços iniciais na primeira sentença)
+        pendente: Optional[int] = 0
+        for i, (inicio, fim) in enumerate(blocos):
+            final = i == len(blocos) - 1
+            ini_unidade = inicio if pendente is None else pendente
+            parte = self._parte(texto[ini_unidade:fim], final, backend)
+            base = len(tokens_por_frase)
+            # offsets da unidade deslocados para o texto inteiro
+            offsets.extend(o + ini_unidade for o in parte.offsets)
+            tokens_por_frase.extend(parte.tokens_por_frase)
+            contador.update(parte.contador)
+            longas.extend(base + j for j in parte.longas)
+            pendente = None if parte.resto is None else ini_unidade + parte.resto
+        return DocumentoTokenizado(texto, None, tokens_por_frase, offsets), contador, longas
+
+    def analisar(self, texto: str) -> RelatorioAnalise:
+        with etapa("tokenizacao") as medicao:
+            documento, contador, longas = self.tokenizar(texto)
+            medicao.contar_tokens(documento.num_tokens)
+        return self.montar_relatorio(documento, contador, longas)
+
+    def estatisticas(self) -> Dict[str, int]:
+        return {
+            "unidades": len(self._unidades),
+            "reaproveitadas": self.reaproveitadas,
+            "recalculadas": self.recalculadas,
+        }
+
+    def limpar(self):
+        with self._trava:
+            self._unidades.clear()
+
+
+class AvaliadorIncremental(AvaliadorTexto):
+    """AvaliadorTexto que reaproveita a tokenização dos parágrafos já vistos."""
+
+    def __init__(self, max_unidades: int = MAX_UNIDADES,
+                 tokenizador: Union[None, str, BackendTokenizacao] = None):
+        super().__init__(tokenizador)
+        self.analisador = AnalisadorIncremental(max_unidades, tokenizador)
+
+
+_avaliador_incremental: Optional[AvaliadorIncremental] = None
+
+
+def analisar_texto_incremental(texto: str, tema: Optional[str] = "") -> dict:
+    """Equivalente a `analisar_texto`, reaproveitando os parágrafos de versões anteriores."""
+    global _avaliador_incremental
+    if _avaliador_incremental is None:
+        _avaliador_incremental = AvaliadorIncremental()
+    rel = _avaliador_incremental.avaliar_texto(texto)
+    rel["tema"] = tema
+    return rel
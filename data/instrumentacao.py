@@ -0,0 +1,274 @@
+# instrumentacao.py
+# Medição por etapa do pipeline de avaliação (detecção, tokenização, notas, reescrita).
+# As etapas são marcadas com `with etapa("nome"):`; sem um Perfilador ativo isso custa
+# apenas uma leitura de ContextVar. Com ele, cada etapa registra tempo, tokens e,
+# opcionalmente, memória alocada (tracemalloc).
+
+import bisect
+import contextvars
+import functools
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+_ATIVO: "contextvars.ContextVar[Optional[Perfilador]]" = contextvars.ContextVar(
+    "perfilador_ativo", default=None
+)
+
+# Limites superiores (ms) das faixas dos histogramas; a última faixa é aberta
+LIMITES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class _EtapaNula:
+    """Etapa usada quando não há Perfilador ativo: não mede nada."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def contar_tokens(self, n: int):
+        pass
+
+
+_NULA = _EtapaNula()
+
+
+class Medicao:
+    """Resultado de uma etapa: tempo (ms), tokens e memória (bytes, se medida)."""
+
+    __slots__ = ("nome", "ms", "tokens", "bytes_liquidos", "pico_bytes")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+        self.ms = 0.0
+        self.tokens = 0
+        self.bytes_liquidos: Optional[int] = None
+        self.pico_bytes: Optional[int] = None
+
+    def como_dict(self) -> Dict:
+        d = {"ms": round(self.ms, 3), "tokens": self.tokens}
+        if self.bytes_liquidos is not None:
+            d["bytes_liquidos"] = self.bytes_liquidos
+        if self.pico_bytes is not None:
+            d["pico_bytes"] = self.pico_bytes
+        return d
+
+
+class _EtapaMedida:
+    __slots__ = ("_perfilador", "medicao", "_inicio", "_memoria_inicial", "_pico")
+
+    def __init__(self, perfilador: "Perfilador", nome: str):
+        self._perfilador = perfilador
+        self.medicao = Medicao(nome)
+        self._pico = 0
+
+    def contar_tokens(self, n: int):
+        self.medicao.tokens += n
+
+    def __enter__(self):
+        perf = self._perfilador
+        if perf.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            if perf._pilha:
+                # o pico até aqui pertence à etapa externa (o reset abaixo o apagaria)
+                externa = perf._pilha[-1]
+                externa._pico = max(externa._pico, pico)
+            if hasattr(tracemalloc, "reset_peak"):  # Python 3.9+
+                tracemalloc.reset_peak()
+            self._memoria_inicial = atual
+        perf._pilha.append(self)
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        fim = time.perf_counter()
+        perf = self._perfilador
+        perf._pilha.pop()
+        medicao = self.medicao
+        medicao.ms = (fim - self._inicio) * 1000
+        if perf.memoria:
+            atual, pico = tracemalloc.get_traced_memory()
+            pico = max(pico, self._pico)
+            medicao.bytes_liquidos = atual - self._memoria_inicial
+            medicao.pico_bytes = max(0, pico - self._memoria_inicial)
+            if perf._pilha:
+                externa = perf._pilha[-1]
+                externa._pico = max(externa._pico, pico)
+        perf._registrar(medicao)
+        return False
+
+
+class Perfilador:
+    """Ativa a medição das etapas no contexto atual.
+
+        with Perfilador() as perf:
+            rel = avaliador.avaliar_texto(texto)
+            fb = pontuar_e_gerar_feedback(rel, tema)
+        perf.resumo()  # {"detectar": {"ms": ..., "tokens": ...}, ...}
+
+    - `memoria`: mede também a memória alocada em cada etapa (bem mais lento)
+    - `ganchos`: funções chamadas com cada `Medicao` assim que a etapa termina
+    """
+
+    def __init__(self, memoria: bool = False, ganchos: Optional[List[Callable[[Medicao], None]]] = None):
+        self.memoria = memoria
+        self.ganchos = list(ganchos or [])
+        self.medicoes: List[Medicao] = []
+        self._pilha: List[_EtapaMedida] = []
+        self._token = None
+        self._iniciou_tracemalloc = False
+
+    def __enter__(self) -> "Perfilador":
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        self._token = _ATIVO.set(self)
+        return self
+
+    def __exit__(self, *exc):
+        _ATIVO.reset(self._token)
+        self._token = None
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+        return False
+
+    def etapa(self, nome: str) -> _EtapaMedida:
+        return _EtapaMedida(self, nome)
+
+    def _registrar(self, medicao: Medicao):
+        self.medicoes.append(medicao)
+        for gancho in self.ganchos:
+            gancho(medicao)
+
+    def resumo(self) -> Dict[str, Dict]:
+        """Soma as medições por nome de etapa (uma etapa pode ocorrer várias vezes)."""
+        total: Dict[str, Dict] = {}
+        for medicao in self.medicoes:
+            atual = medicao.como_dict()
+            anterior = total.get(medicao.nome)
+            if anterior is None:
+                total[medicao.nome] = atual
+                continue
+            for chave, valor in atual.items():
+                if chave == "pico_bytes":
+                    anterior[chave] = max(anterior.get(chave, 0), valor)
+                else:
+                    anterior[chave] = round(anterior.get(chave, 0) + valor, 3)
+        return total
+
+
+def etapa(nome: str):
+    """Marca uma etapa do pipeline; não faz nada se não houver Perfilador ativo."""
+    perfilador = _ATIVO.get()
+    if perfilador is None:
+        return _NULA
+    return perfilador.etapa(nome)
+
+
+def medir(nome: str):
+    """Decorador: mede cada chamada da função como a etapa `nome`."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            perfilador = _ATIVO.get()
+            if perfilador is None:
+                return funcao(*args, **kwargs)
+            with perfilador.etapa(nome):
+                return funcao(*args, **kwargs)
+        return medida
+    return decorador
+
+
+def perfilador_ativo() -> Optional[Perfilador]:
+    return _ATIVO.get()
+
+
+def anexar_tempos(rel, perfilador: Optional[Perfilador] = None):
+    """Guarda em rel["tempos"] o resumo do perfilador (o ativo, se nenhum for passado)."""
+    perfilador = perfilador or perfilador_ativo()
+    if perfilador is not None:
+        rel["tempos"] = perfilador.resumo()
+    return rel
+
+
+# ===========================
+# HISTOGRAMAS (EXECUÇÕES EM LOTE)
+# ===========================
+class HistogramasEtapas:
+    """Agrega os resumos de muitas avaliações em histogramas de tempo por etapa.
+
+    Os resumos podem vir de outros processos (são dicts simples); dois agregadores
+    podem ser combinados com `juntar`.
+    """
+
+    def __init__(self, limites_ms=LIMITES_MS):
+        self.limites_ms = tuple(limites_ms)
+        self._etapas: Dict[str, Dict] = {}
+
+    def _etapa(self, nome: str) -> Dict:
+        dados = self._etapas.get(nome)
+        if dados is None:
+            dados = {"contagem": 0, "total_ms": 0.0, "max_ms": 0.0, "tokens": 0,
+                     "faixas": [0] * (len(self.limites_ms) + 1), "pico_bytes": None}
+            self._etapas[nome] = dados
+        return dados
+
+    def adicionar(self, resumo: Dict[str, Dict]):
+        for nome, medicao in resumo.items():
+            dados = self._etapa(nome)
+            ms = medicao["ms"]
+            dados["contagem"] += 1
+            dados["total_ms"] += ms
+            dados["max_ms"] = max(dados["max_ms"], ms)
+            dados["tokens"] += medicao.get("tokens", 0)
+            dados["faixas"][bisect.bisect_left(self.limites_ms, ms)] += 1
+            if "pico_bytes" in medicao:  # só com Perfilador(memoria=True)
+                dados["pico_bytes"] = max(dados["pico_bytes"] or 0, medicao["pico_bytes"])
+
+    def juntar(self, outro: "HistogramasEtapas") -> "HistogramasEtapas":
+        if outro.limites_ms != self.limites_ms:
+            raise ValueError("histogramas com faixas diferentes")
+        for nome, dados in outro._etapas.items():
+            meu = self._etapa(nome)
+            meu["contagem"] += dados["contagem"]
+            meu["total_ms"] += dados["total_ms"]
+            meu["max_ms"] = max(meu["max_ms"], dados["max_ms"])
+            meu["tokens"] += dados["tokens"]
+            meu["faixas"] = [a + b for a, b in zip(meu["faixas"], dados["faixas"])]
+            if dados["pico_bytes"] is not None:
+                meu["pico_bytes"] = max(meu["pico_bytes"] or 0, dados["pico_bytes"])
+        return self
+
+    def _percentil(self, dados: Dict, p: float) -> float:
+        """Limite superior da faixa que contém o percentil `p` (estimativa conservadora)."""
+        alvo = dados["contagem"] * p / 100
+        acumulado = 0
+        for i, n in enumerate(dados["faixas"]):
+            acumulado += n
+            if acumulado >= alvo and n:
+                return self.limites_ms[i] if i < len(self.limites_ms) else dados["max_ms"]
+        return dados["max_ms"]
+
+    def exportar(self) -> Dict[str, Dict]:
+        saida = {}
+        for nome, dados in self._etapas.items():
+            n = dados["contagem"]
+            rotulos = [f"<={limite}" for limite in self.limites_ms] + [f">{self.limites_ms[-1]}"]
+            saida[nome] = {
+                "contagem": n,
+                "media_ms": round(dados["total_ms"] / n, 3) if n else 0,
+                "p50_ms": self._percentil(dados, 50),
+                "p90_ms": self._percentil(dados, 90),
+                "p99_ms": self._percentil(dados, 99),
+                "max_ms": round(dados["max_ms"], 3),
+                "tokens": dados["tokens"],
+                "histograma_ms": dict(zip(rotulos, dados["faixas"])),
+            }
+            if dados["pico_bytes"] is not None:
+                saida[nome]["pico_bytes_max"] = dados["pico_bytes"]
+        return saida
@@ -0,0 +1,386 @@
+# lote.py
+# Avaliação em lote (não interativa): percorre um diretório ou padrão glob, distribui
+# os arquivos por um pool de processos e grava um registro de resultado por arquivo.
+
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AvaliadorTexto
+    from .cache import CacheResultados, chave_cache, normalizar_texto
+    from .estatisticas_turma import CHECKPOINT_A_CADA, EstatisticasTurma
+    from .estatisticas_turma import imprimir_resumo as imprimir_estatisticas
+    from .feedback import pontuar_e_gerar_feedback
+    from .gravador import FORMATOS, GravadorRelatorios
+    from .historico import TAMANHO_LOTE, HistoricoAvaliacoes
+    from .instrumentacao import HistogramasEtapas, Perfilador, anexar_tempos, etapa
+    from .relatorio import compactar, contagem
+    from .tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AvaliadorTexto
+    from cache import CacheResultados, chave_cache, normalizar_texto
+    from estatisticas_turma import CHECKPOINT_A_CADA, EstatisticasTurma
+    from estatisticas_turma import imprimir_resumo as imprimir_estatisticas
+    from feedback import pontuar_e_gerar_feedback
+    from gravador import FORMATOS, GravadorRelatorios
+    from historico import TAMANHO_LOTE, HistoricoAvaliacoes
+    from instrumentacao import HistogramasEtapas, Perfilador, anexar_tempos, etapa
+    from relatorio import compactar, contagem
+    from tokenizacao import BACKEND_PADRAO, BACKENDS, definir_backend
+
+GENEROS_VALIDOS = ("dissertação", "dissertacao", "conto", "poema", "fábula", "fabula")
+GENERO_PADRAO = "dissertação"
+
+# Métricas numéricas do AnalisadorBasico copiadas para cada registro de resultado
+METRICAS_REGISTRO = (
+    "num_palavras",
+    "num_frases",
+    "media_palavras_por_frase",
+    "variedade_vocabulario",
+    "vocabulario_unico",
+)
+
+# Estado "quente" de cada processo trabalhador (criado uma única vez no initializer)
+_AVALIADOR: Optional[AvaliadorTexto] = None
+_CACHE: Optional[CacheResultados] = None
+
+
+# ===========================
+# ESTADO DO TRABALHADOR
+# ===========================
+def iniciar_trabalhador(caminho_cache: Optional[str] = None, modelo_genero: Optional[str] = None,
+                        confianca_genero: Optional[float] = None):
+    """Cria o AvaliadorTexto do processo e carrega o punkt do NLTK antecipadamente.
+
+    Com `caminho_cache`, o processo também abre sua conexão com o cache em disco. Com
+    `modelo_genero` (pasta gravada por classificador.py), o gênero vem do classificador
+    estatístico, e das regras só quando a confiança fica abaixo de `confianca_genero`.
+    """
+    global _AVALIADOR, _CACHE
+    detector = None
+    if modelo_genero:
+        # NumPy só é carregado quando há modelo
+        try:
+            from .classificador import LIMIAR_CONFIANCA, carregar_detector
+        except Exception:
+            from classificador import LIMIAR_CONFIANCA, carregar_detector
+        limiar = LIMIAR_CONFIANCA if confianca_genero is None else confianca_genero
+        detector = carregar_detector(modelo_genero, limiar)
+    _AVALIADOR = AvaliadorTexto(detector=detector)
+    if caminho_cache:
+        _CACHE = CacheResultados(caminho_cache)
+    try:
+        # A primeira tokenização carrega as tabelas do punkt; paga-se esse custo aqui,
+        # e não no primeiro arquivo avaliado.
+        _AVALIADOR.analisador.analisar("Aquecimento do tokenizador. Pronto.")
+    except Exception:
+        pass
+
+
+def _avaliador_do_processo() -> AvaliadorTexto:
+    if _AVALIADOR is None:
+        iniciar_trabalhador()
+    return _AVALIADOR
+
+
+# ===========================
+# AVALIAÇÃO SEM INTERAÇÃO
+# ===========================
+def avaliar_sem_interacao(texto: str, tema: str = "", genero: Optional[str] = None,
+                          genero_padrao: str = GENERO_PADRAO,
+                          avaliador: Optional[AvaliadorTexto] = None,
+                          cache: Optional[CacheResultados] = None) -> Tuple[dict, dict]:
+    """Executa análise + feedback sem nunca chamar `input()`.
+
+    `genero` (se válido) sobrescreve a detecção automática; quando a detecção retorna
+    'desconhecido', usa-se `genero_padrao` no lugar de `forcar_escolha_genero`.
+    Com `cache`, um acerto devolve o resultado guardado sem passar pelo NLTK.
+    """
+    if cache is not None:
+        texto = normalizar_texto(texto)
+        chave = chave_cache(texto, tema, genero, genero_padrao, _assinatura_detector(avaliador))
+        with etapa("cache"):
+            guardado = cache.obter(chave)
+        if guardado is not None:
+            return guardado
+        rel, fb = avaliar_sem_interacao(texto, tema, genero, genero_padrao, avaliador)
+        cache.guardar(chave, rel, fb)
+        return rel, fb
+
+    avaliador = avaliador or _avaliador_do_processo()
+    rel = avaliador.avaliar_texto(texto)
+    rel["tema"] = tema
+    rel["genero_detectado"] = rel["genero"]
+    if genero and genero.strip().lower() in GENEROS_VALIDOS:
+        rel["genero"] = genero.strip().lower()
+    elif rel["genero"] == "desconhecido":
+        rel["genero"] = genero_padrao
+    fb = pontuar_e_gerar_feedback(rel, tema, texto)
+    # o feedback era o último a usar os tokens; o registro e o .txt só precisam dos offsets
+    return compactar(rel), fb
+
+
+def _assinatura_detector(avaliador: Optional[AvaliadorTexto]) -> str:
+    """Identifica o modelo de gênero do avaliador ("" para a cascata de regras)."""
+    avaliador = avaliador or _AVALIADOR
+    return getattr(avaliador.detect, "assinatura", "") if avaliador is not None else ""
+
+
+def avaliar_no_processo(texto: str, tema: str = "", genero: Optional[str] = None,
+                        genero_padrao: str = GENERO_PADRAO) -> Tuple[dict, dict]:
+    """Avalia com o estado quente do processo (avaliador e cache criados no initializer)."""
+    return avaliar_sem_interacao(texto, tema, genero, genero_padrao, cache=_CACHE)
+
+
+def montar_registro(rel: dict, fb: dict) -> Dict:
+    """Reduz relatório + feedback a um registro serializável em JSON."""
+    metricas = {k: rel.get(k, 0) for k in METRICAS_REGISTRO}
+    metricas["num_paragrafos"] = contagem(rel, "paragrafos")
+    return {
+        "genero": rel.get("genero"),
+        "genero_detectado": rel.get("genero_detectado", rel.get("genero")),
+        "nota_final": fb["nota_final"],
+        "pontos": fb["pontos"],
+        "detalhe": fb["detalhe"],
+        "comentarios": fb["comentarios"],
+        "sugestoes": fb["sugestoes"],
+        "exemplo_reescrita": fb["exemplo_reescrita"],
+        "exemplo_reescrita_auto": fb["exemplo_reescrita_auto"],
+        "metricas": metricas,
+    }
+
+
+def avaliar_arquivo(caminho: str, tema: str = "", genero: Optional[str] = None,
+                    genero_padrao: str = GENERO_PADRAO, perfil: bool = False,
+                    memoria: bool = False) -> Dict:
+    """Avalia um arquivo .txt; erros viram um registro com o campo 'erro'.
+
+    Com `perfil`, o registro traz em "tempos" o tempo e os tokens de cada etapa; com
+    `memoria` também, os bytes alocados por etapa (tracemalloc, bem mais lento).
+    """
+    registro: Dict = {"arquivo": caminho}
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            texto = f.read()
+        if not texto.strip():
+            registro["erro"] = "arquivo vazio"
+            return registro
+        perfilador = Perfilador(memoria=memoria) if perfil or memoria else None
+        with perfilador or contextlib.nullcontext():
+            rel, fb = avaliar_no_processo(texto, tema, genero, genero_padrao)
+        registro.update(montar_registro(rel, fb))
+        if perfilador is not None:
+            anexar_tempos(registro, perfilador)
+    except Exception as e:
+        registro["erro"] = f"{type(e).__name__}: {e}"
+    return registro
+
+
+# ===========================
+# EXECUÇÃO EM LOTE
+# ===========================
+def listar_arquivos(alvo: str, recursivo: bool = False) -> List[str]:
+    """Aceita um diretório (todos os .txt dentro dele) ou um padrão glob."""
+    if os.path.isdir(alvo):
+        padrao = os.path.join(alvo, "**", "*.txt") if recursivo else os.path.join(alvo, "*.txt")
+    else:
+        padrao = alvo
+    return sorted(p for p in glob.glob(padrao, recursive=recursivo) if os.path.isfile(p))
+
+
+def avaliar_lote(arquivos: Iterable[str], tema: str = "", genero: Optional[str] = None,
+                 genero_padrao: str = GENERO_PADRAO,
+                 processos: Optional[int] = None,
+                 caminho_cache: Optional[str] = None,
+                 perfil: bool = False,
+                 memoria: bool = False,
+                 modelo_genero: Optional[str] = None,
+                 confianca_genero: Optional[float] = None) -> Iterator[Dict]:
+    """Gera um registro por arquivo, na mesma ordem de `arquivos`.
+
+    `processos` padrão = número de núcleos da máquina; com 1 processo tudo roda no
+    processo atual (útil para depuração). `caminho_cache` ativa o cache em disco;
+    `modelo_genero` troca a detecção de gênero (ver `iniciar_trabalhador`). `perfil` e
+    `memoria` são repassados a `avaliar_arquivo`.
+    """
+    arquivos = list(arquivos)
+    processos = processos or os.cpu_count() or 1
+    processos = max(1, min(processos, len(arquivos) or 1))
+    tarefa = partial(avaliar_arquivo, tema=tema, genero=genero, genero_padrao=genero_padrao,
+                     perfil=perfil, memoria=memoria)
+
+    if processos == 1:
+        iniciar_trabalhador(caminho_cache, modelo_genero, confianca_genero)
+        for caminho in arquivos:
+            yield tarefa(caminho)
+        return
+
+    # blocos maiores reduzem a troca de mensagens entre processos
+    tamanho_bloco = max(1, len(arquivos) // (processos * 4))
+    with multiprocessing.Pool(processes=processos, initializer=iniciar_trabalhador,
+                              initargs=(caminho_cache, modelo_genero, confianca_genero)) as pool:
+        for registro in pool.imap(tarefa, arquivos, chunksize=tamanho_bloco):
+            yield registro
+
+
+def _acumular_tempos(registros: Iterable[Dict], histogramas: HistogramasEtapas) -> Iterator[Dict]:
+    for registro in registros:
+        if "tempos" in registro:
+            histogramas.adicionar(registro["tempos"])
+        yield registro
+
+
+def _gravar_checkpoint(estatisticas: EstatisticasTurma, caminho: str, gravador: GravadorRelatorios,
+                       historico: Optional[HistoricoAvaliacoes]):
+    """Grava o estado da turma só depois que a saída e o histórico têm os mesmos registros."""
+    estatisticas.bytes_saida = gravador.descarregar()
+    if historico is not None:
+        historico.descarregar()
+    estatisticas.salvar(caminho)
+
+
+def _voltar_saida(caminho: str, tamanho: Optional[int]):
+    """Corta a saída no tamanho do último checkpoint: os registros depois dele serão refeitos."""
+    if tamanho is None:
+        raise ValueError("o estado não tem a posição da saída (não foi gravado por data.lote)")
+    atual = os.path.getsize(caminho) if os.path.exists(caminho) else 0
+    if atual < tamanho:
+        raise ValueError(f"{caminho} é menor que no último checkpoint ({atual} < {tamanho} bytes)")
+    if atual > tamanho:
+        os.truncate(caminho, tamanho)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Avalia em lote todos os .txt de um diretório (ou padrão glob)."
+    )
+    parser.add_argument("alvo", help="diretório com arquivos .txt ou padrão glob (ex: 'turma/*.txt')")
+    parser.add_argument("--tema", default="", help="tema da atividade")
+    parser.add_argument("--genero", default=None,
+                        help="gênero a aplicar em todos os textos (sobrescreve a detecção)")
+    parser.add_argument("--genero-padrao", default=GENERO_PADRAO,
+                        help="gênero usado quando a detecção retorna 'desconhecido'")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: núcleos da máquina)")
+    parser.add_argument("--recursivo", action="store_true", help="inclui subdiretórios")
+    parser.add_argument("--saida", default="resultados_lote.jsonl", help="arquivo de saída")
+    parser.add_argument("--formato", default=None, choices=FORMATOS,
+                        help="formato da saída (padrão: pela extensão de --saida; JSONL se não for .csv/.txt)")
+    parser.add_argument("--rotacionar-mb", type=float, default=None,
+                        help="rotaciona a saída (saida.1, saida.2...) ao passar deste tamanho")
+    parser.add_argument("--intervalo-flush", type=float, default=1.0,
+                        help="segundos entre descargas do buffer da saída (padrão: 1)")
+    parser.add_argument("--cache", default=None,
+                        help="arquivo SQLite do cache de resultados (reaproveita textos já avaliados)")
+    parser.add_argument("--tokenizador", default=None, choices=sorted(BACKENDS),
+                        help=f"backend de tokenização (padrão: {BACKEND_PADRAO}; 'rapido' dispensa o NLTK)")
+    parser.add_argument("--modelo-genero", default=None, metavar="PASTA",
+                        help="detecta o gênero com o classificador treinado (python -m data.classificador)")
+    parser.add_argument("--confianca-genero", type=float, default=None,
+                        help="confiança mínima do classificador; abaixo dela valem as regras (padrão: 0.6)")
+    parser.add_argument("--historico", default=None, metavar="ARQUIVO_DB",
+                        help="acrescenta cada avaliação ao histórico SQLite (aluno = nome do arquivo)")
+    parser.add_argument("--atividade", default="",
+                        help="nome da atividade no histórico (ex: 'Redação 3')")
+    parser.add_argument("--estatisticas-turma", default=None, metavar="ESTADO_JSON",
+                        help="médias, desvios e percentis por critério; o estado é gravado aqui "
+                             f"a cada {CHECKPOINT_A_CADA} avaliações")
+    parser.add_argument("--retomar", action="store_true",
+                        help="continua um lote interrompido a partir do estado de --estatisticas-turma "
+                             "(a saída volta ao ponto do estado e é completada)")
+    parser.add_argument("--perfil", default=None, metavar="ARQUIVO_JSON",
+                        help="mede cada etapa e grava histogramas de tempo agregados neste arquivo")
+    parser.add_argument("--perfil-memoria", action="store_true",
+                        help="com --perfil, mede também a memória alocada em cada etapa (bem mais lento)")
+    args = parser.parse_args(argv)
+
+    if args.genero and args.genero.strip().lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero inválido: {args.genero}")
+    if args.genero_padrao.lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero padrão inválido: {args.genero_padrao}")
+    if args.retomar and not args.estatisticas_turma:
+        parser.error("--retomar requer --estatisticas-turma")
+    if args.perfil_memoria and not args.perfil:
+        parser.error("--perfil-memoria requer --perfil")
+    if args.retomar and args.rotacionar_mb:
+        parser.error("--retomar não funciona com --rotacionar-mb")
+
+    if args.tokenizador:
+        # os trabalhadores leem a variável de ambiente ao tokenizar pela primeira vez
+        os.environ["AVALIADOR_TOKENIZADOR"] = args.tokenizador
+        definir_backend(args.tokenizador)
+
+    arquivos = listar_arquivos(args.alvo, args.recursivo)
+    if not arquivos:
+        print("Nenhum arquivo .txt encontrado.")
+        return
+    estatisticas = None
+    retomando = False
+    if args.estatisticas_turma:
+        if args.retomar and os.path.exists(args.estatisticas_turma):
+            estatisticas = EstatisticasTurma.carregar(args.estatisticas_turma)
+            try:
+                _voltar_saida(args.saida, estatisticas.bytes_saida)
+            except ValueError as e:
+                parser.error(str(e))
+            retomando = True
+            if estatisticas.ultimo_arquivo:
+                # os registros saem na ordem (ordenada) da lista: tudo até o último já foi contado
+                arquivos = [a for a in arquivos if a > estatisticas.ultimo_arquivo]
+            print(f"Retomando: {estatisticas.avaliacoes + estatisticas.erros} arquivos já avaliados, "
+                  f"{len(arquivos)} restantes.")
+        else:
+            estatisticas = EstatisticasTurma()
+    registros = avaliar_lote(arquivos, args.tema, args.genero, args.genero_padrao.lower(),
+                             args.processos, args.cache, perfil=bool(args.perfil),
+                             memoria=args.perfil_memoria,
+                             modelo_genero=args.modelo_genero, confianca_genero=args.confianca_genero)
+    histogramas = HistogramasEtapas()
+    if args.perfil:
+        registros = _acumular_tempos(registros, histogramas)
+    max_bytes = int(args.rotacionar_mb * 1024 * 1024) if args.rotacionar_mb else None
+    if args.historico:
+        # com checkpoints, o histórico só grava junto com eles (nunca avaliações além do estado)
+        tamanho_lote = max(TAMANHO_LOTE, CHECKPOINT_A_CADA + 1) if estatisticas is not None else TAMANHO_LOTE
+        historico = HistoricoAvaliacoes(args.historico, tamanho_lote=tamanho_lote)
+    else:
+        historico = contextlib.nullcontext()
+    # a gravação roda numa thread própria: o processo principal só recolhe os resultados
+    with GravadorRelatorios(args.saida, args.formato, intervalo_flush=args.intervalo_flush,
+                            max_bytes=max_bytes, anexar=retomando) as gravador, historico:
+        for registro in registros:
+            if args.historico:
+                historico.registrar_registro(registro, atividade=args.atividade, tema=args.tema)
+            if estatisticas is not None:
+                estatisticas.adicionar_registro(registro, tema=args.tema)
+            if gravador.formato != "jsonl":
+                # CSV e .txt mostram o tema em cada relatório
+                registro = dict(registro, tema=args.tema)
+            gravador.escrever(registro)
+            if estatisticas is not None and (estatisticas.avaliacoes + estatisticas.erros) % CHECKPOINT_A_CADA == 0:
+                _gravar_checkpoint(estatisticas, args.estatisticas_turma, gravador,
+                                   historico if args.historico else None)
+        if estatisticas is not None:
+            _gravar_checkpoint(estatisticas, args.estatisticas_turma, gravador,
+                               historico if args.historico else None)
+    total = gravador.escritos
+    print(f"{total} arquivos avaliados. Resultados em: {args.saida}")
+    if estatisticas is not None:
+        imprimir_estatisticas(estatisticas.resumo())
+        print(f"Estatísticas da turma em: {args.estatisticas_turma}")
+    if args.perfil:
+        with open(args.perfil, "w", encoding="utf-8") as f:
+            json.dump(histogramas.exportar(), f, indent=2, ensure_ascii=False)
+        print(f"Tempos por etapa em: {args.perfil}")
+
+
+if __name__ == "__main__":
+    main()
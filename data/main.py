@@ -4,14 +4,34 @@
 try:
     # Prefer relative imports when used as a package
     from .avaliador import analisar_texto
+    from .cache import CacheResultados, chave_cache, normalizar_texto
     from .feedback import pontuar_e_gerar_feedback
+    from .gravador import formatar_txt, resumo_relatorio
+    from .incremental import analisar_texto_incremental
+    from .relatorio import compactar, contagem
 except Exception:
     # Fallback for direct script execution (keeps backwards compatibility)
     from avaliador import analisar_texto
+    from cache import CacheResultados, chave_cache, normalizar_texto
     from feedback import pontuar_e_gerar_feedback
-import datetime
+    from gravador import formatar_txt, resumo_relatorio
+    from incremental import analisar_texto_incremental
+    from relatorio import compactar, contagem
 import os
 
+GENEROS_VALIDOS = ("dissertação", "dissertacao", "conto", "poema", "fábula", "fabula")
+
+# Cache de resultados da sessão: em memória, e também em disco se a variável
+# AVALIADOR_CACHE_RESULTADOS apontar um arquivo SQLite (o mesmo do `--cache` do lote serve)
+_CACHE_RESULTADOS = None
+
+
+def cache_resultados() -> CacheResultados:
+    global _CACHE_RESULTADOS
+    if _CACHE_RESULTADOS is None:
+        _CACHE_RESULTADOS = CacheResultados(os.environ.get("AVALIADOR_CACHE_RESULTADOS") or None)
+    return _CACHE_RESULTADOS
+
 def mostrar_menu():
     print("\n=== Avaliador de Textos — Modo Educacional ===")
     print("1 - Digitar o texto no terminal")
@@ -84,9 +104,10 @@ def imprimir_relatorio_completo(texto: str, tema: str, rel, fb):
 
     # Parágrafos
     paragrafos = rel.get('paragrafos', [])
-    print(f" - Parágrafos detectados: {len(paragrafos)}")
-    if paragrafos:
-        exemplo_par = paragrafos[0].strip().replace("\n", " ")
+    print(f" - Parágrafos detectados: {contagem(rel, 'paragrafos')}")
+    primeiro_par = paragrafos[0] if paragrafos else rel.get('paragrafo_inicial', '')
+    if primeiro_par:
+        exemplo_par = primeiro_par.strip().replace("\n", " ")
         if len(exemplo_par) > 180:
             exemplo_par = exemplo_par[:180].rstrip() + "..."
         print(f"   Exemplo (início): {exemplo_par}")
@@ -110,39 +131,7 @@ def imprimir_relatorio_completo(texto: str, tema: str, rel, fb):
 def salvar_relatorio_em_txt(nome_arquivo: str, texto: str, tema: str, rel, fb):
     try:
         with open(nome_arquivo, "w", encoding="utf-8") as f:
-            f.write("RELATÓRIO DE AVALIAÇÃO\n")
-            f.write(f"DATA: {datetime.datetime.now().isoformat()}\n\n")
-            f.write(f"TEMA: {tema}\n\n")
-            f.write(f"NOTA: {fb['nota_final']} /10  (pontos: {fb['pontos']}/10)\n\n")
-            f.write("Comentários:\n")
-            for c in fb['comentarios']:
-                f.write(" - " + c + "\n")
-            f.write("\nSugestões:\n")
-            for s in fb['sugestoes']:
-                f.write(" - " + s + "\n")
-            f.write("\nResumo das métricas:\n")
-            f.write(f" - Número de palavras: {rel.get('num_palavras', 0)}\n")
-            f.write(f" - Número de frases: {rel.get('num_frases', 0)}\n")
-            f.write(f" - Média de palavras por frase: {rel.get('media_palavras_por_frase', 0)}\n")
-            f.write(f" - Variedade de vocabulário (%): {rel.get('variedade_vocabulario', 0)}\n")
-            f.write(f" - Vocabulário único (tokens): {rel.get('vocabulario_unico', 0)}\n")
-            paragrafos = rel.get('paragrafos', [])
-            f.write(f" - Parágrafos detectados: {len(paragrafos)}\n")
-            if paragrafos:
-                resumo = paragrafos[0][:200].replace("\n", " ")
-                if len(paragrafos[0]) > 200:
-                    resumo = resumo.rstrip() + "..."
-                f.write(f"   Exemplo (início): {resumo}\n")
-            mais_freq = rel.get('mais_frequentes', [])[:5]
-            if mais_freq:
-                f.write(" - Palavras mais frequentes:\n")
-                for w, c in mais_freq:
-                    f.write(f"    {w}: {c}\n")
-            repeticoes = rel.get('repeticoes_relevantes', [])
-            repeticoes_filtradas = [w for w in repeticoes if len(w) > 2]
-            if repeticoes_filtradas:
-                mostra = repeticoes_filtradas[:10]
-                f.write(f" - Repetições relevantes (ex.): {', '.join(mostra)}\n")
+            f.write(formatar_txt(resumo_relatorio(rel, fb, tema)))
         print(f"Relatório salvo em: {nome_arquivo}")
     except Exception as e:
         print(f"Erro ao salvar relatório: {e}")
@@ -167,6 +156,39 @@ def forcar_escolha_genero(genero_detectado: str) -> str:
                 print("Gênero inválido. Tente novamente.")
     return genero_detectado
 
+def avaliar_interativo(texto: str, tema: str, genero_informado: str = ""):
+    """Análise + feedback do menu, passando pelo cache de resultados.
+
+    Um gênero informado e válido sobrescreve a detecção; se a detecção falhar, o usuário
+    escolhe o gênero (e esse resultado, que depende da resposta, não vai para o cache).
+    """
+    genero = None
+    if genero_informado:
+        # aceita apenas gêneros conhecidos; caso contrário mantém a detecção
+        if genero_informado in GENEROS_VALIDOS:
+            genero = genero_informado
+        else:
+            print("Gênero não reconhecido — será usada a detecção automática.")
+    # a chave usa o texto normalizado; a análise também, como no lote
+    texto = normalizar_texto(texto)
+    cache = cache_resultados()
+    chave = chave_cache(texto, tema, genero)
+    guardado = cache.obter(chave)
+    if guardado is not None:
+        return guardado
+    rel = analisar_texto_incremental(texto, tema)
+    detectado = rel["genero"]
+    if genero:
+        rel["genero"] = genero
+    else:
+        # Se nenhum gênero foi informado, forçar escolha se detectado como 'desconhecido'
+        rel["genero"] = forcar_escolha_genero(detectado)
+    fb = pontuar_e_gerar_feedback(rel, tema)
+    compactar(rel)
+    if genero or detectado != "desconhecido":
+        cache.guardar(chave, rel, fb)
+    return rel, fb
+
 def ajuda_criterios():
     print("\n=== AJUDA: CRITÉRIOS DE AVALIAÇÃO ===")
     print("Estrutura: organização em parágrafos; divisão clara em introdução, desenvolvimento e conclusão.")
@@ -189,17 +211,7 @@ def main():
             if not texto.strip():
                 print("Nenhum texto informado. Voltando ao menu.")
                 continue
-            rel = analisar_texto(texto, tema)
-            if genero_informado:
-                # aceita apenas gêneros conhecidos; caso contrário mantém a detecção
-                if genero_informado in ("dissertação", "dissertacao", "conto", "poema", "fábula", "fabula"):
-                    rel["genero"] = genero_informado
-                else:
-                    print("Gênero não reconhecido — será usada a detecção automática.")
-            else:
-                # Se nenhum gênero foi informado, forçar escolha se detectado como 'desconhecido'
-                rel["genero"] = forcar_escolha_genero(rel["genero"])
-            fb = pontuar_e_gerar_feedback(rel, tema)
+            rel, fb = avaliar_interativo(texto, tema, genero_informado)
             imprimir_relatorio_completo(texto, tema, rel, fb)
             if input("Deseja salvar o relatório em .txt? (s/n): ").strip().lower() == "s":
                 nome = input("Nome do arquivo (ex: relatorio1.txt): ").strip()
@@ -215,16 +227,7 @@ def main():
             texto = ler_arquivo_txt(caminho)
             if texto is None:
                 continue
-            rel = analisar_texto(texto, tema)
-            if genero_informado:
-                if genero_informado in ("dissertação", "dissertacao", "conto", "poema", "fábula", "fabula"):
-                    rel["genero"] = genero_informado
-                else:
-                    print("Gênero não reconhecido — será usada a detecção automática.")
-            else:
-                # Se nenhum gênero foi informado, forçar escolha se detectado como 'desconhecido'
-                rel["genero"] = forcar_escolha_genero(rel["genero"])
-            fb = pontuar_e_gerar_feedback(rel, tema)
+            rel, fb = avaliar_interativo(texto, tema, genero_informado)
             imprimir_relatorio_completo(texto, tema, rel, fb)
             if input("Deseja salvar o relatório em .txt? (s/n): ").strip().lower() == "s":
                 nome = input("Nome do arquivo (ex: relatorio1.txt): ").strip()
@@ -0,0 +1,240 @@
+# metricas_lote.py
+# Métricas do AnalisadorBasico para uma turma inteira de uma vez. Cada texto é
+# tokenizado como de costume; os comprimentos (tokens por frase, palavras por
+# parágrafo, por linha...) vão para arrays planos com offsets, e todas as médias,
+# limiares e distribuições são calculadas com operações vetorizadas do NumPy.
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AnalisadorBasico
+    from .documento import DocumentoTokenizado, contar_palavras, offsets_linhas
+    from .rubricas import rubrica_do_genero
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AnalisadorBasico
+    from documento import DocumentoTokenizado, contar_palavras, offsets_linhas
+    from rubricas import rubrica_do_genero
+
+# Limiares usados pelo AnalisadorBasico e pelos avaliadores de gênero
+PALAVRAS_FRASE_LONGA = 35
+PALAVRAS_PARAGRAFO_EXTENSO = 120
+PALAVRAS_VERSO_LONGO = 10
+
+PERCENTIS_FRASES = (25, 50, 75, 90)
+
+
+def _somar_segmentos(valores: np.ndarray, inicio: np.ndarray) -> np.ndarray:
+    """Soma de `valores` em cada segmento [inicio[i], inicio[i+1]); segmentos vazios dão 0."""
+    acumulado = np.zeros(len(valores) + 1, dtype=np.float64 if valores.dtype.kind == "f" else np.int64)
+    np.cumsum(valores, out=acumulado[1:])
+    return acumulado[inicio[1:]] - acumulado[inicio[:-1]]
+
+
+def _arredondar(valores: np.ndarray, casas: int) -> np.ndarray:
+    # round() do Python (e não np.round) para obter exatamente os números do relatório
+    return np.array([round(v, casas) for v in valores.tolist()], dtype=np.float64)
+
+
+def _percentis_segmentos(valores: np.ndarray, inicio: np.ndarray, percentis: Sequence[float]) -> Dict[int, np.ndarray]:
+    """Percentis (interpolação linear, como `np.percentile`) de cada segmento; 0 se vazio."""
+    n = np.diff(inicio)
+    segmento = np.repeat(np.arange(len(n)), n)
+    ordenados = valores[np.lexsort((valores, segmento))].astype(np.float64)
+    resultado = {}
+    com_itens = n > 0
+    base = inicio[:-1][com_itens]
+    tamanho = n[com_itens]
+    for p in percentis:
+        saida = np.zeros(len(n), dtype=np.float64)
+        if len(base):
+            pos = (tamanho - 1) * (p / 100.0)
+            baixo = np.floor(pos).astype(np.int64)
+            alto = np.ceil(pos).astype(np.int64)
+            v_baixo = ordenados[base + baixo]
+            v_alto = ordenados[base + alto]
+            saida[com_itens] = v_baixo + (v_alto - v_baixo) * (pos - baixo)
+        resultado[p] = saida
+    return resultado
+
+
+class MetricasLote:
+    """Comprimentos de vários textos em arrays planos (formato CSR: valores + offsets).
+
+    Para o texto i, as frases são `tokens_frase[inicio_frases[i]:inicio_frases[i+1]]`;
+    o mesmo vale para parágrafos, linhas e palavras do vocabulário. Os atributos
+    por texto (num_frases, media_palavras_por_frase, ...) são arrays de tamanho n.
+    """
+
+    def __init__(self, tokens_frase, palavras_frase, inicio_frases,
+                 palavras_paragrafo, inicio_paragrafos,
+                 palavras_linha, inicio_linhas,
+                 ids_vocabulario, inicio_vocabulario, tamanho_vocabulario: int):
+        self.tokens_frase = np.asarray(tokens_frase, dtype=np.int64)
+        self.palavras_frase = np.asarray(palavras_frase, dtype=np.int64)
+        self.inicio_frases = np.asarray(inicio_frases, dtype=np.int64)
+        self.palavras_paragrafo = np.asarray(palavras_paragrafo, dtype=np.int64)
+        self.inicio_paragrafos = np.asarray(inicio_paragrafos, dtype=np.int64)
+        self.palavras_linha = np.asarray(palavras_linha, dtype=np.int64)
+        self.inicio_linhas = np.asarray(inicio_linhas, dtype=np.int64)
+        self.ids_vocabulario = np.asarray(ids_vocabulario, dtype=np.int64)
+        self.inicio_vocabulario = np.asarray(inicio_vocabulario, dtype=np.int64)
+        self.tamanho_vocabulario = tamanho_vocabulario
+        self._calcular()
+
+    def __len__(self) -> int:
+        return len(self.inicio_frases) - 1
+
+    # ---------------------------
+    # métricas por texto
+    # ---------------------------
+    def _calcular(self):
+        self.num_frases = np.diff(self.inicio_frases)
+        self.num_palavras = _somar_segmentos(self.tokens_frase, self.inicio_frases)
+        com_frases = self.num_frases > 0
+        media = np.zeros(len(self), dtype=np.float64)
+        np.divide(self.num_palavras, self.num_frases, out=media, where=com_frases)
+        self.media_palavras_por_frase = _arredondar(media, 2)
+
+        # vocabulário único por texto: pares (texto, palavra) distintos
+        total_alfabeticas = np.diff(self.inicio_vocabulario)
+        texto_da_palavra = np.repeat(np.arange(len(self)), total_alfabeticas)
+        pares = np.unique(texto_da_palavra * max(1, self.tamanho_vocabulario) + self.ids_vocabulario)
+        self.vocabulario_unico = np.bincount(pares // max(1, self.tamanho_vocabulario), minlength=len(self))
+        variedade = np.zeros(len(self), dtype=np.float64)
+        np.divide(self.vocabulario_unico, total_alfabeticas, out=variedade, where=total_alfabeticas > 0)
+        self.variedade_vocabulario = _arredondar(variedade * 100, 2)
+
+        self.num_paragrafos = np.diff(self.inicio_paragrafos)
+        self.num_paragrafos_extensos = _somar_segmentos(
+            self.palavras_paragrafo > PALAVRAS_PARAGRAFO_EXTENSO, self.inicio_paragrafos)
+        self.num_frases_muito_longas = _somar_segmentos(
+            self.palavras_frase > PALAVRAS_FRASE_LONGA, self.inicio_frases)
+        self.num_linhas = np.diff(self.inicio_linhas)
+        self.num_versos_longos = _somar_segmentos(
+            self.palavras_linha > PALAVRAS_VERSO_LONGO, self.inicio_linhas)
+
+    _CAMPOS = (
+        "num_frases", "num_palavras", "media_palavras_por_frase", "variedade_vocabulario",
+        "vocabulario_unico", "num_paragrafos", "num_paragrafos_extensos",
+        "num_frases_muito_longas", "num_linhas", "num_versos_longos",
+    )
+
+    def metricas(self, i: int) -> Dict:
+        """Métricas do texto i com os mesmos valores do relatório do AnalisadorBasico."""
+        return {campo: getattr(self, campo)[i].item() for campo in self._CAMPOS}
+
+    def como_dicts(self) -> List[Dict]:
+        colunas = {campo: getattr(self, campo).tolist() for campo in self._CAMPOS}
+        return [{campo: colunas[campo][i] for campo in self._CAMPOS} for i in range(len(self))]
+
+    # ---------------------------
+    # distribuições
+    # ---------------------------
+    def distribuicao_frases(self, percentis: Sequence[float] = PERCENTIS_FRASES) -> Dict[str, np.ndarray]:
+        """Tamanho das frases (em tokens) de cada texto: média, variância, percentis e máximo."""
+        n = self.num_frases
+        com_frases = n > 0
+        media = np.zeros(len(self), dtype=np.float64)
+        np.divide(self.num_palavras, n, out=media, where=com_frases)
+        desvios = self.tokens_frase - np.repeat(media, n)
+        variancia = np.zeros(len(self), dtype=np.float64)
+        np.divide(_somar_segmentos(desvios * desvios, self.inicio_frases), n, out=variancia, where=com_frases)
+        maximo = np.zeros(len(self), dtype=np.int64)
+        if len(self.tokens_frase):
+            inicios = self.inicio_frases[:-1][com_frases]
+            maximo[com_frases] = np.maximum.reduceat(self.tokens_frase, inicios)
+        distribuicao = {"media": media, "variancia": variancia, "desvio": np.sqrt(variancia), "max": maximo}
+        for p, valores in _percentis_segmentos(self.tokens_frase, self.inicio_frases, percentis).items():
+            distribuicao[f"p{p:g}"] = valores
+        return distribuicao
+
+    def resumo_turma(self, percentis: Sequence[float] = (10, 25, 50, 75, 90)) -> Dict[str, Dict]:
+        """Distribuição das métricas na turma inteira e das frases de todos os textos."""
+        resumo = {}
+        series = {campo: getattr(self, campo) for campo in self._CAMPOS}
+        series["tokens_por_frase"] = self.tokens_frase
+        for nome, valores in series.items():
+            if len(valores) == 0:
+                continue
+            valores = valores.astype(np.float64)
+            estatisticas = {"media": float(valores.mean()), "variancia": float(valores.var())}
+            for p, v in zip(percentis, np.percentile(valores, percentis)):
+                estatisticas[f"p{p:g}"] = float(v)
+            resumo[nome] = estatisticas
+        return resumo
+
+    # ---------------------------
+    # notas por gênero
+    # ---------------------------
+    def notas(self, genero: str) -> Dict[str, np.ndarray]:
+        """Notas de `genero` para todos os textos (a mesma rubrica de Avaliador*.avaliar)."""
+        rubrica = rubrica_do_genero(genero)
+        notas, _ = rubrica.avaliar_lote({nome: getattr(self, nome) for nome in rubrica.metricas})
+        return {criterio: notas[:, j] for j, criterio in enumerate(rubrica.criterios)}
+
+    def notas_por_texto(self, generos: Sequence[str]) -> List[Dict[str, int]]:
+        """Notas de cada texto segundo o seu gênero (ordem das chaves igual à dos avaliadores)."""
+        if len(generos) != len(self):
+            raise ValueError("é preciso um gênero por texto")
+        por_rubrica: Dict[str, List[List[int]]] = {}
+        resultado = []
+        for i, genero in enumerate(generos):
+            rubrica = rubrica_do_genero(genero)
+            linhas = por_rubrica.get(rubrica.nome)
+            if linhas is None:
+                notas, _ = rubrica.avaliar_lote({nome: getattr(self, nome) for nome in rubrica.metricas})
+                linhas = notas.tolist()
+                por_rubrica[rubrica.nome] = linhas
+            resultado.append(dict(zip(rubrica.criterios, linhas[i])))
+        return resultado
+
+
+# ===========================
+# CONSTRUÇÃO DO LOTE
+# ===========================
+_ANALISADOR = AnalisadorBasico()
+
+
+def _palavras_por_trecho(texto: str, offsets) -> List[int]:
+    """Palavras de cada trecho (início, fim) de um array plano de offsets."""
+    return [contar_palavras(texto, offsets[i], offsets[i + 1]) for i in range(0, len(offsets), 2)]
+
+
+def analisar_lote(textos: Sequence[str],
+                  documentos: Optional[Sequence[DocumentoTokenizado]] = None) -> MetricasLote:
+    """Tokeniza os textos (ou reaproveita `documentos`) e monta os arrays do lote."""
+    tokens_frase: List[int] = []
+    palavras_frase: List[int] = []
+    inicio_frases = [0]
+    palavras_paragrafo: List[int] = []
+    inicio_paragrafos = [0]
+    palavras_linha: List[int] = []
+    inicio_linhas = [0]
+    ids_vocabulario: List[int] = []
+    inicio_vocabulario = [0]
+    vocabulario: Dict[str, int] = {}
+
+    for i, texto in enumerate(textos):
+        documento = documentos[i] if documentos is not None else DocumentoTokenizado.tokenizar(texto)
+        palavras_frase.extend(_palavras_por_trecho(texto, documento.offsets))
+        for tokens in documento.tokens_por_frase:
+            tokens_frase.append(len(tokens))
+            for token in tokens:
+                if token.isalpha():
+                    ids_vocabulario.append(vocabulario.setdefault(token.lower(), len(vocabulario)))
+        inicio_frases.append(len(tokens_frase))
+        inicio_vocabulario.append(len(ids_vocabulario))
+
+        palavras_paragrafo.extend(_palavras_por_trecho(texto, _ANALISADOR._offsets_paragrafos(texto)))
+        inicio_paragrafos.append(len(palavras_paragrafo))
+        palavras_linha.extend(_palavras_por_trecho(texto, offsets_linhas(texto)))
+        inicio_linhas.append(len(palavras_linha))
+
+    return MetricasLote(tokens_frase, palavras_frase, inicio_frases,
+                        palavras_paragrafo, inicio_paragrafos,
+                        palavras_linha, inicio_linhas,
+                        ids_vocabulario, inicio_vocabulario, len(vocabulario))
@@ -0,0 +1,289 @@
+# paralelo.py
+# Paralelismo dentro de um único documento (romances, antologias de turma): o texto é
+# dividido em pedaços nas linhas em branco, e cada pedaço é tokenizado e contado num
+# pool de processos. As partes (frases, tokens, Counter, frases longas, parágrafos e
+# parágrafos extensos) são emendadas no processo principal, e o relatório é idêntico ao
+# da análise serial. Abaixo de um limiar de tamanho a análise continua serial.
+
+import argparse
+import multiprocessing
+import os
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import List, Optional, Tuple, Union
+
+try:
+    # Prefer relative imports when used as a package
+    from .avaliador import AnalisadorBasico, AvaliadorTexto
+    from .documento import DocumentoTokenizado, calcular_offsets, corte_seguro, excede_palavras
+    from .instrumentacao import etapa
+    from .relatorio import RelatorioAnalise, compactar
+    from .tokenizacao import BackendTokenizacao, definir_backend, obter_backend, preaquecer
+except Exception:
+    # Fallback for direct script execution
+    from avaliador import AnalisadorBasico, AvaliadorTexto
+    from documento import DocumentoTokenizado, calcular_offsets, corte_seguro, excede_palavras
+    from instrumentacao import etapa
+    from relatorio import RelatorioAnalise, compactar
+    from tokenizacao import BackendTokenizacao, definir_backend, obter_backend, preaquecer
+
+# Textos menores que isto (em caracteres, ~35 mil palavras) são analisados em série:
+# abaixo disso o custo do pool (processos, envio das partes) não compensa
+LIMIAR_CARACTERES = 200_000
+# Tamanho mínimo de cada pedaço e quantos pedaços por processo (equilíbrio de carga)
+TAMANHO_MINIMO_PEDACO = 50_000
+PEDACOS_POR_PROCESSO = 2
+
+_ANALISADOR: Optional[AnalisadorBasico] = None
+
+
+class _Pedaco:
+    """Tokenização de um trecho do texto, com offsets relativos ao início do trecho.
+
+    - `offsets`/`tokens_por_frase`: sentenças definitivas do trecho e seus tokens
+    - `primeira_propria`: índice da primeira sentença que começa no próprio pedaço (as
+      anteriores são do bloco de aquecimento, o último do pedaço anterior)
+    - `contador`: palavras alfabéticas (minúsculas) das sentenças próprias, na ordem
+    - `longas`: índices das sentenças com mais de 35 palavras
+    - `resto`: início do trecho final ainda pendente (None no último pedaço)
+    - `paragrafos`/`extensos`: offsets dos parágrafos próprios, relativos ao pedaço
+    """
+
+    __slots__ = ("offsets", "tokens_por_frase", "primeira_propria", "contador", "longas", "resto",
+                 "paragrafos", "extensos")
+
+    def __init__(self, trecho: str, proprio: int, final: bool, backend: BackendTokenizacao):
+        frases = backend.sent_tokenize(trecho)
+        offsets = calcular_offsets(trecho, frases)
+        self.resto: Optional[int] = None
+        if not final:
+            k = corte_seguro(trecho, offsets) if frases else 0
+            self.resto = offsets[k][0] if frases else 0
+            frases = frases[:k]
+            offsets = offsets[:k]
+        word_tokenize = backend.word_tokenize
+        self.tokens_por_frase = [word_tokenize(f, preserve_line=True) for f in frases]
+        self.offsets = array("l")
+        for par in offsets:
+            self.offsets.extend(par)
+        self.primeira_propria = bisect_left([ini for ini, _ in offsets], proprio)
+        self.contador = Counter(t.lower() for tokens in self.tokens_por_frase[self.primeira_propria:]
+                                for t in tokens if t.isalpha())
+        self.longas = [i for i, (ini, fim) in enumerate(offsets) if excede_palavras(trecho, ini, fim, 35)]
+        self.paragrafos = array("l")
+        self.extensos = array("l")
+
+
+# ===========================
+# PROCESSOS TRABALHADORES
+# ===========================
+def iniciar_trabalhador(nome_backend: str):
+    """Usa o mesmo backend de tokenização do processo principal e já o carrega."""
+    global _ANALISADOR
+    definir_backend(nome_backend)
+    preaquecer()
+    _ANALISADOR = AnalisadorBasico(nome_backend)
+
+
+def processar_pedaco(tarefa: Tuple[str, int, bool, str]) -> _Pedaco:
+    """Tokeniza e conta um pedaço: (trecho, início do pedaço próprio no trecho, último?, backend).
+
+    O trecho começa no último bloco do pedaço anterior (aquecimento), para que a frase
+    pendente que vem de lá já apareça como sentença do trecho.
+    """
+    trecho, proprio, final, nome_backend = tarefa
+    analisador = _ANALISADOR or AnalisadorBasico(nome_backend)
+    pedaco = _Pedaco(trecho, proprio, final, obter_backend(nome_backend))
+    texto_proprio = trecho[proprio:]
+    pedaco.paragrafos = analisador._offsets_paragrafos(texto_proprio)
+    pedaco.extensos = analisador._paragrafos_extensos(texto_proprio, pedaco.paragrafos)
+    return pedaco
+
+
+# ===========================
+# ANALISADOR
+# ===========================
+class AnalisadorParalelo(AnalisadorBasico):
+    """AnalisadorBasico que divide textos grandes entre vários processos.
+
+    Cada processo tokeniza um pedaço (blocos inteiros) a partir do último bloco do
+    pedaço anterior e deixa pendentes as frases finais que ainda podem mudar (ver
+    `corte_seguro`). O processo principal emenda os pedaços em ordem: a frase pendente
+    do pedaço anterior precisa começar numa fronteira de sentença do pedaço seguinte, e
+    daí em diante as sentenças dele são as mesmas do texto inteiro. Se não começar
+    (uma frase que atravessa o bloco de aquecimento, como em poemas sem pontuação), o
+    trecho é tokenizado aqui. O resultado é o mesmo de `AnalisadorBasico.analisar(texto)`.
+
+    O pool é criado no primeiro texto grande e reaproveitado; use `fechar()` ou `with`.
+    """
+
+    def __init__(self, processos: Optional[int] = None, limiar: int = LIMIAR_CARACTERES,
+                 tokenizador: Union[None, str, BackendTokenizacao] = None):
+        super().__init__(tokenizador)
+        self.processos = processos or os.cpu_count() or 1
+        self.limiar = limiar
+        self._pool = None
+        self._nome_backend: Optional[str] = None
+        # pedaços cuja emenda exigiu tokenizar de novo no processo principal
+        self.emendas_locais = 0
+
+    def _obter_pool(self, nome_backend: str):
+        if self._pool is not None and self._nome_backend != nome_backend:
+            self.fechar()
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(processes=self.processos, initializer=iniciar_trabalhador,
+                                              initargs=(nome_backend,))
+            self._nome_backend = nome_backend
+        return self._pool
+
+    def fechar(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> "AnalisadorParalelo":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+    def dividir(self, texto: str) -> List[Tuple[int, int, int]]:
+        """Pedaços (início do trecho, início próprio, fim), cada um com blocos inteiros e
+        cerca do mesmo tamanho. O trecho começa no último bloco do pedaço anterior."""
+        blocos = self._blocos(texto)
+        alvo = max(TAMANHO_MINIMO_PEDACO, len(texto) // (self.processos * PEDACOS_POR_PROCESSO))
+        pedacos = []
+        primeiro = 0
+        for i, (_, fim) in enumerate(blocos):
+            if fim - blocos[primeiro][0] >= alvo or i == len(blocos) - 1:
+                if not pedacos:
+                    # o primeiro pedaço começa no início do texto, como na análise serial
+                    pedacos.append((0, 0, fim))
+                else:
+                    pedacos.append((blocos[primeiro - 1][0], blocos[primeiro][0], fim))
+                primeiro = i + 1
+        return pedacos
+
+    def _emendar(self, texto: str, pedacos: List[Tuple[int, int, int]], partes) -> Tuple:
+        """Junta os pedaços em ordem; devolve (documento, contador, longas, parágrafos, extensos)."""
+        backend = obter_backend(self.tokenizador)
+        offsets = array("l")
+        tokens_por_frase: List[List[str]] = []
+        contador: Counter = Counter()
+        longas: List[int] = []
+        paragrafos = array("l")
+        extensos = array("l")
+        pendente = 0  # início, no texto, do trecho ainda não coberto por sentenças
+        coberto = False  # o texto já foi tokenizado até o fim
+        for n, ((inicio, proprio, fim), parte) in enumerate(zip(pedacos, partes)):
+            paragrafos.extend(o + proprio for o in parte.paragrafos)
+            extensos.extend(o + proprio for o in parte.extensos)
+            if coberto:
+                continue
+            j = 0  # o primeiro pedaço começa no início do texto, como na análise serial
+            if n > 0:
+                inicios = parte.offsets[::2]
+                j = bisect_left(inicios, pendente - inicio)
+                if pendente < inicio:
+                    # a frase pendente atravessa um bloco inteiro (ex.: poema sem
+                    # pontuação): tokeniza o restante do texto de uma vez
+                    self.emendas_locais += 1
+                    parte = _Pedaco(texto[pendente:], proprio - pendente, True, backend)
+                    inicio, j, coberto = pendente, 0, True
+                elif j == len(inicios) or inicios[j] != pendente - inicio:
+                    # a frase pendente não começa numa sentença do pedaço: tokeniza aqui
+                    self.emendas_locais += 1
+                    parte = _Pedaco(texto[pendente:fim], proprio - pendente, n == len(pedacos) - 1, backend)
+                    inicio, j = pendente, 0
+            if j > parte.primeira_propria:
+                contador.update(t.lower() for tokens in parte.tokens_por_frase[j:] for t in tokens if t.isalpha())
+            else:
+                contador.update(t.lower() for tokens in parte.tokens_por_frase[j:parte.primeira_propria]
+                                for t in tokens if t.isalpha())
+                contador.update(parte.contador)
+            base = len(tokens_por_frase) - j
+            longas.extend(base + i for i in parte.longas if i >= j)
+            offsets.extend(o + inicio for o in parte.offsets[2 * j:])
+            tokens_por_frase.extend(parte.tokens_por_frase[j:])
+            if parte.resto is not None:
+                pendente = inicio + parte.resto
+        documento = DocumentoTokenizado(texto, None, tokens_por_frase, offsets)
+        return documento, contador, longas, paragrafos, extensos
+
+    def analisar(self, texto: str) -> RelatorioAnalise:
+        if self.processos <= 1 or len(texto) < self.limiar:
+            return super().analisar(texto)
+        pedacos = self.dividir(texto)
+        if len(pedacos) < 2:
+            return super().analisar(texto)
+        nome_backend = obter_backend(self.tokenizador).nome
+
+        with etapa("tokenizacao") as medicao:
+            pool = self._obter_pool(nome_backend)
+            tarefas = [(texto[inicio:fim], proprio - inicio, n == len(pedacos) - 1, nome_backend)
+                       for n, (inicio, proprio, fim) in enumerate(pedacos)]
+            partes = pool.imap(processar_pedaco, tarefas)
+            documento, contador, longas, paragrafos, extensos = self._emendar(texto, pedacos, partes)
+            medicao.contar_tokens(documento.num_tokens)
+        return self.montar_relatorio(documento, contador, longas, paragrafos, extensos)
+
+
+class AvaliadorParalelo(AvaliadorTexto):
+    """AvaliadorTexto que analisa textos grandes em vários processos."""
+
+    def __init__(self, processos: Optional[int] = None, limiar: int = LIMIAR_CARACTERES,
+                 tokenizador: Union[None, str, BackendTokenizacao] = None):
+        super().__init__(tokenizador)
+        self.analisador = AnalisadorParalelo(processos, limiar, tokenizador)
+
+    def fechar(self):
+        self.analisador.fechar()
+
+    def __enter__(self) -> "AvaliadorParalelo":
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def analisar_texto_paralelo(texto: str, tema: Optional[str] = "", processos: Optional[int] = None,
+                            limiar: int = LIMIAR_CARACTERES) -> dict:
+    """Equivalente a `analisar_texto`, dividindo textos grandes entre `processos` processos."""
+    with AvaliadorParalelo(processos, limiar) as avaliador:
+        rel = avaliador.avaliar_texto(texto)
+    rel["tema"] = tema
+    return rel
+
+
+def main(argv: Optional[List[str]] = None):
+    try:
+        from .feedback import pontuar_e_gerar_feedback
+        from .main import imprimir_relatorio_completo, ler_arquivo_txt
+    except Exception:
+        from feedback import pontuar_e_gerar_feedback
+        from main import imprimir_relatorio_completo, ler_arquivo_txt
+
+    parser = argparse.ArgumentParser(
+        description="Avalia um texto muito grande usando vários processos."
+    )
+    parser.add_argument("arquivo", help="caminho do arquivo .txt")
+    parser.add_argument("--tema", default="", help="tema da atividade")
+    parser.add_argument("--processos", type=int, default=None,
+                        help="número de processos (padrão: núcleos da máquina)")
+    parser.add_argument("--limiar", type=int, default=LIMIAR_CARACTERES,
+                        help=f"tamanho mínimo (caracteres) para dividir o texto (padrão: {LIMIAR_CARACTERES})")
+    args = parser.parse_args(argv)
+
+    texto = ler_arquivo_txt(args.arquivo)
+    if texto is None:
+        return
+    rel = analisar_texto_paralelo(texto, args.tema, args.processos, args.limiar)
+    fb = pontuar_e_gerar_feedback(rel, args.tema, texto)
+    compactar(rel)
+    imprimir_relatorio_completo(texto, args.tema, rel, fb)
+
+
+if __name__ == "__main__":
+    main()
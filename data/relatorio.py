@@ -0,0 +1,169 @@
+# relatorio.py
+# Relatório de análise compacto: métricas numéricas em slots e listas pesadas
+# (parágrafos, linhas, frases longas...) expostas sob demanda a partir de offsets
+# no texto original, mantendo o acesso no estilo dict usado no resto do projeto.
+
+from array import array
+from collections import Counter
+from collections.abc import MutableMapping
+from typing import Iterator, List, Optional
+try:
+    # Prefer relative imports when used as a package
+    from .documento import DocumentoTokenizado, FatiasTexto, offsets_linhas
+except Exception:
+    # Fallback for direct script execution
+    from documento import DocumentoTokenizado, FatiasTexto, offsets_linhas
+
+
+def contagem(rel, chave: str) -> int:
+    """Quantidade de itens de `chave` no relatório.
+
+    Relatórios em fluxo (sem o texto inteiro) trazem apenas `num_<chave>`; os demais
+    trazem a lista e a contagem é o seu tamanho.
+    """
+    num = rel.get("num_" + chave)
+    if num is not None:
+        return num
+    return len(rel.get(chave, []))
+
+
+def compactar(rel):
+    """Libera os tokens de um relatório depois do feedback (ver `RelatorioAnalise.compactar`).
+
+    Relatórios em dict (cache, modo em fluxo) não guardam tokens e voltam intactos.
+    """
+    if isinstance(rel, RelatorioAnalise):
+        rel.compactar()
+    return rel
+
+
+class RelatorioAnalise(MutableMapping):
+    """Relatório do AnalisadorBasico com baixo uso de memória.
+
+    Guarda apenas uma referência ao texto, as métricas numéricas, offsets em arrays e o
+    `Counter` de palavras. Chaves como 'paragrafos' ou 'linhas' são materializadas na
+    leitura. Chaves adicionadas depois (genero, avaliacao, tema...) ficam em `_extras`.
+    """
+
+    __slots__ = (
+        "texto", "num_frases", "num_palavras", "media_palavras_por_frase",
+        "variedade_vocabulario", "vocabulario_unico",
+        "_documento", "_paragrafos", "_extensos", "_frases_longas", "_contador", "_extras",
+    )
+
+    _NUMERICOS = (
+        "num_frases", "num_palavras", "media_palavras_por_frase",
+        "variedade_vocabulario", "vocabulario_unico",
+    )
+    # ordem das chaves igual à do dict retornado originalmente pelo AnalisadorBasico
+    _DERIVADOS = (
+        "paragrafos_extensos", "paragrafos", "palavras_minusculas", "frases_muito_longas",
+        "linhas", "mais_frequentes", "repeticoes_relevantes", "documento", "vocabulario",
+    )
+
+    def __init__(self, texto: str, num_frases: int, num_palavras: int,
+                 media_palavras_por_frase: float, variedade_vocabulario: float,
+                 vocabulario_unico: int, paragrafos: array, extensos: array,
+                 frases_longas: array, contador: Counter, documento=None):
+        self.texto = texto
+        self.num_frases = num_frases
+        self.num_palavras = num_palavras
+        self.media_palavras_por_frase = media_palavras_por_frase
+        self.variedade_vocabulario = variedade_vocabulario
+        self.vocabulario_unico = vocabulario_unico
+        self._paragrafos = paragrafos
+        self._extensos = extensos
+        self._frases_longas = frases_longas
+        self._contador = contador
+        self._documento = documento
+        self._extras: Optional[dict] = None
+
+    # ---------------------------
+    # materialização sob demanda
+    # ---------------------------
+    def _derivado(self, chave: str):
+        if chave == "paragrafos":
+            return FatiasTexto(self.texto, self._paragrafos)
+        if chave == "paragrafos_extensos":
+            return FatiasTexto(self.texto, self._extensos)
+        if chave == "frases_muito_longas":
+            return FatiasTexto(self.texto, self._frases_longas)
+        if chave == "linhas":
+            return FatiasTexto(self.texto, offsets_linhas(self.texto))
+        if chave == "mais_frequentes":
+            return self._contador.most_common(10)
+        if chave == "repeticoes_relevantes":
+            return [w for w, c in self._contador.items() if c > 2]
+        if chave == "vocabulario":
+            return self._contador.keys()
+        if chave == "palavras_minusculas":
+            return self._palavras_minusculas()
+        if chave == "documento":
+            if self._documento is None:
+                raise KeyError(chave)
+            return self._documento
+        raise KeyError(chave)
+
+    def _palavras_minusculas(self) -> List[str]:
+        documento = self._documento
+        if documento is None:
+            # relatório compactado: tokeniza de novo (caminho raro; o feedback usa 'vocabulario')
+            documento = DocumentoTokenizado.tokenizar(self.texto)
+        return [p.lower() for p in documento.tokens if p.isalpha()]
+
+    def compactar(self) -> "RelatorioAnalise":
+        """Libera o DocumentoTokenizado (tokens); mantém métricas, offsets e contagens."""
+        self._documento = None
+        return self
+
+    # ---------------------------
+    # protocolo de mapeamento
+    # ---------------------------
+    def __getitem__(self, chave):
+        extras = self._extras
+        if extras is not None and chave in extras:
+            return extras[chave]
+        if chave in self._NUMERICOS:
+            return getattr(self, chave)
+        return self._derivado(chave)
+
+    def __setitem__(self, chave, valor):
+        if chave in self._NUMERICOS:
+            setattr(self, chave, valor)
+            return
+        if self._extras is None:
+            self._extras = {}
+        self._extras[chave] = valor
+
+    def __delitem__(self, chave):
+        if self._extras is None or chave not in self._extras:
+            raise KeyError(chave)
+        del self._extras[chave]
+
+    def __contains__(self, chave) -> bool:
+        if self._extras is not None and chave in self._extras:
+            return True
+        if chave == "documento":
+            return self._documento is not None
+        return chave in self._NUMERICOS or chave in self._DERIVADOS
+
+    def _chaves_base(self) -> Iterator[str]:
+        yield from self._NUMERICOS
+        for chave in self._DERIVADOS:
+            if chave == "documento" and self._documento is None:
+                continue
+            yield chave
+
+    def __iter__(self) -> Iterator[str]:
+        extras = self._extras or {}
+        for chave in self._chaves_base():
+            if chave not in extras:
+                yield chave
+        yield from extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return (f"RelatorioAnalise(num_palavras={self.num_palavras}, num_frases={self.num_frases}, "
+                f"genero={self.get('genero')!r})")
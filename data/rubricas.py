@@ -0,0 +1,407 @@
+# rubricas.py
+# Rubricas como dados: critérios, limiares e textos de comentário de cada gênero (e da
+# nota geral do feedback) ficam em definições declarativas. Cada definição é compilada
+# uma única vez numa tabela plana de regras, avaliada em uma passagem sobre o vetor de
+# métricas de um texto ou, com NumPy, sobre as métricas de um lote inteiro.
+
+import hashlib
+import json
+import operator
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .documento import contar_linhas_longas
+    from .relatorio import RelatorioAnalise, contagem
+except Exception:
+    # Fallback for direct script execution
+    from documento import contar_linhas_longas
+    from relatorio import RelatorioAnalise, contagem
+
+# Nota inicial de cada critério (as regras tiram pontos ou fixam a nota)
+NOTA_MAXIMA = 2
+
+OPERADORES: Dict[str, Callable] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+# Comentário de contexto para gêneros sem rubrica própria
+CONTEXTO_GENERICO = "Gênero detectado: {genero}. Ajuste o texto conforme os critérios gerais."
+
+
+# ===========================
+# DEFINIÇÕES
+# ===========================
+# Regras de uma rubrica (aplicadas na ordem; comentários e sugestões saem nessa ordem):
+# - {"criterio", "se": (métrica, operador, limiar), "menos": n}: tira n pontos (mínimo 0)
+# - {"criterio", "se": ..., "nota": n}: fixa a nota do critério
+# - {"criterio", "faixas": ((condição, nota, comentário), ..., (None, nota, comentário))}:
+#   a primeira faixa cuja condição vale define a nota; None = demais casos
+# - "comentario", "sugestao" e "exemplo" (opcionais) são emitidos quando a regra dispara;
+#   aceitam campos {métrica} e os do contexto passado a `aplicar`
+# O limiar pode ser um número ou (métrica, fator), comparando com fator * métrica.
+
+DISSERTACAO = {
+    "nome": "dissertação",
+    "aliases": ("dissertacao",),
+    "criterios": ("Estrutura", "Coesão", "Clareza"),
+    "regras": (
+        {"criterio": "Clareza", "se": ("media_palavras_por_frase", ">", 25), "menos": 1},
+        {"criterio": "Estrutura", "se": ("num_paragrafos_extensos", ">", 0), "menos": 1},
+        {"criterio": "Coesão", "se": ("variedade_vocabulario", "<", 25), "menos": 1},
+    ),
+    "contexto": "Dissertação: foque em tese clara, argumentos e conclusão coerente.",
+    "sugestao": "Garanta uma tese assertiva e use conectores para ligar argumentos.",
+}
+
+CONTO = {
+    "nome": "conto",
+    "criterios": ("Criatividade", "Coesão"),
+    "regras": (
+        {"criterio": "Coesão", "se": ("num_frases", "<", 5), "menos": 1},
+        {"criterio": "Criatividade", "se": ("vocabulario_unico", "<", 50), "menos": 1},
+    ),
+    "contexto": "Conto: priorize enredo, sequência de eventos e um desfecho marcante.",
+    "sugestao": "Trabalhe a construção de cena e personagens; elimine descrições supérfluas.",
+    "exemplo": "Exemplo (conto): acrescente um detalhe de personagem que explique a motivação do conflito.",
+}
+
+POEMA = {
+    "nome": "poema",
+    "criterios": ("Musicalidade", "Imagem poética"),
+    "regras": (
+        {"criterio": "Musicalidade", "se": ("num_versos_longos", ">", ("num_linhas", 0.4)), "menos": 1},
+        {"criterio": "Imagem poética", "se": ("variedade_vocabulario", "<", 20), "menos": 1},
+    ),
+    "contexto": "Poema: atenção à concisão, ritmo e imagens poéticas.",
+    "sugestao": "Varie os versos e utilize imagens e metáforas para enriquecer as estrofes.",
+    "exemplo": "Exemplo (poema): substitua descrições literais por imagens sensoriais e varie o comprimento dos versos.",
+}
+
+FABULA = {
+    "nome": "fábula",
+    "aliases": ("fabula",),
+    "criterios": ("Moralidade", "Narrativa"),
+    "regras": (
+        {"criterio": "Narrativa", "se": ("num_frases", "<", 4), "menos": 1},
+        {"criterio": "Moralidade", "se": ("variedade_vocabulario", "<", 20), "menos": 1},
+    ),
+    "contexto": "Fábula: destaque a ação dos personagens animais e deixe a moral explícita.",
+    "sugestao": "Reforce a moral no final e simplifique a narrativa para maior impacto.",
+    "exemplo": "Exemplo (fábula): torne a moral mais explícita na última frase.",
+}
+
+# Nota geral (0-10) do feedback. "num_repeticoes" e "adequacao" (-1 = tema não
+# informado) são calculadas pelo feedback e passadas como métricas extras.
+FEEDBACK = {
+    "nome": "feedback",
+    "criterios": ("estrutura", "coesao", "clareza", "vocabulario", "adequacao"),
+    "regras": (
+        {"criterio": "estrutura", "faixas": (
+            (("num_paragrafos", "<=", 1), 0,
+             "Estrutura: O texto está muito compacto; organize-o melhor em parágrafos."),
+            (("num_paragrafos", "==", 2), 1,
+             "Estrutura: Boa tentativa, mas os parágrafos ainda podem ser divididos melhor."),
+            (None, 2, "Estrutura: Boa organização em parágrafos."),
+        )},
+        {"se": ("num_paragrafos_extensos", ">", 0),
+         "comentario": "Estrutura: Existem {num_paragrafos_extensos} parágrafos muito longos.",
+         "sugestao": "Divida os parágrafos mais extensos para facilitar a leitura."},
+        {"criterio": "coesao", "faixas": (
+            (("media_palavras_por_frase", ">", 36), 0,
+             "Coesão: Muitas frases longas; períodos extensos prejudicam a ligação entre ideias."),
+            (("media_palavras_por_frase", ">", 26), 1,
+             "Coesão: Algumas frases longas; é possível melhorar conectores e pontuação."),
+            (None, 2, "Coesão: Boa fluidez entre as frases."),
+        )},
+        {"criterio": "clareza", "se": ("num_palavras", "<", 80), "nota": 0,
+         "comentario": "Clareza: O texto está muito curto; falta desenvolvimento das ideias."},
+        {"criterio": "clareza", "se": ("num_repeticoes", ">", 0), "menos": 1,
+         "comentario": "Clareza: Há repetição de palavras; varie seu vocabulário.",
+         "sugestao": "Varie palavras repetidas, como '{repeticao}', utilizando sinônimos adequados."},
+        {"criterio": "clareza", "se": ("num_frases_muito_longas", ">", 0), "menos": 1,
+         "comentario": "Clareza: Algumas frases muito longas dificultam a compreensão.",
+         "sugestao": "Divida frases longas em períodos menores para facilitar a leitura.",
+         "exemplo": "Exemplo: transforme uma frase longa em duas mais curtas."},
+        {"criterio": "vocabulario", "faixas": (
+            (("variedade_vocabulario", "<", 30), 0,
+             "Vocabulário: Pouca variedade; procure diversificar o uso de palavras."),
+            (("variedade_vocabulario", "<", 45), 1,
+             "Vocabulário: Variedade moderada; pode-se ampliar o repertório lexical."),
+            (None, 2, "Vocabulário: Muito bom repertório lexical."),
+        )},
+        {"criterio": "adequacao", "faixas": (
+            (("adequacao", "<", 0), 2,
+             "Adequação ao tema: Tema não informado; avaliação feita apenas pelo texto."),
+            (("adequacao", "==", 0), 0, "Adequação ao tema: Pouca relação com o tema informado."),
+            (("adequacao", "==", 1), 1,
+             "Adequação ao tema: Relação parcial com o tema; pode aprofundar o foco."),
+            (None, 2, "Adequação ao tema: Boa relação com o tema."),
+        )},
+    ),
+}
+
+
+# ===========================
+# MÉTRICAS
+# ===========================
+def _linhas_e_versos_longos(rel: Mapping) -> Tuple[int, int]:
+    if "num_versos_longos" in rel:
+        # relatório em fluxo: só as contagens de linhas estão disponíveis
+        return rel["num_linhas"], rel["num_versos_longos"]
+    if isinstance(rel, RelatorioAnalise):
+        # conta direto no texto, sem recortar as linhas
+        texto = rel.texto
+        return texto.count("\n") + 1, contar_linhas_longas(texto, 10)
+    linhas = rel["linhas"]
+    return len(linhas), sum(1 for l in linhas if len(l.split()) > 10)
+
+
+_EXTRATORES: Dict[str, Callable[[Mapping], float]] = {
+    "num_frases": lambda rel: rel.get("num_frases", 0),
+    "num_palavras": lambda rel: rel.get("num_palavras", 0),
+    "media_palavras_por_frase": lambda rel: rel.get("media_palavras_por_frase", 0),
+    "variedade_vocabulario": lambda rel: rel.get("variedade_vocabulario", 0),
+    "vocabulario_unico": lambda rel: rel.get("vocabulario_unico", 0),
+    "num_paragrafos": lambda rel: contagem(rel, "paragrafos"),
+    "num_paragrafos_extensos": lambda rel: contagem(rel, "paragrafos_extensos"),
+    "num_frases_muito_longas": lambda rel: contagem(rel, "frases_muito_longas"),
+}
+
+
+# ===========================
+# COMPILAÇÃO
+# ===========================
+class ResultadoRubrica:
+    __slots__ = ("notas", "comentarios", "sugestoes", "exemplos")
+
+    def __init__(self, notas: Dict[str, int], comentarios: List[str], sugestoes: List[str],
+                 exemplos: List[str]):
+        self.notas = notas
+        self.comentarios = comentarios
+        self.sugestoes = sugestoes
+        self.exemplos = exemplos
+
+
+def _texto(modelo: Optional[str]):
+    """Modelos sem campos são guardados como texto pronto (não passam por format)."""
+    if modelo is None:
+        return None
+    return (modelo, "{" in modelo)
+
+
+def _formatar(modelo, valores: Mapping) -> str:
+    texto, tem_campos = modelo
+    return texto.format_map(valores) if tem_campos else texto
+
+
+# Ações de uma regra
+_NENHUMA, _FIXAR, _TIRAR = 0, 1, 2
+
+
+class RubricaCompilada:
+    """Tabela plana de regras de uma rubrica.
+
+    Cada regra é uma tupla (critério, métrica, operador, métrica do limiar, limiar,
+    ação, valor, grupo, comentário, sugestão, exemplo), com critérios e métricas
+    trocados por índices. As faixas de um critério formam um grupo: dentro dele só a
+    primeira regra verdadeira dispara.
+    """
+
+    def __init__(self, definicao: Mapping):
+        self.definicao = definicao
+        self.nome: str = definicao["nome"]
+        self.aliases: Tuple[str, ...] = tuple(definicao.get("aliases", ()))
+        self.criterios: Tuple[str, ...] = tuple(definicao["criterios"])
+        self.contexto: Optional[str] = definicao.get("contexto")
+        self.sugestao: Optional[str] = definicao.get("sugestao")
+        self.exemplo: Optional[str] = definicao.get("exemplo")
+        self._iniciais = [NOTA_MAXIMA] * len(self.criterios)
+        metricas: List[str] = []
+        self.regras: List[tuple] = []
+        self.num_grupos = 0
+
+        def indice_metrica(nome: str) -> int:
+            if nome not in metricas:
+                metricas.append(nome)
+            return metricas.index(nome)
+
+        def compilar(criterio, condicao, acao, valor, grupo, regra):
+            c = self.criterios.index(criterio) if criterio is not None else -1
+            if condicao is None:
+                m, op, m_limiar, limiar = -1, None, -1, 0.0
+            else:
+                nome, simbolo, limiar = condicao
+                m, op = indice_metrica(nome), OPERADORES[simbolo]
+                if isinstance(limiar, (tuple, list)):
+                    m_limiar, limiar = indice_metrica(limiar[0]), float(limiar[1])
+                else:
+                    m_limiar = -1
+            self.regras.append((c, m, op, m_limiar, limiar, acao, valor, grupo,
+                                _texto(regra.get("comentario")), _texto(regra.get("sugestao")),
+                                _texto(regra.get("exemplo"))))
+
+        for regra in definicao["regras"]:
+            criterio = regra.get("criterio")
+            if "faixas" in regra:
+                grupo = self.num_grupos
+                self.num_grupos += 1
+                for condicao, nota, comentario in regra["faixas"]:
+                    compilar(criterio, condicao, _FIXAR, nota, grupo, {"comentario": comentario})
+            elif "nota" in regra:
+                compilar(criterio, regra["se"], _FIXAR, regra["nota"], -1, regra)
+            elif "menos" in regra:
+                compilar(criterio, regra["se"], _TIRAR, regra["menos"], -1, regra)
+            else:
+                compilar(criterio, regra["se"], _NENHUMA, 0, -1, regra)
+        self.metricas: Tuple[str, ...] = tuple(metricas)
+
+    # ---------------------------
+    # um texto
+    # ---------------------------
+    def extrair(self, rel: Mapping, extras: Optional[Mapping] = None) -> Dict[str, float]:
+        """Valores das métricas usadas pela rubrica (`extras` tem precedência)."""
+        valores: Dict[str, float] = {}
+        for nome in self.metricas:
+            if extras is not None and nome in extras:
+                valores[nome] = extras[nome]
+            elif nome in ("num_linhas", "num_versos_longos"):
+                valores["num_linhas"], valores["num_versos_longos"] = _linhas_e_versos_longos(rel)
+            else:
+                valores[nome] = _EXTRATORES[nome](rel)
+        return valores
+
+    def avaliar_vetor(self, x: Sequence[float]) -> Tuple[List[int], List[int]]:
+        """Notas (na ordem de `criterios`) e índices das regras disparadas para o vetor
+        de métricas `x` (na ordem de `metricas`)."""
+        notas = list(self._iniciais)
+        resolvidos = [False] * self.num_grupos
+        disparadas = []
+        for i, (c, m, op, m_limiar, limiar, acao, valor, grupo, _, _, _) in enumerate(self.regras):
+            if grupo >= 0 and resolvidos[grupo]:
+                continue
+            if m >= 0:
+                if m_limiar >= 0:
+                    limiar = limiar * x[m_limiar]
+                if not op(x[m], limiar):
+                    continue
+            if grupo >= 0:
+                resolvidos[grupo] = True
+            if acao == _FIXAR:
+                notas[c] = valor
+            elif acao == _TIRAR:
+                notas[c] = max(0, notas[c] - valor)
+            disparadas.append(i)
+        return notas, disparadas
+
+    def avaliar(self, rel: Mapping, extras: Optional[Mapping] = None) -> Dict[str, int]:
+        """Notas por critério para o relatório `rel`."""
+        valores = self.extrair(rel, extras)
+        notas, _ = self.avaliar_vetor([valores[m] for m in self.metricas])
+        return dict(zip(self.criterios, notas))
+
+    def aplicar(self, rel: Mapping, extras: Optional[Mapping] = None,
+                contexto: Optional[Mapping] = None) -> ResultadoRubrica:
+        """Notas, comentários, sugestões e exemplos das regras disparadas."""
+        valores = self.extrair(rel, extras)
+        notas, disparadas = self.avaliar_vetor([valores[m] for m in self.metricas])
+        campos = dict(valores, **contexto) if contexto else valores
+        comentarios, sugestoes, exemplos = [], [], []
+        for i in disparadas:
+            comentario, sugestao, exemplo = self.regras[i][8:]
+            if comentario is not None:
+                comentarios.append(_formatar(comentario, campos))
+            if sugestao is not None:
+                sugestoes.append(_formatar(sugestao, campos))
+            if exemplo is not None:
+                exemplos.append(_formatar(exemplo, campos))
+        return ResultadoRubrica(dict(zip(self.criterios, notas)), comentarios, sugestoes, exemplos)
+
+    # ---------------------------
+    # lote
+    # ---------------------------
+    def avaliar_lote(self, metricas):
+        """Avalia muitos textos de uma vez.
+
+        `metricas` é uma matriz (n textos x len(self.metricas)) ou um mapeamento
+        métrica -> array com n valores. Devolve (notas, disparos): notas inteiras
+        (n x len(criterios)) e a matriz booleana das regras disparadas (n x len(regras)).
+        """
+        import numpy as np
+
+        if isinstance(metricas, Mapping):
+            colunas = [np.asarray(metricas[nome], dtype=np.float64) for nome in self.metricas]
+            x = np.column_stack(colunas) if colunas else np.zeros((0, 0))
+        else:
+            x = np.asarray(metricas, dtype=np.float64)
+        n = x.shape[0]
+        notas = np.tile(np.asarray(self._iniciais, dtype=np.int64), (n, 1))
+        disparos = np.zeros((n, len(self.regras)), dtype=bool)
+        resolvidos = np.zeros((n, self.num_grupos), dtype=bool)
+        for i, (c, m, op, m_limiar, limiar, acao, valor, grupo, _, _, _) in enumerate(self.regras):
+            if m >= 0:
+                if m_limiar >= 0:
+                    limiar = limiar * x[:, m_limiar]
+                cond = op(x[:, m], limiar)
+            else:
+                cond = np.ones(n, dtype=bool)
+            if grupo >= 0:
+                cond &= ~resolvidos[:, grupo]
+                resolvidos[:, grupo] |= cond
+            if acao == _FIXAR:
+                notas[cond, c] = valor
+            elif acao == _TIRAR:
+                notas[cond, c] = np.maximum(0, notas[cond, c] - valor)
+            disparos[:, i] = cond
+        return notas, disparos
+
+
+# ===========================
+# REGISTRO
+# ===========================
+_REGISTRO: Dict[str, RubricaCompilada] = {}
+_PADRAO = "dissertação"
+
+
+def registrar_rubrica(definicao: Mapping) -> RubricaCompilada:
+    """Compila a rubrica de um gênero e a registra pelo nome e pelos apelidos."""
+    rubrica = RubricaCompilada(definicao)
+    for nome in (rubrica.nome,) + rubrica.aliases:
+        _REGISTRO[nome.lower()] = rubrica
+    return rubrica
+
+
+def rubrica_registrada(genero: str) -> Optional[RubricaCompilada]:
+    """Rubrica do gênero, ou None se o gênero não tiver rubrica própria."""
+    return _REGISTRO.get(genero.lower())
+
+
+def rubrica_do_genero(genero: str) -> RubricaCompilada:
+    """Rubrica do gênero; gêneros sem rubrica própria usam a de dissertação."""
+    return _REGISTRO.get(genero.lower()) or _REGISTRO[_PADRAO]
+
+
+def rubricas_registradas() -> List[RubricaCompilada]:
+    vistas: List[RubricaCompilada] = []
+    for rubrica in _REGISTRO.values():
+        if rubrica not in vistas:
+            vistas.append(rubrica)
+    return vistas
+
+
+def assinatura_rubricas() -> str:
+    """Hash das definições em uso (gêneros registrados + feedback)."""
+    definicoes = [r.definicao for r in rubricas_registradas()] + [RUBRICA_FEEDBACK.definicao]
+    dados = json.dumps(definicoes, ensure_ascii=False, sort_keys=True, default=list)
+    return hashlib.sha256(dados.encode("utf-8")).hexdigest()[:16]
+
+
+for _definicao in (DISSERTACAO, CONTO, POEMA, FABULA):
+    registrar_rubrica(_definicao)
+
+RUBRICA_FEEDBACK = RubricaCompilada(FEEDBACK)
@@ -0,0 +1,380 @@
+# servidor.py
+# Serviço HTTP local (sem dependências externas) para integração com o AVA/LMS.
+# O asyncio aceita as conexões e agrupa os pedidos em lotes; a análise, que usa a CPU,
+# roda num pool de processos em que cada processo mantém o avaliador carregado.
+#
+# Rotas:
+#   POST /avaliar        {"texto": "...", "tema": "...", "genero": "conto"}
+#   POST /avaliar/lote   {"pedidos": [{"texto": ...}, ...]}
+#   GET  /saude          estado da fila, processos e latências (p50/p99)
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+try:
+    # Prefer relative imports when used as a package
+    from .lote import GENERO_PADRAO, GENEROS_VALIDOS, iniciar_trabalhador
+    from .trabalhador import processar_pedido
+except Exception:
+    # Fallback for direct script execution
+    from lote import GENERO_PADRAO, GENEROS_VALIDOS, iniciar_trabalhador
+    from trabalhador import processar_pedido
+
+# Maior corpo aceito (um texto de prova cabe com folga)
+MAX_CORPO = 2 * 1024 * 1024
+# Quantas latências recentes entram no cálculo dos percentis
+JANELA_LATENCIAS = 2048
+
+_MOTIVOS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable",
+}
+# Chave interna do resultado com o status HTTP de uma falha do pool (não vai ao cliente)
+_STATUS = "_status"
+
+
+class FilaCheia(Exception):
+    """A fila chegou ao limite; o cliente deve tentar de novo mais tarde."""
+
+
+class ErroHTTP(Exception):
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+def processar_lote(pedidos: List[Dict], genero_padrao: str = GENERO_PADRAO) -> List[Dict]:
+    """Roda no processo trabalhador: avalia um lote inteiro numa única ida ao pool."""
+    return [processar_pedido(pedido, genero_padrao) for pedido in pedidos]
+
+
+def _percentil(valores: List[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+class ServicoAvaliacao:
+    """Fila de pedidos + despachante de lotes para o pool de processos.
+
+    - `max_fila`: pedidos aguardando ou em avaliação antes de recusar com 503 (lotes
+      maiores que isso são recusados de imediato com 413)
+    - `tamanho_lote`: máximo de pedidos enviados juntos a um processo
+    - `espera_lote_ms`: quanto o despachante espera para completar um lote
+    """
+
+    def __init__(self, processos: int = 2, max_fila: int = 256, tamanho_lote: int = 8,
+                 espera_lote_ms: float = 5.0, genero_padrao: str = GENERO_PADRAO,
+                 caminho_cache: Optional[str] = None):
+        self.processos = max(1, processos)
+        self.max_fila = max_fila
+        self.tamanho_lote = max(1, tamanho_lote)
+        self.espera_lote = espera_lote_ms / 1000.0
+        self.genero_padrao = genero_padrao
+        self.caminho_cache = caminho_cache
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._fila: Optional[asyncio.Queue] = None
+        self._vagas: Optional[asyncio.Semaphore] = None
+        self._despachante: Optional[asyncio.Task] = None
+        self._em_andamento = 0
+        self._latencias: deque = deque(maxlen=JANELA_LATENCIAS)
+        self._inicio = time.monotonic()
+        self.atendidos = 0
+        self.recusados = 0
+        self.erros = 0
+        self.lotes = 0
+        self.pedidos_em_lotes = 0
+        self.reinicios = 0
+
+    # ---------------------------
+    # ciclo de vida
+    # ---------------------------
+    def _novo_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.processos, initializer=iniciar_trabalhador,
+                                   initargs=(self.caminho_cache,))
+
+    def _recriar_executor(self, quebrado: ProcessPoolExecutor):
+        """Troca um pool quebrado (processo morto) por um novo; os lotes seguintes usam este."""
+        if self._executor is not quebrado:
+            return  # outro lote do mesmo pool já o recriou
+        quebrado.shutdown(wait=False)
+        self._executor = self._novo_executor()
+        self.reinicios += 1
+
+    async def iniciar(self):
+        self._executor = self._novo_executor()
+        self._fila = asyncio.Queue()
+        # no máximo um lote por processo em andamento; o restante espera na fila
+        self._vagas = asyncio.Semaphore(self.processos)
+        self._despachante = asyncio.ensure_future(self._despachar())
+        # aquece todos os processos antes de aceitar conexões
+        loop = asyncio.get_event_loop()
+        await asyncio.gather(*[
+            loop.run_in_executor(self._executor, processar_lote, [], self.genero_padrao)
+            for _ in range(self.processos)
+        ])
+
+    async def encerrar(self):
+        if self._despachante is not None:
+            self._despachante.cancel()
+            try:
+                await self._despachante
+            except asyncio.CancelledError:
+                pass
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    # ---------------------------
+    # fila e lotes
+    # ---------------------------
+    @property
+    def ocupacao(self) -> int:
+        """Pedidos aguardando na fila ou já entregues a um processo."""
+        return self._fila.qsize() + self._em_andamento
+
+    async def avaliar(self, pedidos: List[Dict]) -> List[Dict]:
+        """Enfileira os pedidos e aguarda os resultados (na mesma ordem)."""
+        if self.ocupacao + len(pedidos) > self.max_fila:
+            self.recusados += len(pedidos)
+            raise FilaCheia()
+        loop = asyncio.get_event_loop()
+        inicio = time.monotonic()
+        futuros = []
+        for pedido in pedidos:
+            futuro = loop.create_future()
+            self._fila.put_nowait((pedido, futuro))
+            futuros.append(futuro)
+        resultados = await asyncio.gather(*futuros)
+        decorrido = time.monotonic() - inicio
+        for resultado in resultados:
+            self._latencias.append(decorrido)
+            self.atendidos += 1
+            if "erro" in resultado:
+                self.erros += 1
+        return resultados
+
+    async def _despachar(self):
+        while True:
+            lote: List[Tuple[Dict, asyncio.Future]] = [await self._fila.get()]
+            limite = time.monotonic() + self.espera_lote
+            while len(lote) < self.tamanho_lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    lote.append(await asyncio.wait_for(self._fila.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+            await self._vagas.acquire()
+            self._em_andamento += len(lote)
+            self.lotes += 1
+            self.pedidos_em_lotes += len(lote)
+            asyncio.ensure_future(self._executar(lote))
+
+    async def _executar(self, lote: List[Tuple[Dict, asyncio.Future]]):
+        loop = asyncio.get_event_loop()
+        pedidos = [pedido for pedido, _ in lote]
+        executor = self._executor
+        try:
+            resultados = await loop.run_in_executor(executor, processar_lote, pedidos,
+                                                    self.genero_padrao)
+        except BrokenProcessPool as e:  # um processo trabalhador morreu
+            self._recriar_executor(executor)
+            resultados = [{"erro": f"{type(e).__name__}: {e}", _STATUS: 503} for _ in lote]
+        except Exception as e:
+            resultados = [{"erro": f"{type(e).__name__}: {e}", _STATUS: 500} for _ in lote]
+        finally:
+            self._em_andamento -= len(lote)
+            self._vagas.release()
+        for (_, futuro), resultado in zip(lote, resultados):
+            if not futuro.done():
+                futuro.set_result(resultado)
+
+    def saude(self) -> Dict:
+        latencias = list(self._latencias)
+        return {
+            "status": "ok",
+            "processos": self.processos,
+            "fila": self._fila.qsize() if self._fila is not None else 0,
+            "em_avaliacao": self._em_andamento,
+            "max_fila": self.max_fila,
+            "atendidos": self.atendidos,
+            "recusados": self.recusados,
+            "erros": self.erros,
+            "lotes": self.lotes,
+            "reinicios_pool": self.reinicios,
+            "media_por_lote": round(self.pedidos_em_lotes / self.lotes, 2) if self.lotes else 0,
+            "latencia_p50_ms": round(_percentil(latencias, 50) * 1000, 1),
+            "latencia_p99_ms": round(_percentil(latencias, 99) * 1000, 1),
+            "tempo_ativo_s": round(time.monotonic() - self._inicio, 1),
+        }
+
+
+# ===========================
+# HTTP/1.1 mínimo
+# ===========================
+async def _ler_requisicao(leitor: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+    """Lê uma requisição; None se o cliente fechou a conexão."""
+    linha = await leitor.readline()
+    if not linha:
+        return None
+    try:
+        metodo, alvo, _ = linha.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ErroHTTP(400, "linha de requisição inválida")
+    cabecalhos: Dict[str, str] = {}
+    while True:
+        linha = await leitor.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+    try:
+        tamanho = int(cabecalhos.get("content-length", "0"))
+    except ValueError:
+        raise ErroHTTP(400, "Content-Length inválido")
+    if tamanho > MAX_CORPO:
+        raise ErroHTTP(413, f"corpo maior que {MAX_CORPO} bytes")
+    corpo = await leitor.readexactly(tamanho) if tamanho > 0 else b""
+    return metodo.upper(), alvo.split("?", 1)[0], cabecalhos, corpo
+
+
+def _responder(escritor: asyncio.StreamWriter, status: int, dados: Dict,
+               manter: bool = True, extras: Optional[Dict[str, str]] = None):
+    corpo = json.dumps(dados, ensure_ascii=False).encode("utf-8")
+    cabecalhos = [
+        f"HTTP/1.1 {status} {_MOTIVOS.get(status, '')}",
+        "Content-Type: application/json; charset=utf-8",
+        f"Content-Length: {len(corpo)}",
+        "Connection: keep-alive" if manter else "Connection: close",
+    ]
+    for nome, valor in (extras or {}).items():
+        cabecalhos.append(f"{nome}: {valor}")
+    escritor.write(("\r\n".join(cabecalhos) + "\r\n\r\n").encode("latin-1") + corpo)
+
+
+def _decodificar(corpo: bytes) -> Dict:
+    try:
+        dados = json.loads(corpo.decode("utf-8"))
+    except ValueError as e:
+        raise ErroHTTP(400, f"JSON inválido: {e}")
+    if not isinstance(dados, dict):
+        raise ErroHTTP(400, "o corpo deve ser um objeto JSON")
+    return dados
+
+
+async def _rotear(servico: ServicoAvaliacao, metodo: str, caminho: str, corpo: bytes) -> Tuple[int, Dict]:
+    if caminho == "/saude":
+        if metodo != "GET":
+            raise ErroHTTP(405, "use GET")
+        return 200, servico.saude()
+    if caminho == "/avaliar":
+        if metodo != "POST":
+            raise ErroHTTP(405, "use POST")
+        resultado = (await servico.avaliar([_decodificar(corpo)]))[0]
+        # 400 para pedidos inválidos; falhas do pool trazem o próprio status (500/503)
+        return resultado.pop(_STATUS, 400 if "erro" in resultado else 200), resultado
+    if caminho == "/avaliar/lote":
+        if metodo != "POST":
+            raise ErroHTTP(405, "use POST")
+        pedidos = _decodificar(corpo).get("pedidos")
+        if not isinstance(pedidos, list) or not all(isinstance(p, dict) for p in pedidos):
+            raise ErroHTTP(400, "campo 'pedidos' deve ser uma lista de objetos")
+        if len(pedidos) > servico.max_fila:
+            # nunca caberia na fila, mesmo vazia: 503 faria o cliente tentar de novo para sempre
+            raise ErroHTTP(413, f"lote com {len(pedidos)} pedidos; o máximo é {servico.max_fila}")
+        resultados = await servico.avaliar(pedidos)
+        for resultado in resultados:
+            resultado.pop(_STATUS, None)
+        # repete o "id" de cada pedido, como no modo coprocesso
+        return 200, {"resultados": [
+            dict(r, id=p["id"]) if "id" in p else r for p, r in zip(pedidos, resultados)
+        ]}
+    raise ErroHTTP(404, f"rota desconhecida: {caminho}")
+
+
+async def _atender_conexao(servico: ServicoAvaliacao, leitor: asyncio.StreamReader,
+                           escritor: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                requisicao = await _ler_requisicao(leitor)
+            except ErroHTTP as e:
+                _responder(escritor, e.status, {"erro": str(e)}, manter=False)
+                break
+            if requisicao is None:
+                break
+            metodo, caminho, cabecalhos, corpo = requisicao
+            manter = cabecalhos.get("connection", "").lower() != "close"
+            try:
+                status, dados = await _rotear(servico, metodo, caminho, corpo)
+                _responder(escritor, status, dados, manter)
+            except FilaCheia:
+                _responder(escritor, 503, {"erro": "fila cheia, tente novamente"}, manter,
+                           {"Retry-After": "1"})
+            except ErroHTTP as e:
+                _responder(escritor, e.status, {"erro": str(e)}, manter)
+            await escritor.drain()
+            if not manter:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(host: str = "127.0.0.1", porta: int = 8000, **opcoes):
+    """Inicia o serviço e atende até ser interrompido."""
+    servico = ServicoAvaliacao(**opcoes)
+    await servico.iniciar()
+    servidor = await asyncio.start_server(
+        lambda r, w: _atender_conexao(servico, r, w), host, porta
+    )
+    print(f"Servindo em http://{host}:{porta} com {servico.processos} processo(s)", flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servico.encerrar()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Serviço HTTP local de avaliação de textos.")
+    parser.add_argument("--host", default="127.0.0.1", help="endereço de escuta (padrão: 127.0.0.1)")
+    parser.add_argument("--porta", type=int, default=8000, help="porta de escuta (padrão: 8000)")
+    parser.add_argument("--processos", type=int, default=2, help="processos de avaliação (padrão: 2)")
+    parser.add_argument("--max-fila", type=int, default=256,
+                        help="pedidos aguardando/em avaliação antes de responder 503")
+    parser.add_argument("--tamanho-lote", type=int, default=8,
+                        help="máximo de pedidos enviados juntos a um processo")
+    parser.add_argument("--espera-lote-ms", type=float, default=5.0,
+                        help="espera máxima para completar um lote (ms)")
+    parser.add_argument("--genero-padrao", default=GENERO_PADRAO,
+                        help="gênero usado quando a detecção retorna 'desconhecido'")
+    parser.add_argument("--cache", default=None, help="arquivo SQLite do cache de resultados")
+    args = parser.parse_args(argv)
+
+    if args.genero_padrao.lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero padrão inválido: {args.genero_padrao}")
+
+    try:
+        asyncio.run(servir(
+            args.host, args.porta,
+            processos=args.processos, max_fila=args.max_fila, tamanho_lote=args.tamanho_lote,
+            espera_lote_ms=args.espera_lote_ms, genero_padrao=args.genero_padrao.lower(),
+            caminho_cache=args.cache,
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# tema.py
+# Índice do tema da atividade para a "adequação ao tema": os termos do tema são
+# normalizados (minúsculas, sem acentos, radical) uma única vez por atividade e cada
+# redação é comparada a eles em uma passagem pelo seu vocabulário. Com vários temas
+# candidatos, um índice invertido pontua uma redação contra todos de uma vez.
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set
+
+_PALAVRA = re.compile(r"\w+")
+
+# Sufixos (já sem acento) removidos pelo radicalizador, do mais longo ao mais curto.
+# É um radicalizador leve para português: basta que "educação", "educacional" e
+# "educar" cheguem ao mesmo radical.
+_SUFIXOS = tuple(sorted((
+    "amentos", "imentos", "amento", "imento", "acionais", "acional", "adoras", "adores",
+    "idades", "idade", "acoes", "acao", "mente", "ismos", "ismo", "istas", "ista",
+    "aveis", "avel", "iveis", "ivel", "ancias", "ancia", "encias", "encia", "adora", "ador",
+    "antes", "ante", "ando", "endo", "indo", "ados", "idos", "adas", "idas", "ado", "ido",
+    "ada", "ida", "icas", "ica", "icos", "ico", "ivas", "iva", "ivos", "ivo", "osas", "osa",
+    "osos", "oso", "ias", "ia", "ais", "al", "eis", "ar", "er", "ir", "es", "as", "os",
+    "a", "o", "e", "s",
+), key=len, reverse=True))
+
+# Tamanho mínimo do radical que sobra depois de remover um sufixo
+RADICAL_MINIMO = 3
+
+
+def remover_acentos(palavra: str) -> str:
+    decomposta = unicodedata.normalize("NFD", palavra)
+    return "".join(c for c in decomposta if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def radical(palavra: str) -> str:
+    """Forma normalizada de uma palavra: minúsculas, sem acentos e sem o sufixo."""
+    palavra = remover_acentos(palavra.lower())
+    for sufixo in _SUFIXOS:
+        if palavra.endswith(sufixo) and len(palavra) - len(sufixo) >= RADICAL_MINIMO:
+            return palavra[:-len(sufixo)]
+    return palavra
+
+
+def termos_do_tema(tema: str, stopwords: AbstractSet[str] = frozenset()) -> List[str]:
+    """Palavras do tema sem stopwords (se só houver stopwords, mantém todas)."""
+    palavras = _PALAVRA.findall(tema.lower())
+    relevantes = [p for p in palavras if p not in stopwords]
+    return relevantes or palavras
+
+
+def radicais(vocabulario: Iterable[str]) -> Set[str]:
+    """Radicais de um vocabulário (uma passagem; os radicais ficam em cache)."""
+    return {radical(p) for p in vocabulario}
+
+
+def nota_adequacao(peso_encontrado: float, peso_total: float, num_termos: int) -> int:
+    """0 = nenhum termo; 1 = relação parcial; 2 = boa relação.
+
+    Com pesos iguais equivale à regra original: parcial quando os termos encontrados
+    são menos que max(1, num_termos // 2).
+    """
+    if peso_encontrado <= 0:
+        return 0
+    if peso_encontrado * num_termos < peso_total * max(1, num_termos // 2):
+        return 1
+    return 2
+
+
+class ResultadoTema:
+    __slots__ = ("tema", "nota", "cobertura", "encontrados", "faltantes")
+
+    def __init__(self, tema: str, nota: int, cobertura: float,
+                 encontrados: List[str], faltantes: List[str]):
+        self.tema = tema
+        self.nota = nota
+        self.cobertura = cobertura
+        self.encontrados = encontrados
+        self.faltantes = faltantes
+
+    def __repr__(self) -> str:
+        return f"ResultadoTema({self.tema!r}, nota={self.nota}, cobertura={self.cobertura:.2f})"
+
+
+class IndiceTema:
+    """Termos de um tema (radical -> peso), construídos uma vez por atividade.
+
+    `pesos` permite dar mais importância a algumas palavras do tema, por exemplo
+    {"sustentabilidade": 3}; as demais valem 1. Palavras em `stopwords` são ignoradas.
+    """
+
+    def __init__(self, tema: str, pesos: Optional[Dict[str, float]] = None,
+                 stopwords: AbstractSet[str] = frozenset()):
+        self.tema = tema
+        pesos_radical = {radical(p): float(w) for p, w in (pesos or {}).items()}
+        self.termos: Dict[str, float] = {}
+        self._palavra_do_termo: Dict[str, str] = {}
+        for palavra in termos_do_tema(tema, stopwords):
+            r = radical(palavra)
+            if r not in self.termos:
+                self.termos[r] = pesos_radical.get(r, 1.0)
+                self._palavra_do_termo[r] = palavra
+        self.peso_total = sum(self.termos.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.termos)
+
+    def pontuar_radicais(self, radicais_texto: Set[str]) -> ResultadoTema:
+        encontrados = [r for r in self.termos if r in radicais_texto]
+        peso = sum(self.termos[r] for r in encontrados)
+        faltantes = [self._palavra_do_termo[r] for r in self.termos if r not in radicais_texto]
+        return ResultadoTema(
+            self.tema,
+            nota_adequacao(peso, self.peso_total, len(self.termos)),
+            peso / self.peso_total if self.peso_total else 0.0,
+            [self._palavra_do_termo[r] for r in encontrados],
+            faltantes,
+        )
+
+    def pontuar(self, vocabulario: Iterable[str]) -> ResultadoTema:
+        """Compara o tema com o vocabulário (palavras em minúsculas) de uma redação."""
+        return self.pontuar_radicais(radicais(vocabulario))
+
+
+class IndiceTemas:
+    """Índice invertido radical -> temas, para comparar uma redação com vários temas."""
+
+    def __init__(self, temas: Iterable[str], pesos: Optional[Dict[str, Dict[str, float]]] = None,
+                 stopwords: AbstractSet[str] = frozenset()):
+        pesos = pesos or {}
+        self.indices: List[IndiceTema] = [IndiceTema(t, pesos.get(t), stopwords) for t in temas]
+        self._postagens: Dict[str, List[int]] = {}
+        for i, indice in enumerate(self.indices):
+            for r in indice.termos:
+                self._postagens.setdefault(r, []).append(i)
+
+    def pontuar(self, vocabulario: Iterable[str]) -> List[ResultadoTema]:
+        """Resultados para todos os temas, do mais ao menos aderente."""
+        radicais_texto = radicais(vocabulario)
+        # só os temas que compartilham algum radical com a redação são examinados
+        tocados: Set[int] = set()
+        for r in radicais_texto:
+            tocados.update(self._postagens.get(r, ()))
+        resultados = []
+        for i, indice in enumerate(self.indices):
+            if i in tocados:
+                resultados.append(indice.pontuar_radicais(radicais_texto))
+            else:
+                resultados.append(ResultadoTema(indice.tema, 0, 0.0, [],
+                                                list(indice._palavra_do_termo.values())))
+        resultados.sort(key=lambda r: (r.nota, r.cobertura), reverse=True)
+        return resultados
@@ -0,0 +1,220 @@
+# tokenizacao.py
+# Backends de tokenização (frases e palavras). O padrão é o NLTK, com acesso
+# preguiçoso: o pacote só é importado na primeira tokenização e o modelo punkt é
+# carregado uma única vez por processo (singleton). Os parâmetros do punkt ficam num
+# cache local em JSON, mais rápido de ler que as tabelas do nltk_data. O backend
+# "rapido" (data/tokenizacao_pt.py) usa só expressões regulares para português.
+
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Union
+
+# Sem `language=...`, o sent_tokenize do NLTK usa o modelo inglês; mantemos o mesmo.
+IDIOMA_PUNKT = "english"
+
+# Backend usado quando nenhum é indicado (pode ser trocado por AVALIADOR_TOKENIZADOR)
+BACKEND_PADRAO = "nltk"
+
+_trava = threading.Lock()
+_punkt = None
+_treebank = None
+
+
+def _pasta_cache() -> str:
+    pasta = os.environ.get("AVALIADOR_CACHE_DIR")
+    if pasta:
+        return pasta
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "avaliador-textos")
+
+
+def caminho_cache_punkt(idioma: str = IDIOMA_PUNKT) -> str:
+    return os.path.join(_pasta_cache(), f"punkt_{idioma}.json")
+
+
+def _ler_parametros(caminho: str):
+    from nltk.tokenize.punkt import PunktParameters
+
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    params = PunktParameters()
+    params.abbrev_types = set(dados["abbrev_types"])
+    params.collocations = {tuple(par) for par in dados["collocations"]}
+    params.sent_starters = set(dados["sent_starters"])
+    params.ortho_context = defaultdict(int, dados["ortho_context"])
+    return params
+
+
+def _gravar_parametros(caminho: str, params):
+    dados = {
+        "abbrev_types": sorted(params.abbrev_types),
+        "collocations": sorted(list(par) for par in params.collocations),
+        "sent_starters": sorted(params.sent_starters),
+        "ortho_context": dict(params.ortho_context),
+    }
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(dados, f, ensure_ascii=False)
+    # troca atômica: outro processo nunca lê um arquivo pela metade
+    os.replace(temporario, caminho)
+
+
+def _carregar_punkt(idioma: str):
+    from nltk.tokenize.punkt import PunktSentenceTokenizer, PunktTokenizer
+
+    caminho = caminho_cache_punkt(idioma)
+    try:
+        return PunktSentenceTokenizer(_ler_parametros(caminho))
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    tokenizador = PunktTokenizer(idioma)  # lê as tabelas do nltk_data (lento)
+    try:
+        _gravar_parametros(caminho, tokenizador._params)
+    except OSError:
+        pass  # sem permissão de escrita: segue sem cache
+    return tokenizador
+
+
+def tokenizador_frases():
+    """Tokenizador punkt do processo (carregado na primeira chamada)."""
+    global _punkt
+    if _punkt is None:
+        with _trava:
+            if _punkt is None:
+                _punkt = _carregar_punkt(IDIOMA_PUNKT)
+    return _punkt
+
+
+def tokenizador_palavras():
+    """Tokenizador de palavras do NLTK (o mesmo usado por `nltk.word_tokenize`)."""
+    global _treebank
+    if _treebank is None:
+        from nltk.tokenize.destructive import NLTKWordTokenizer
+
+        _treebank = NLTKWordTokenizer()
+    return _treebank
+
+
+def _nltk_sent_tokenize(texto: str) -> List[str]:
+    return tokenizador_frases().tokenize(texto)
+
+
+def _nltk_word_tokenize(texto: str, preserve_line: bool = False) -> List[str]:
+    frases = [texto] if preserve_line else _nltk_sent_tokenize(texto)
+    tokenizar = tokenizador_palavras().tokenize
+    return [token for frase in frases for token in tokenizar(frase)]
+
+
+# ===========================
+# BACKENDS
+# ===========================
+class BackendTokenizacao:
+    """Interface de um tokenizador: frases (recortes do próprio texto, em ordem) e
+    palavras. `word_tokenize(frase, preserve_line=True)` tokeniza uma frase já isolada."""
+
+    nome = ""
+
+    def sent_tokenize(self, texto: str) -> List[str]:
+        raise NotImplementedError
+
+    def word_tokenize(self, texto: str, preserve_line: bool = False) -> List[str]:
+        raise NotImplementedError
+
+    def preaquecer(self):
+        pass
+
+
+class BackendNLTK(BackendTokenizacao):
+    """punkt (modelo inglês, como `nltk.sent_tokenize` sem idioma) + Treebank."""
+
+    nome = "nltk"
+
+    def sent_tokenize(self, texto: str) -> List[str]:
+        return _nltk_sent_tokenize(texto)
+
+    def word_tokenize(self, texto: str, preserve_line: bool = False) -> List[str]:
+        return _nltk_word_tokenize(texto, preserve_line)
+
+    def preaquecer(self):
+        tokenizador_frases()
+        tokenizador_palavras()
+
+
+class BackendRapido(BackendTokenizacao):
+    """Expressões regulares para português (abreviaturas, clíticos), sem NLTK."""
+
+    nome = "rapido"
+
+    def __init__(self):
+        try:
+            from . import tokenizacao_pt
+        except ImportError:
+            import tokenizacao_pt
+        self._frases = tokenizacao_pt.frases
+        self._palavras = tokenizacao_pt.palavras
+
+    def sent_tokenize(self, texto: str) -> List[str]:
+        return self._frases(texto)
+
+    def word_tokenize(self, texto: str, preserve_line: bool = False) -> List[str]:
+        if preserve_line:
+            return self._palavras(texto)
+        palavras = self._palavras
+        return [token for frase in self._frases(texto) for token in palavras(frase)]
+
+
+BACKENDS = {
+    BackendNLTK.nome: BackendNLTK,
+    BackendRapido.nome: BackendRapido,
+}
+_instancias: Dict[str, BackendTokenizacao] = {}
+_atual: Optional[BackendTokenizacao] = None
+
+
+def backend_tokenizacao(nome: Optional[str] = None) -> BackendTokenizacao:
+    """Instância (única por processo) do backend `nome`; sem nome, o backend atual."""
+    global _atual
+    if nome is None:
+        if _atual is None:
+            _atual = backend_tokenizacao(os.environ.get("AVALIADOR_TOKENIZADOR") or BACKEND_PADRAO)
+        return _atual
+    instancia = _instancias.get(nome)
+    if instancia is None:
+        if nome not in BACKENDS:
+            raise ValueError(f"tokenizador desconhecido: {nome} (use {', '.join(BACKENDS)})")
+        instancia = _instancias.setdefault(nome, BACKENDS[nome]())
+    return instancia
+
+
+def obter_backend(tokenizador: Union[None, str, BackendTokenizacao] = None) -> BackendTokenizacao:
+    """Aceita um backend, o nome de um backend ou None (backend atual)."""
+    if isinstance(tokenizador, BackendTokenizacao):
+        return tokenizador
+    return backend_tokenizacao(tokenizador)
+
+
+def definir_backend(tokenizador: Union[str, BackendTokenizacao]):
+    """Troca o backend usado por `sent_tokenize`/`word_tokenize` neste processo.
+
+    Processos trabalhadores seguem a variável de ambiente AVALIADOR_TOKENIZADOR.
+    """
+    global _atual
+    _atual = obter_backend(tokenizador)
+
+
+def sent_tokenize(texto: str) -> List[str]:
+    """Frases de `texto` (com o NLTK, equivale a `nltk.tokenize.sent_tokenize(texto)`)."""
+    return backend_tokenizacao().sent_tokenize(texto)
+
+
+def word_tokenize(texto: str, preserve_line: bool = False) -> List[str]:
+    """Palavras de `texto` (com o NLTK, equivale a `nltk.tokenize.word_tokenize(texto, preserve_line=...)`)."""
+    return backend_tokenizacao().word_tokenize(texto, preserve_line)
+
+
+def preaquecer():
+    """Carrega antecipadamente o tokenizador (útil em processos trabalhadores)."""
+    backend_tokenizacao().preaquecer()
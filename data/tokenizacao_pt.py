@@ -0,0 +1,109 @@
+# tokenizacao_pt.py
+# Tokenizador rápido para português, só com expressões regulares pré-compiladas:
+# frases terminam em . ! ? … seguidos de espaço e de um início que não seja letra
+# minúscula, exceto depois de abreviaturas ("Sr.", "Dra.", "pág.", iniciais); as
+# palavras mantêm hífens de clíticos e compostos ("disse-lhe", "guarda-chuva").
+# Não depende do NLTK.
+
+import re
+from typing import List, Tuple
+
+# Abreviaturas após as quais nunca há fim de frase (o ponto faz parte do token).
+# "etc." fica de fora: no fim de uma frase ele também a encerra.
+ABREVIATURAS = (
+    "sr", "sra", "srs", "sras", "srta", "dr", "dra", "drs", "dras", "prof", "profa", "profs",
+    "exmo", "exma", "ilmo", "ilma", "sto", "sta", "fr", "gen", "cel", "cap",
+    "maj", "ten", "sgto", "eng", "arq", "adv", "jr", "av", "pç", "rod", "pág", "págs",
+    "pp", "vol", "vols", "ed", "cf", "ibid", "fig", "figs", "art", "arts", "inc", "nº",
+    "núm", "tel", "obs", "aprox", "séc", "ltda", "cia", "depto", "dept", "a.c", "d.c",
+    "vs",
+)
+# Abreviaturas que também são palavras ("Ela tem um dom."): só contam com inicial
+# maiúscula ("Dom Pedro", "Pe. Antônio", "Ex.: ..."); "al." só em "et al.".
+ABREVIATURAS_MAIUSCULAS = ("dom", "pe", "ex")
+# Letras isoladas seguidas de ponto (iniciais: "J. R. R. Tolkien") também não encerram frase.
+
+_ALTERNATIVAS_ABREV = "|".join(re.escape(a) for a in sorted(set(ABREVIATURAS), key=len, reverse=True))
+_ALTERNATIVAS_MAIUSCULAS = "|".join(
+    forma for a in ABREVIATURAS_MAIUSCULAS for forma in (a.capitalize(), a.upper())
+)
+
+# Candidatos a fim de frase: pontuação final, aspas/parênteses de fechamento e o espaço
+# seguinte; a decisão olha só o token anterior (abreviatura?), o espaço e o início do
+# token seguinte (minúscula? travessão de fala na mesma linha?).
+_FIM_FRASE = re.compile(r"([.!?…]+)([\"'”’»)\]]*)(?=(\s+)(\S))")
+_TRAVESSOES = "—–"
+_ULTIMA_PALAVRA = re.compile(r"(\w+(?:\.\w+)*)\.$")
+_ABREVIATURA = re.compile(r"(?:" + _ALTERNATIVAS_ABREV + r")", re.I)
+_ABREVIATURA_MAIUSCULA = re.compile(r"(?:" + _ALTERNATIVAS_MAIUSCULAS + r")")
+_ET_AL = re.compile(r"\bet\s+al$", re.I)
+_INICIAL = re.compile(r"[^\W\d_]")  # "J. R. R. Tolkien"
+
+_TOKEN = re.compile(
+    r"(?:https?://|www\.)\S+"                          # endereços
+    r"|[\w.+-]+@\w+(?:\.\w+)+"                         # e-mails
+    r"|(?<![\w.])(?:" + _ALTERNATIVAS_ABREV + r")\.(?=\s|$)"  # abreviaturas, com o ponto
+    r"|(?<![\w.])(?-i:" + _ALTERNATIVAS_MAIUSCULAS + r")\.(?=\s|$)"  # Dom. Pe. Ex.
+    r"|(?<=\bet )al\.(?=\s|$)"                        # et al.
+    r"|\d+(?:[.,:/]\d+)*[ºª]?"                        # números: 1.000,50  12:30  1/2  3º
+    r"|\w+(?:[-'’]\w+)*"                              # palavras (disse-lhe, d'água)
+    r"|\.\.\.|…|--+|[—–]"                             # reticências e travessões
+    r"|\S",                                           # demais símbolos, um a um
+    re.I,
+)
+
+
+def _nao_encerra(texto: str, fim_pontuacao: int, pontuacao: str) -> bool:
+    """True se o ponto em `texto[:fim_pontuacao]` é de abreviatura ou inicial."""
+    if pontuacao != ".":
+        return False
+    inicio = max(0, fim_pontuacao - 16)
+    m = _ULTIMA_PALAVRA.search(texto, inicio, fim_pontuacao)
+    if m is None or (m.start() > 0 and not texto[m.start() - 1].isspace()
+                     and texto[m.start() - 1] not in "(\"'“‘«—–-"):
+        return False
+    palavra = m.group(1)
+    if _ABREVIATURA.fullmatch(palavra) or _ABREVIATURA_MAIUSCULA.fullmatch(palavra):
+        return True
+    if palavra.lower() == "al":
+        return bool(_ET_AL.search(texto, max(0, m.start() - 8), m.end(1)))
+    return len(palavra) == 1 and bool(_INICIAL.match(palavra))
+
+
+def spans_frases(texto: str) -> List[Tuple[int, int]]:
+    """Posições (início, fim) das frases de `texto`, sem os espaços das pontas."""
+    spans = []
+    inicio = 0
+    n = len(texto)
+    while inicio < n and texto[inicio].isspace():
+        inicio += 1
+    for m in _FIM_FRASE.finditer(texto):
+        if m.start() < inicio:
+            continue
+        seguinte = m.group(4)
+        if seguinte.islower():
+            continue
+        if seguinte in _TRAVESSOES and "\n" not in m.group(3) and m.group(1) != ".":
+            # "— Você vem? — perguntou ela.": o narrador continua a mesma frase
+            continue
+        if _nao_encerra(texto, m.end(1), m.group(1)):
+            continue
+        fim = m.end()
+        spans.append((inicio, fim))
+        inicio = fim
+        while inicio < n and texto[inicio].isspace():
+            inicio += 1
+    fim = n
+    while fim > inicio and texto[fim - 1].isspace():
+        fim -= 1
+    if fim > inicio:
+        spans.append((inicio, fim))
+    return spans
+
+
+def frases(texto: str) -> List[str]:
+    return [texto[i:f] for i, f in spans_frases(texto)]
+
+
+def palavras(texto: str) -> List[str]:
+    return _TOKEN.findall(texto)
@@ -0,0 +1,141 @@
+# trabalhador.py
+# Modo coprocesso: um processo de longa duração que lê pedidos em JSON (um por linha)
+# da entrada padrão e escreve um resultado JSON por linha na saída padrão. O avaliador
+# e os tokenizadores ficam carregados entre pedidos, e nada é perguntado via input().
+#
+# Pedido:   {"id": 1, "texto": "...", "tema": "...", "genero": "conto"}
+# Resposta: {"id": 1, "nota_final": 8, "detalhe": {...}, ...}  (ou {"id": 1, "erro": "..."})
+
+import argparse
+import contextlib
+import json
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, TextIO
+
+try:
+    # Prefer relative imports when used as a package
+    from .instrumentacao import Perfilador, anexar_tempos
+    from .lote import GENERO_PADRAO, GENEROS_VALIDOS, avaliar_no_processo, iniciar_trabalhador
+except Exception:
+    # Fallback for direct script execution
+    from instrumentacao import Perfilador, anexar_tempos
+    from lote import GENERO_PADRAO, GENEROS_VALIDOS, avaliar_no_processo, iniciar_trabalhador
+
+# Campos internos do feedback que não vão para a resposta
+_CAMPOS_PRIVADOS = ("_texto_base",)
+
+_FIM = object()
+
+
+def processar_pedido(pedido: Dict, genero_padrao: str = GENERO_PADRAO) -> Dict:
+    """Avalia um pedido já decodificado e devolve os campos de `pontuar_e_gerar_feedback`.
+
+    Com `"perfil": true` no pedido, a resposta traz também os tempos por etapa ("tempos").
+    """
+    texto = pedido.get("texto")
+    if not isinstance(texto, str) or not texto.strip():
+        return {"erro": "campo 'texto' ausente ou vazio"}
+    tema = pedido.get("tema") or ""
+    genero = pedido.get("genero") or None
+    padrao = pedido.get("genero_padrao") or genero_padrao
+    perfilador = Perfilador() if pedido.get("perfil") else None
+    try:
+        with perfilador or contextlib.nullcontext():
+            _, fb = avaliar_no_processo(texto, tema, genero, padrao)
+    except Exception as e:
+        return {"erro": f"{type(e).__name__}: {e}"}
+    resposta = {k: v for k, v in fb.items() if k not in _CAMPOS_PRIVADOS}
+    if perfilador is not None:
+        anexar_tempos(resposta, perfilador)
+    return resposta
+
+
+def _resposta(pedido_id, resultado: Dict) -> str:
+    resposta = {"id": pedido_id}
+    resposta.update(resultado)
+    return json.dumps(resposta, ensure_ascii=False)
+
+
+def _escritor(pendentes: "queue.Queue", saida: TextIO):
+    """Escreve as respostas na ordem dos pedidos, à medida que ficam prontas."""
+    while True:
+        item = pendentes.get()
+        if item is _FIM:
+            return
+        pedido_id, resultado = item
+        if isinstance(resultado, Future):
+            try:
+                resultado = resultado.result()
+            except Exception as e:  # processo trabalhador morreu, etc.
+                resultado = {"erro": f"{type(e).__name__}: {e}"}
+        saida.write(_resposta(pedido_id, resultado) + "\n")
+        saida.flush()
+
+
+def servir(entrada: TextIO, saida: TextIO, processos: int = 1, max_pendentes: int = 64,
+           genero_padrao: str = GENERO_PADRAO, caminho_cache: Optional[str] = None):
+    """Atende pedidos até o fim da entrada.
+
+    A leitura não espera a avaliação: até `max_pendentes` pedidos ficam em andamento ao
+    mesmo tempo (o chamador pode enviar vários sem aguardar as respostas). As respostas
+    saem na ordem dos pedidos e repetem o campo "id" recebido.
+    """
+    if processos > 1:
+        executor = ProcessPoolExecutor(max_workers=processos, initializer=iniciar_trabalhador,
+                                       initargs=(caminho_cache,))
+    else:
+        # um único processo: o trabalho roda numa thread para a leitura seguir adiante
+        iniciar_trabalhador(caminho_cache)
+        executor = ThreadPoolExecutor(max_workers=1)
+
+    pendentes: "queue.Queue" = queue.Queue(maxsize=max_pendentes)
+    escritor = threading.Thread(target=_escritor, args=(pendentes, saida), daemon=True)
+    escritor.start()
+    try:
+        for linha in entrada:
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                pedido = json.loads(linha)
+                if not isinstance(pedido, dict):
+                    raise ValueError("o pedido deve ser um objeto JSON")
+            except ValueError as e:
+                pendentes.put((None, {"erro": f"JSON inválido: {e}"}))
+                continue
+            futuro = executor.submit(processar_pedido, pedido, genero_padrao)
+            # put bloqueia quando há pedidos demais em andamento (contrapressão)
+            pendentes.put((pedido.get("id"), futuro))
+    finally:
+        pendentes.put(_FIM)
+        escritor.join()
+        executor.shutdown()
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description="Coprocesso de avaliação: pedidos JSON por linha no stdin, resultados no stdout."
+    )
+    parser.add_argument("--processos", type=int, default=1,
+                        help="processos de avaliação (padrão: 1)")
+    parser.add_argument("--max-pendentes", type=int, default=64,
+                        help="pedidos em andamento antes de parar de ler a entrada")
+    parser.add_argument("--genero-padrao", default=GENERO_PADRAO,
+                        help="gênero usado quando a detecção retorna 'desconhecido'")
+    parser.add_argument("--cache", default=None, help="arquivo SQLite do cache de resultados")
+    args = parser.parse_args(argv)
+
+    if args.genero_padrao.lower() not in GENEROS_VALIDOS:
+        parser.error(f"gênero padrão inválido: {args.genero_padrao}")
+
+    # respostas sempre em UTF-8, independentemente da configuração do terminal
+    entrada = open(sys.stdin.fileno(), "r", encoding="utf-8", closefd=False)
+    saida = open(sys.stdout.fileno(), "w", encoding="utf-8", closefd=False)
+    servir(entrada, saida, args.processos, args.max_pendentes, args.genero_padrao.lower(), args.cache)
+
+
+if __name__ == "__main__":
+    main()